@@ -1,9 +1,9 @@
 import os
-import django
 from django.core.wsgi import get_wsgi_application
-from django.core.management import execute_from_command_line
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.museum_api.settings")
-django.setup()
+# API-only profile: no admin/jazzmin/sessions to load on a cold start
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.museum_api.settings_api")
+# Short-lived persistent connections, pooler-friendly cursors
+os.environ.setdefault("DJANGO_SERVERLESS", "1")
 
 application = get_wsgi_application()
@@ -1,11 +1,28 @@
-from django.contrib import admin
-from django.utils.html import format_html
+from django import forms
+from django.contrib import admin, messages
+from django.conf import settings
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.exceptions import ValidationError
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Q
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
 from django.urls import reverse
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import gettext_lazy as _, ngettext
+from modeltranslation.utils import build_localized_fieldname
+from .caching import invalidate_artifact_caches
+from .documents import refresh_documents
+from .jobs import start_job
+from .media_import import MediaImportError, import_media, report_summary
 from .models import (
-    Period, Culture, Collection, Artifact, 
-    ArtifactImage, AudioGuide, VideoContent, MuseumVisit
+    Period, Culture, Collection, Artifact, ArtifactJob,
+    ArtifactImage, AudioGuide, VideoContent, MuseumVisit, RequestProfile, SlowQuery
 )
+from .paginators import EstimatedCountPaginator
 
 
 @admin.register(Period)
@@ -27,10 +44,14 @@ class CollectionAdmin(admin.ModelAdmin):
     search_fields = ['name_fr', 'name_en', 'name_wo', 'curator_fr']
     list_filter = ['created_at']
     readonly_fields = ['created_at', 'updated_at']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(artifact_total=Count('artifacts'))
     
     def artifact_count(self, obj):
-        return obj.artifacts.count()
+        return obj.artifact_total
     artifact_count.short_description = _("Nombre d'œuvres")
+    artifact_count.admin_order_field = 'artifact_total'
 
 
 class ArtifactImageInline(admin.TabularInline):
@@ -51,6 +72,74 @@ class VideoContentInline(admin.TabularInline):
     fields = ['title_fr', 'video_type', 'video_file', 'video_url', 'order', 'is_published']
 
 
+class RelatedNameFilter(admin.SimpleListFilter):
+    """
+    Filter on a related collection, period or culture typed in a text box
+    (name in any language, or id): unlike the default related filter it does
+    not load every row of the related table into the sidebar.
+    """
+    template = 'admin/artifacts/input_filter.html'
+    field = None
+
+    def lookups(self, request, model_admin):
+        # Never rendered, but the filter is only shown when it has choices
+        return [('', '')]
+
+    def choices(self, changelist):
+        # A single "choice": the text box, keeping the other active parameters
+        yield {
+            'value': self.value() or '',
+            'params': [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (self.parameter_name, PAGE_VAR)
+            ],
+        }
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip()
+        if not value:
+            return queryset
+        if value.isdigit():
+            return queryset.filter(**{f'{self.field}_id': value})
+        names = Q()
+        for language, _name in settings.LANGUAGES:
+            names |= Q(**{f'{self.field}__{build_localized_fieldname("name", language)}__icontains': value})
+        return queryset.filter(names)
+
+
+class CollectionNameFilter(RelatedNameFilter):
+    title = _("collection")
+    parameter_name = field = 'collection'
+
+
+class PeriodNameFilter(RelatedNameFilter):
+    title = _("période")
+    parameter_name = field = 'period'
+
+
+class CultureNameFilter(RelatedNameFilter):
+    title = _("culture")
+    parameter_name = field = 'culture'
+
+
+class ArtifactActionForm(ActionForm):
+    """Action bar with the target collection of "move to collection" """
+    collection = forms.ModelChoiceField(
+        queryset=Collection.objects.all(),
+        required=False,
+        label=_("Collection"),
+        widget=AutocompleteSelect(Artifact._meta.get_field('collection'), admin.site),
+    )
+
+
+class MediaImportForm(forms.Form):
+    archive = forms.FileField(
+        label=_("Archive zip"),
+        help_text=_("MN-1234.jpg : image principale de MN-1234 ; MN-1234_2.jpg : image de galerie en position 2."),
+    )
+    replace_main = forms.BooleanField(required=False, label=_("Remplacer les images principales existantes"))
+
+
 @admin.register(Artifact)
 class ArtifactAdmin(admin.ModelAdmin):
     list_display = [
@@ -58,13 +147,15 @@ class ArtifactAdmin(admin.ModelAdmin):
         'is_featured', 'is_on_display', 'main_image_preview'
     ]
     list_filter = [
-        'is_featured', 'is_on_display', 'collection', 'period', 
-        'culture', 'created_at'
+        'is_featured', 'is_on_display', CollectionNameFilter, PeriodNameFilter,
+        CultureNameFilter, 'created_at'
     ]
     search_fields = [
         'inventory_number', 'name_fr', 'name_en', 'name_wo',
         'description_fr', 'description_en', 'description_wo'
     ]
+    list_select_related = ['collection', 'period']
+    autocomplete_fields = ['collection', 'period', 'culture']
     readonly_fields = ['id', 'qr_code_preview', 'created_at', 'updated_at']
     
     fieldsets = (
@@ -104,12 +195,108 @@ class ArtifactAdmin(admin.ModelAdmin):
     )
     
     inlines = [ArtifactImageInline, AudioGuideInline, VideoContentInline]
+
+    action_form = ArtifactActionForm
+    actions = [
+        'make_featured', 'remove_featured', 'show_on_display', 'hide_from_display',
+        'move_to_collection', 'regenerate_qr_codes', 'regenerate_thumbnails',
+    ]
+
+    def bulk_update(self, request, queryset, **fields):
+        """One UPDATE for the whole selection, then one cache invalidation"""
+        artifact_ids = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(**fields, updated_at=timezone.now())
+        invalidate_artifact_caches()
+        refresh_documents(artifact_ids)
+        self.message_user(request, ngettext(
+            "%d œuvre mise à jour.", "%d œuvres mises à jour.", updated
+        ) % updated, messages.SUCCESS)
+
+    @admin.action(description=_("Mettre en vedette"), permissions=['change'])
+    def make_featured(self, request, queryset):
+        self.bulk_update(request, queryset, is_featured=True)
+
+    @admin.action(description=_("Retirer des vedettes"), permissions=['change'])
+    def remove_featured(self, request, queryset):
+        self.bulk_update(request, queryset, is_featured=False)
+
+    @admin.action(description=_("Exposer au musée"), permissions=['change'])
+    def show_on_display(self, request, queryset):
+        self.bulk_update(request, queryset, is_on_display=True)
+
+    @admin.action(description=_("Retirer de l'exposition"), permissions=['change'])
+    def hide_from_display(self, request, queryset):
+        self.bulk_update(request, queryset, is_on_display=False)
+
+    @admin.action(description=_("Déplacer vers la collection choisie"), permissions=['change'])
+    def move_to_collection(self, request, queryset):
+        try:
+            collection = ArtifactActionForm.base_fields['collection'].clean(request.POST.get('collection'))
+        except ValidationError:
+            collection = None
+        if collection is None:
+            self.message_user(
+                request, _("Choisissez la collection de destination."), messages.ERROR
+            )
+            return
+        self.bulk_update(request, queryset, collection=collection)
+
+    def start_job(self, request, queryset, kind):
+        job = start_job(kind, queryset, user=request.user.get_username())
+        url = reverse('admin:artifacts_artifactjob_change', args=[job.pk])
+        self.message_user(request, format_html(
+            '{} <a href="{}">{}</a>',
+            _("Traitement lancé en arrière-plan pour %(count)d œuvres.") % {'count': job.total},
+            url, _("Suivre la progression")
+        ), messages.SUCCESS)
+
+    def get_urls(self):
+        return [
+            path(
+                'import-media/', self.admin_site.admin_view(self.import_media_view),
+                name='artifacts_artifact_import_media'
+            ),
+        ] + super().get_urls()
+
+    def import_media_view(self, request):
+        """Upload a zip of photos named after inventory numbers, then show the per-file report"""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        report, summary = None, None
+        form = MediaImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            try:
+                report = import_media(
+                    form.cleaned_data['archive'], replace_main=form.cleaned_data['replace_main']
+                )
+                summary = report_summary(report)
+            except MediaImportError as e:
+                form.add_error('archive', str(e))
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _("Importer des photos"),
+            'opts': self.model._meta,
+            'form': form,
+            'report': report,
+            'summary': summary,
+        }
+        return TemplateResponse(request, 'admin/artifacts/artifact/import_media.html', context)
+
+    @admin.action(description=_("Régénérer les codes QR"), permissions=['change'])
+    def regenerate_qr_codes(self, request, queryset):
+        self.start_job(request, queryset, 'qr_codes')
+
+    @admin.action(description=_("Régénérer les miniatures"), permissions=['change'])
+    def regenerate_thumbnails(self, request, queryset):
+        self.start_job(request, queryset, 'thumbnails')
     
     def main_image_preview(self, obj):
-        if obj.main_image:
+        # Originals are only shown until `manage.py generate_thumbnails` has run
+        image = obj.main_image_thumbnail or obj.main_image
+        if image:
             return format_html(
-                '<img src="{}" style="width: 50px; height: 50px; object-fit: cover;" />',
-                obj.main_image.url
+                '<img src="{}" loading="lazy" style="width: 50px; height: 50px; object-fit: cover;" />',
+                image.url
             )
         return _("Pas d'image")
     main_image_preview.short_description = _("Aperçu")
@@ -131,6 +318,8 @@ class ArtifactAdmin(admin.ModelAdmin):
 class ArtifactImageAdmin(admin.ModelAdmin):
     list_display = ['artifact', 'caption_fr', 'order']
     list_filter = ['artifact__collection']
+    list_select_related = ['artifact']
+    autocomplete_fields = ['artifact']
     search_fields = ['artifact__name_fr', 'caption_fr']
 
 
@@ -138,6 +327,8 @@ class ArtifactImageAdmin(admin.ModelAdmin):
 class AudioGuideAdmin(admin.ModelAdmin):
     list_display = ['artifact', 'language', 'duration', 'narrator_fr']
     list_filter = ['language', 'artifact__collection']
+    list_select_related = ['artifact']
+    autocomplete_fields = ['artifact']
     search_fields = ['artifact__name_fr', 'narrator_fr']
 
 
@@ -145,13 +336,109 @@ class AudioGuideAdmin(admin.ModelAdmin):
 class VideoContentAdmin(admin.ModelAdmin):
     list_display = ['title_fr', 'artifact', 'video_type', 'duration', 'is_published']
     list_filter = ['video_type', 'is_published', 'artifact__collection']
+    list_select_related = ['artifact']
+    autocomplete_fields = ['artifact']
     search_fields = ['title_fr', 'title_en', 'title_wo']
 
 
 @admin.register(MuseumVisit)
 class MuseumVisitAdmin(admin.ModelAdmin):
     list_display = ['session_id', 'artifact', 'language', 'duration_seconds', 'visited_at']
+    # No date_hierarchy: it lists the distinct dates of the whole table
     list_filter = ['language', 'visited_at']
-    search_fields = ['session_id', 'artifact__name_fr']
+    list_select_related = ['artifact']
+    # Exact matches use the indexes instead of scanning millions of rows
+    search_fields = ['=session_id', '=artifact__inventory_number']
+    autocomplete_fields = ['artifact']
     readonly_fields = ['visited_at']
-    date_hierarchy = 'visited_at'
\ No newline at end of file
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ArtifactJob)
+class ArtifactJobAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'kind', 'status', 'progress', 'failed', 'user', 'updated_at', 'finished_at']
+    list_filter = ['kind', 'status']
+    fields = ['kind', 'status', 'progress', 'failed', 'user', 'created_at', 'updated_at', 'finished_at', 'error']
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def progress(self, obj):
+        percent = 100 * obj.processed // obj.total if obj.total else 100
+        return f"{obj.processed}/{obj.total} ({percent} %)"
+    progress.short_description = _("Progression")
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = [
+        'created_at', 'method', 'path', 'view', 'status_code',
+        'duration_ms', 'query_count', 'sql_time_ms', 'user'
+    ]
+    list_filter = ['method', 'status_code', 'view']
+    search_fields = ['path', 'view', 'user']
+    date_hierarchy = 'created_at'
+    fields = [
+        'created_at', 'method', 'path', 'view', 'status_code', 'user',
+        'duration_ms', 'query_count', 'sql_time_ms',
+        'cumulative_stats_display', 'internal_stats_display', 'sql_timeline_display'
+    ]
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def cumulative_stats_display(self, obj):
+        return format_html('<pre style="font-size: 12px">{}</pre>', obj.cumulative_stats)
+    cumulative_stats_display.short_description = _("Temps cumulé")
+
+    def internal_stats_display(self, obj):
+        return format_html('<pre style="font-size: 12px">{}</pre>', obj.internal_stats)
+    internal_stats_display.short_description = _("Temps propre")
+
+    def sql_timeline_display(self, obj):
+        rows = format_html_join(
+            '', '<tr><td>{}</td><td>{}</td><td>{}</td><td><code>{}</code></td></tr>',
+            (
+                (query['start_ms'], query['duration_ms'], query['database'], query['sql'])
+                for query in obj.sql_timeline
+            )
+        )
+        return format_html(
+            '<table><tr><th>{}</th><th>{}</th><th>{}</th><th>SQL</th></tr>{}</table>',
+            _("Début (ms)"), _("Durée (ms)"), _("Base"), rows
+        )
+    sql_timeline_display.short_description = _("Chronologie SQL")
+
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'duration_ms', 'view', 'database', 'short_sql']
+    list_filter = ['database', 'view']
+    search_fields = ['sql', 'view', 'path']
+    date_hierarchy = 'created_at'
+    fields = ['created_at', 'duration_ms', 'database', 'view', 'path', 'sql', 'explain_display']
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def short_sql(self, obj):
+        return obj.shape[:120]
+    short_sql.short_description = _("Requête SQL")
+
+    def explain_display(self, obj):
+        return format_html('<pre style="font-size: 12px">{}</pre>', obj.explain or '-')
+    explain_display.short_description = _("Plan d'exécution")
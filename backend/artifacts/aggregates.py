@@ -0,0 +1,223 @@
+"""
+Pre-bucketed visit aggregates:
+
+- ``VisitAggregate``: one row per hour, artifact and language with the visit
+  count and total dwell time;
+- ``VisitorSketch``: one HyperLogLog sketch of the session ids per day,
+  artifact and language, for approximate unique visitors over any range.
+
+New visits are folded in as they are tracked, in the same transaction as
+the visit itself (see ``ArtifactViewSet.track_visit``); ``rollup_visits``
+rebuilds a range from the raw log (retention, bulk imports). Analytics read
+only these rows, never the visit log itself.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, Trunc, TruncHour
+
+from .db_routers import PRIMARY_DB
+from .hyperloglog import HyperLogLog, SketchUnion
+from .models import MuseumVisit, VisitAggregate, VisitorSketch
+
+
+logger = logging.getLogger('artifacts.aggregates')
+
+# Compare-and-swap attempts of a sketch update before leaving it to the rollup
+SKETCH_UPDATE_ATTEMPTS = 10
+
+
+def rollup_visits(start, end, using=PRIMARY_DB):
+    """
+    (Re)build the aggregates of [start, end) from the raw visits.
+
+    Bounds must fall on midnight UTC so that daily sketches are complete.
+    """
+    buckets = MuseumVisit.objects.using(using).filter(
+        visited_at__gte=start, visited_at__lt=end
+    ).annotate(
+        bucket=TruncHour('visited_at')
+    ).values('bucket', 'artifact_id', 'language').annotate(
+        visit_count=Count('id'),
+        total_duration_seconds=Sum('duration_seconds'),
+    ).order_by()
+
+    with transaction.atomic(using=using):
+        VisitAggregate.objects.using(using).filter(bucket__gte=start, bucket__lt=end).delete()
+        aggregates = VisitAggregate.objects.using(using).bulk_create(
+            [VisitAggregate(**bucket) for bucket in buckets.iterator(chunk_size=5000)],
+            batch_size=2000
+        )
+        rebuild_sketches(start, end, using)
+    return sum(aggregate.visit_count for aggregate in aggregates)
+
+
+def rebuild_sketches(start, end, using=PRIMARY_DB):
+    """Stream the visits in time order, holding one day of sketches at a time"""
+    VisitorSketch.objects.using(using).filter(day__gte=start.date(), day__lt=end.date()).delete()
+    visits = MuseumVisit.objects.using(using).filter(
+        visited_at__gte=start, visited_at__lt=end
+    ).order_by('visited_at').values_list(
+        'visited_at', 'artifact_id', 'language', 'session_id'
+    ).iterator(chunk_size=5000)
+
+    def save(day, sketches):
+        VisitorSketch.objects.using(using).bulk_create([
+            VisitorSketch(day=day, artifact_id=artifact_id, language=language, sketch=sketch.to_bytes())
+            for (artifact_id, language), sketch in sketches.items()
+        ], batch_size=1000)
+
+    current_day, sketches = None, {}
+    for visited_at, artifact_id, language, session_id in visits:
+        day = visited_at.date()
+        if day != current_day:
+            save(current_day, sketches)
+            current_day, sketches = day, {}
+        sketches.setdefault((artifact_id, language), HyperLogLog()).add(session_id)
+    save(current_day, sketches)
+
+
+def record_visit(visit):
+    """Fold a newly tracked visit into its hourly aggregate"""
+    lookup = {
+        'bucket': visit.visited_at.replace(minute=0, second=0, microsecond=0),
+        'artifact_id': visit.artifact_id,
+        'language': visit.language,
+    }
+    duration = int(visit.duration_seconds or 0)
+    increment = {
+        'visit_count': F('visit_count') + 1,
+        'total_duration_seconds': F('total_duration_seconds') + duration,
+    }
+    aggregates = VisitAggregate.objects.using(PRIMARY_DB).filter(**lookup)
+    if aggregates.update(**increment):
+        return
+    try:
+        with transaction.atomic(using=PRIMARY_DB):
+            VisitAggregate.objects.using(PRIMARY_DB).create(
+                **lookup, visit_count=1, total_duration_seconds=duration
+            )
+    except IntegrityError:
+        # Another request created the bucket in the meantime
+        aggregates.update(**increment)
+
+
+def record_visitor(visit):
+    """
+    Add a newly tracked visit's session to its daily sketch.
+
+    The sketch is read without a lock and written back only if it did not
+    change in the meantime (compare-and-swap on its bytes), retrying
+    otherwise: concurrent visits to a popular artifact never wait on each
+    other during the read-modify-write. Most visits of a filled sketch do
+    not raise any register and write nothing.
+    """
+    lookup = {
+        'day': visit.visited_at.date(),
+        'artifact_id': visit.artifact_id,
+        'language': visit.language,
+    }
+    sketches = VisitorSketch.objects.using(PRIMARY_DB)
+    for _ in range(SKETCH_UPDATE_ATTEMPTS):
+        row = sketches.filter(**lookup).values_list('pk', 'sketch').first()
+        if row is not None:
+            pk, data = row[0], bytes(row[1])
+        sketch = HyperLogLog.from_bytes(data) if row else HyperLogLog()
+        if not sketch.add(visit.session_id):
+            return  # Returning session (or no register raised): nothing changes
+        if row is None:
+            try:
+                with transaction.atomic(using=PRIMARY_DB):
+                    sketches.create(**lookup, sketch=sketch.to_bytes())
+                return
+            except IntegrityError:
+                continue  # Created concurrently: retry as an update
+        if sketches.filter(pk=pk, sketch=data).update(sketch=sketch.to_bytes()):
+            return
+    logger.warning("Sketch of %s kept changing, visit %s left to rollup_visits", lookup, visit.pk)
+
+
+def filter_aggregates(start, end, artifact=None, collection=None, language=None,
+                      model=VisitAggregate, field='bucket'):
+    aggregates = model.objects.filter(**{f'{field}__gte': start, f'{field}__lt': end})
+    if artifact:
+        aggregates = aggregates.filter(artifact_id=artifact)
+    if collection:
+        aggregates = aggregates.filter(artifact__collection_id=collection)
+    if language:
+        aggregates = aggregates.filter(language=language)
+    return aggregates
+
+
+def visit_timeseries(interval, start, end, **filters):
+    """Visits and average dwell time per hour, day or week of [start, end)"""
+    rows = filter_aggregates(start, end, **filters).annotate(
+        period=Trunc('bucket', interval)
+    ).values('period').annotate(
+        visits=Sum('visit_count'),
+        duration=Sum('total_duration_seconds'),
+    ).order_by('period')
+    return [
+        {
+            'period': row['period'],
+            'visits': row['visits'],
+            'avg_duration_seconds': round(row['duration'] / row['visits'], 1) if row['visits'] else 0,
+        }
+        for row in rows
+    ]
+
+
+def visit_heatmap(start, end, **filters):
+    """Visits per weekday (Monday first) and hour of day, as a 7 x 24 matrix"""
+    rows = filter_aggregates(start, end, **filters).annotate(
+        weekday=ExtractIsoWeekDay('bucket'),
+        hour=ExtractHour('bucket'),
+    ).values('weekday', 'hour').annotate(visits=Sum('visit_count')).order_by()
+
+    matrix = [[0] * 24 for _ in range(7)]
+    for row in rows:
+        matrix[row['weekday'] - 1][row['hour']] = row['visits']
+    return matrix
+
+
+def period_start(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def unique_visitors(start, end, interval=None, **filters):
+    """
+    Approximate distinct sessions over the days of [start, end), overall and
+    per day, week or month, merging the daily sketches in constant memory.
+    """
+    first_day = start.date()
+    last_day = (end - timedelta(microseconds=1)).date() + timedelta(days=1)
+    sketches = filter_aggregates(
+        first_day, last_day, model=VisitorSketch, field='day', **filters
+    ).order_by('day').values_list('day', 'sketch').iterator(chunk_size=2000)
+
+    total, results = SketchUnion(), []
+    if not interval:
+        for day, data in sketches:
+            total.add(data)
+        return total.sketch(), results
+
+    # Merge days into their period, and each finished period into the total
+    current_period, period_union = None, None
+    for day, data in sketches:
+        period = period_start(day, interval)
+        if period != current_period:
+            if period_union is not None:
+                results.append({'period': current_period, 'unique_visitors': period_union.sketch().count()})
+                total.merge(period_union)
+            current_period, period_union = period, SketchUnion()
+        period_union.add(data)
+    if period_union is not None:
+        results.append({'period': current_period, 'unique_visitors': period_union.sketch().count()})
+        total.merge(period_union)
+    return total.sketch(), results
@@ -1,6 +1,31 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ArtifactsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'artifacts'
\ No newline at end of file
+    name = 'artifacts'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        connection_created.connect(install_query_hooks)
+        from . import documents, facets, featured, home  # noqa: F401 (cache invalidation signals)
+
+
+def install_query_hooks(sender, connection, **kwargs):
+    # Connections are per thread, so hook them as they are opened: this also
+    # covers the threads running async views' ORM calls
+    from .metrics import count_queries
+    from .nplusone import track_query_shapes
+    from .profiling import record_sql_timeline
+    from .slow_queries import record_slow_queries
+    wrappers = [count_queries]
+    if settings.NPLUSONE_DETECTION:
+        wrappers.append(track_query_shapes)
+    if settings.PROFILING_ENABLED:
+        wrappers.append(record_sql_timeline)
+    if settings.SLOW_QUERY_LOG:
+        wrappers.append(record_slow_queries)
+    for wrapper in wrappers:
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
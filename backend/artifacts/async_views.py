@@ -0,0 +1,264 @@
+"""
+Async (ASGI) versions of the hot read endpoints.
+
+DRF views are synchronous, so these are plain Django coroutine views using
+the async ORM and async cache API. They return the same payloads as their
+DRF counterparts in ``views.py`` and are mounted over them when
+``ASYNC_READ_PATH`` is enabled (see ``urls.py``).
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
+from django.http import HttpResponse
+from django.utils.translation import get_language, gettext as _
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .caching import dashboard_cache_key
+from .db_routers import replica_reads
+from .documents import collection_counts, document_detail_query, document_list, render_detail, render_list
+from .list_rows import ArtifactListRows
+from .metrics import record_cache_lookup
+from .models import Artifact, Collection, MuseumVisit
+from .renderers import dumps, json_ready, loads
+from .serializers import ArtifactDetailSerializer, MuseumVisitSerializer
+from .timeline import YEAR_RANGE_ERROR, filter_by_years
+from .views import ArtifactViewSet
+
+
+STATS_CACHE_TIMEOUT = getattr(settings, 'STATS_CACHE_TIMEOUT', 30)
+
+
+def api_response(data, status=200):
+    # Same bytes as the API's renderer (renderers.FastJSONRenderer)
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+def async_api_view(*methods):
+    """
+    Coroutine-safe equivalent of DRF's ``@api_view`` for these views.
+
+    Django 4.2's ``require_http_methods`` and ``csrf_exempt`` wrap views in
+    sync functions, which would turn the coroutine views back into sync ones.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def view(request, *args, **kwargs):
+            if request.method not in methods:
+                return api_response(
+                    {'detail': f'Method "{request.method}" not allowed.'}, status=405
+                )
+            return await view_func(request, *args, **kwargs)
+
+        # Like every DRF APIView: anonymous API, no CSRF enforcement
+        view.csrf_exempt = True
+        return replica_reads(view)
+    return decorator
+
+
+def displayed_artifacts():
+    return Artifact.objects.filter(is_on_display=True)
+
+
+# The FilterSet DjangoFilterBackend builds from ArtifactViewSet.filterset_fields
+ArtifactFilterSet = DjangoFilterBackend().get_filterset_class(ArtifactViewSet(), ArtifactViewSet.queryset)
+
+
+def filter_artifacts(request, queryset):
+    """
+    Mirror the filter, search and ordering backends of ArtifactViewSet.
+
+    Returns ``(queryset, None)``, or ``(None, errors)`` with the payload of
+    the 400 response DRF sends for the same parameters. Validating the
+    filters queries the related tables: call it with ``sync_to_async``.
+    """
+    params = request.GET
+    filterset = ArtifactFilterSet(params, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        return None, translate_validation(filterset.errors).detail
+    queryset = filterset.qs
+
+    try:
+        queryset = filter_by_years(queryset, params)
+    except ValueError:
+        return None, {'error': YEAR_RANGE_ERROR}
+
+    search = params.get(api_settings.SEARCH_PARAM, '')
+    for term in search.replace(',', ' ').split():
+        condition = Q()
+        for field in ArtifactViewSet.search_fields:
+            condition |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(condition)
+
+    ordering = [
+        field for field in params.get(api_settings.ORDERING_PARAM, '').split(',')
+        if field.lstrip('-') in ArtifactViewSet.ordering_fields
+    ]
+    return queryset.order_by(*(ordering or ArtifactViewSet.ordering)), None
+
+
+async def paginate(request, queryset):
+    """PageNumberPagination equivalent built on acount() and async iteration"""
+    page_size = api_settings.PAGE_SIZE
+    page_number = request.GET.get('page', '1')
+    count = await queryset.acount()
+    num_pages = max(1, -(-count // page_size))
+    if not page_number.isdigit() or not 1 <= int(page_number) <= num_pages:
+        return None, None
+    page_number = int(page_number)
+
+    offset = (page_number - 1) * page_size
+    items = [obj async for obj in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page_number + 1) if page_number < num_pages else None
+    if page_number == 1:
+        previous_url = None
+    elif page_number == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page_number - 1)
+    return items, {'count': count, 'next': next_url, 'previous': previous_url}
+
+
+@async_api_view('GET')
+async def artifact_list(request):
+    if settings.ARTIFACT_READ_MODEL:
+        documents = document_list(request.GET, get_language())
+        if documents is not None:
+            items, page = await paginate(request, documents)
+            if items is None:
+                return api_response({'detail': _('Invalid page.')}, status=404)
+            return api_response({**page, 'results': render_list(items, request)})
+
+    queryset, errors = await sync_to_async(filter_artifacts)(request, displayed_artifacts())
+    if errors is not None:
+        return api_response(errors, status=400)
+
+    rows = ArtifactListRows(request)
+    items, page = await paginate(request, rows.values(queryset))
+    if items is None:
+        return api_response({'detail': _('Invalid page.')}, status=404)
+    return api_response({**page, 'results': rows.render(items)})
+
+
+async def get_artifact_detail(request, **lookup):
+    """
+    Load an artifact with everything ArtifactDetailSerializer touches.
+    Without a request, media URLs stay relative (as in QRScannerViewSet.scan).
+    """
+    artifact = await displayed_artifacts().select_related(
+        'collection', 'period', 'culture'
+    ).prefetch_related(
+        'additional_images', 'audio_guides', 'videos'
+    ).aget(**lookup)
+    artifact.collection.displayed_artifact_count = await displayed_artifacts().filter(
+        collection_id=artifact.collection_id
+    ).acount()
+    return ArtifactDetailSerializer(artifact, context={'request': request}).data
+
+
+@async_api_view('GET')
+async def artifact_detail(request, pk):
+    if settings.ARTIFACT_READ_MODEL:
+        document = await document_detail_query(pk, get_language()).afirst()
+        if document is not None:
+            counts = await sync_to_async(collection_counts)()
+            return api_response(render_detail(document, request, counts))
+    try:
+        data = await get_artifact_detail(request, pk=pk)
+    except (Artifact.DoesNotExist, ValidationError):
+        return api_response({'detail': _('Not found.')}, status=404)
+    return api_response(data)
+
+
+@async_api_view('GET')
+async def artifact_suggest(request):
+    """Name autocomplete for the search box"""
+    query = request.GET.get('q', '').strip()
+    if len(query) < 2:
+        return api_response([])
+
+    language = get_language() if get_language() in ('fr', 'en', 'wo') else 'fr'
+    name_field = f'name_{language}'
+    suggestions = displayed_artifacts().filter(
+        Q(**{f'{name_field}__istartswith': query}) |
+        Q(inventory_number__istartswith=query)
+    ).order_by(name_field).values('id', 'inventory_number', name_field)[:10]
+    return api_response([
+        {
+            'id': row['id'],
+            'inventory_number': row['inventory_number'],
+            'name': row[name_field],
+        } async for row in suggestions
+    ])
+
+
+@async_api_view('POST')
+async def qr_scan(request):
+    if request.content_type == 'application/json':
+        try:
+            payload = loads(request.body or b'{}')
+        except ValueError:
+            return api_response({'detail': 'JSON parse error'}, status=400)
+    else:
+        payload = request.POST
+    qr_data = payload.get('qr_data') if hasattr(payload, 'get') else None
+
+    if not qr_data:
+        return api_response({'error': 'QR code data is required'}, status=400)
+
+    if '/artifact/' in qr_data:
+        artifact_id = qr_data.split('/artifact/')[-1].split('/')[0]
+    else:
+        artifact_id = qr_data
+    try:
+        # QRScannerViewSet.scan serializes without a request: relative media URLs
+        return api_response(await get_artifact_detail(None, id=artifact_id))
+    except Artifact.DoesNotExist:
+        return api_response({'error': 'Artifact not found'}, status=404)
+    except Exception as e:
+        return api_response({'error': f'Invalid QR code: {str(e)}'}, status=400)
+
+
+@async_api_view('GET')
+async def stats_dashboard(request):
+    cache_key = dashboard_cache_key(get_language())
+    data = await cache.aget(cache_key)
+    record_cache_lookup(data is not None)
+    if data is not None:
+        return api_response(data)
+
+    most_visited = displayed_artifacts().annotate(
+        visit_count=Count('visits')
+    ).order_by('-visit_count')[:5]
+    recent_visits = MuseumVisit.objects.select_related('artifact').order_by('-visited_at')[:10]
+
+    data = {
+        'stats': {
+            'total_artifacts': await displayed_artifacts().acount(),
+            'total_collections': await Collection.objects.acount(),
+            'featured_artifacts': await displayed_artifacts().filter(is_featured=True).acount(),
+            'total_visits': await MuseumVisit.objects.acount(),
+        },
+        'most_visited': [
+            {
+                'id': artifact.id,
+                'name': artifact.name,
+                'visit_count': artifact.visit_count
+            } async for artifact in most_visited
+        ],
+        'recent_visits': MuseumVisitSerializer(
+            [visit async for visit in recent_visits], many=True
+        ).data
+    }
+    # Cache the JSON-ready payload (UUIDs and dates rendered once)
+    data = json_ready(data)
+    await cache.aset(cache_key, data, STATS_CACHE_TIMEOUT)
+    return api_response(data)
@@ -0,0 +1,75 @@
+"""
+Cached public payloads that depend on artifact fields.
+
+Bulk changes (admin actions, imports) update many rows with ``update()`` and
+then call ``invalidate_artifact_caches`` once, instead of once per artifact.
+Payloads cached per host or with many variants (the featured carousel) are
+keyed on a version number, so invalidating them is a single write.
+
+A version bump only reaches the processes sharing the cache: with several
+workers or instances, ``CACHE_URL`` must point at Redis or Memcached, which
+the ``artifacts.W001`` check reminds of when DEBUG is off.
+"""
+import uuid
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+FEATURED_VERSION_KEY = 'featured:version'
+COLLECTIONS_VERSION_KEY = 'collections:version'
+SEARCH_VERSION_KEY = 'search:version'
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or not isinstance(caches['default'], LocMemCache):
+        return []
+    return [checks.Warning(
+        "The default cache is local to each process: invalidations (featured "
+        "carousel, home fragments, search facets) do not reach other workers.",
+        hint="Set CACHE_URL to a Redis or Memcached server shared by every worker.",
+        id='artifacts.W001',
+    )]
+
+
+def dashboard_cache_key(language):
+    return f'stats:dashboard:{language}'
+
+
+def cache_versions(*keys):
+    """Current version of each key, read in one round trip"""
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def featured_cache_version():
+    return cache_versions(FEATURED_VERSION_KEY)[FEATURED_VERSION_KEY]
+
+
+def invalidate_featured():
+    # A fresh random version: a reset (evicted) key can never match old entries
+    cache.set(FEATURED_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_collections():
+    """Collection list with displayed-artifact counts (home page)"""
+    cache.set(COLLECTIONS_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_search():
+    """Search facet counts"""
+    cache.set(SEARCH_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_artifact_caches():
+    cache.delete_many([dashboard_cache_key(code) for code, _ in settings.LANGUAGES])
+    invalidate_featured()
+    invalidate_collections()
+    invalidate_search()
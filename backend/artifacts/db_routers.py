@@ -0,0 +1,84 @@
+"""
+Database routing between the primary and the optional read replicas.
+
+Replicas are declared through ``DATABASE_REPLICA_URLS`` and registered in
+``settings.DATABASE_REPLICAS``. Reads only go to a replica when the current
+request has been marked as replica-safe by ``ReplicaRoutingMiddleware``;
+everything else (writes, admin, management commands) uses ``default``.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+PRIMARY_DB = 'default'
+
+
+class RoutingState:
+    """Per-request routing flags, shared by reference with sync_to_async threads"""
+
+    def __init__(self, pinned=False):
+        self.use_replica = False
+        self.pinned = pinned
+        self.wrote = False
+
+
+_routing_state = ContextVar('db_routing_state', default=None)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def begin_routing(pinned=False):
+    """Start a routing scope, returning the token for ``end_routing``"""
+    return _routing_state.set(RoutingState(pinned=pinned))
+
+
+def end_routing(token):
+    _routing_state.reset(token)
+
+
+def get_routing_state():
+    return _routing_state.get()
+
+
+def use_replica(enabled=True):
+    """Mark the current scope as allowed to read from replicas"""
+    state = _routing_state.get()
+    if state is not None:
+        state.use_replica = bool(enabled)
+
+
+def replica_reads(view_func):
+    """Mark a plain Django view as safe to serve from the read replicas"""
+    view_func.replica_reads = True
+    return view_func
+
+
+class PrimaryReplicaRouter:
+    """Route reads to a random replica and writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        replicas = get_replicas()
+        if not replicas or state is None or not state.use_replica or state.pinned:
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            # Read-your-writes: once the request has written, stay on the primary
+            state.pinned = state.wrote = True
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DB, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
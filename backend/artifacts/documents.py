@@ -0,0 +1,220 @@
+"""
+Denormalized read model: the list and detail payloads of every artifact,
+rendered once per language and stored in ``ArtifactDocument``.
+
+With ``ARTIFACT_READ_MODEL`` enabled, the artifact list and detail endpoints
+(DRF and async) read these documents instead of joining the artifact tables
+and running the serializers: a list page is one indexed query on the
+document table. Requests the documents cannot answer (search, year filters,
+ordering by name) take the normal path.
+
+Documents are rendered by the serializers themselves without a request, so
+media URLs are stored relative and made absolute when served, exactly as
+DRF does. The one value that depends on other artifacts, the collection's
+``artifact_count`` in the detail, is filled in when served from a cached
+count per collection.
+
+The signal handlers below rebuild the documents of an artifact when it, its
+images, audio guides or videos change, and those of every artifact of a
+collection, period or culture that changes. Bulk updates that bypass
+signals call ``refresh_documents`` with the ids they touched. Run
+``manage.py rebuild_artifact_documents`` after enabling the read model.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import translation
+
+from .caching import COLLECTIONS_VERSION_KEY, cache_versions, invalidate_collections
+from .db_routers import PRIMARY_DB
+from .models import (
+    Artifact, ArtifactDocument, ArtifactImage, AudioGuide, Collection, Culture, Period, VideoContent
+)
+from .renderers import dumps, loads
+from .serializers import ArtifactDetailSerializer, ArtifactListSerializer
+
+
+# Keys holding file URLs in the documents, made absolute when served
+MEDIA_KEYS = {'main_image', 'qr_code', 'image', 'audio_file', 'video_file', 'thumbnail'}
+DOCUMENT_FILTERS = ['collection', 'period', 'culture']
+DOCUMENT_ORDERINGS = {'': '-created_at', '-created_at': '-created_at', 'created_at': 'created_at'}
+# Parameters only the normal path implements
+UNSUPPORTED_PARAMS = ['search', 'year', 'year_from', 'year_to']
+REBUILD_BATCH_SIZE = 200
+
+
+def document_languages():
+    return [code for code, _ in settings.LANGUAGES]
+
+
+def render(serializer_class, artifact):
+    data = serializer_class(artifact, context={'request': None}).data
+    return dumps(data).decode()
+
+
+def build_documents(artifact):
+    """One unsaved ArtifactDocument per language"""
+    # The real count is filled in when served (see collection_counts)
+    artifact.collection.displayed_artifact_count = 0
+    documents = []
+    for language in document_languages():
+        with translation.override(language):
+            documents.append(ArtifactDocument(
+                artifact=artifact, language=language,
+                collection_id=artifact.collection_id, period_id=artifact.period_id,
+                culture_id=artifact.culture_id, is_featured=artifact.is_featured,
+                is_on_display=artifact.is_on_display, created_at=artifact.created_at,
+                list_json=render(ArtifactListSerializer, artifact),
+                detail_json=render(ArtifactDetailSerializer, artifact),
+            ))
+    return documents
+
+
+def rebuild_documents(artifact_ids=None, using=PRIMARY_DB):
+    """Re-render the documents of ``artifact_ids`` (every artifact if None)"""
+    artifacts = Artifact.objects.using(using).select_related(
+        'collection', 'period', 'culture'
+    ).prefetch_related('additional_images', 'audio_guides', 'videos').order_by('pk')
+    if artifact_ids is None:
+        ids = list(Artifact.objects.using(using).order_by('pk').values_list('pk', flat=True))
+        ArtifactDocument.objects.using(using).exclude(artifact_id__in=ids).delete()
+    else:
+        ids = list(artifact_ids)
+    rebuilt = 0
+    for start in range(0, len(ids), REBUILD_BATCH_SIZE):
+        batch = ids[start:start + REBUILD_BATCH_SIZE]
+        documents = []
+        for artifact in artifacts.filter(pk__in=batch):
+            documents.extend(build_documents(artifact))
+        with transaction.atomic(using=using):
+            ArtifactDocument.objects.using(using).filter(artifact_id__in=batch).delete()
+            ArtifactDocument.objects.using(using).bulk_create(documents)
+        rebuilt += len(documents)
+    return rebuilt
+
+
+def refresh_documents(artifact_ids):
+    """Rebuild once the current transaction commits, if the read model is enabled"""
+    if not settings.ARTIFACT_READ_MODEL:
+        return
+    artifact_ids = set(artifact_ids)
+    if artifact_ids:
+        transaction.on_commit(lambda: rebuild_documents(artifact_ids), using=PRIMARY_DB)
+
+
+def document_list(params, language):
+    """
+    Documents matching the list parameters (filters and ordering of
+    ArtifactViewSet), or None when only the normal path can answer.
+    """
+    if language not in document_languages():
+        return None
+    if any(params.get(name) for name in UNSUPPORTED_PARAMS):
+        return None
+    ordering = DOCUMENT_ORDERINGS.get(params.get('ordering', ''))
+    if ordering is None:
+        return None
+
+    documents = ArtifactDocument.objects.filter(language=language, is_on_display=True)
+    for field in DOCUMENT_FILTERS:
+        value = params.get(field)
+        if value:
+            if not value.isdigit():
+                return None  # Let the normal path report the error
+            documents = documents.filter(**{f'{field}_id': value})
+    is_featured = params.get('is_featured')
+    if is_featured in ('true', 'True', '1'):
+        documents = documents.filter(is_featured=True)
+    elif is_featured in ('false', 'False', '0'):
+        documents = documents.filter(is_featured=False)
+    elif is_featured:
+        return None
+    return documents.order_by(ordering).values_list('list_json', flat=True)
+
+
+def document_detail_query(pk, language):
+    return ArtifactDocument.objects.filter(
+        artifact_id=pk, language=language, is_on_display=True
+    ).values_list('detail_json', flat=True)
+
+
+def absolute_media(data, request):
+    """Make the media URLs of a document absolute, like DRF's FileField"""
+    if isinstance(data, list):
+        for item in data:
+            absolute_media(item, request)
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            if key in MEDIA_KEYS and isinstance(value, str):
+                data[key] = request.build_absolute_uri(value)
+            elif isinstance(value, (dict, list)):
+                absolute_media(value, request)
+    return data
+
+
+def collection_counts():
+    """{collection id: displayed artifacts}, cached until an artifact changes"""
+    version = cache_versions(COLLECTIONS_VERSION_KEY)[COLLECTIONS_VERSION_KEY]
+    cache_key = f'collections:counts:{version}'
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = dict(
+            Artifact.objects.filter(is_on_display=True).order_by().values_list(
+                'collection_id'
+            ).annotate(count=Count('pk'))
+        )
+        cache.set(cache_key, counts, settings.HOME_COLLECTIONS_CACHE_TIMEOUT)
+    return counts
+
+
+def render_list(documents, request):
+    return [absolute_media(loads(document), request) for document in documents]
+
+
+def render_detail(document, request, counts):
+    data = absolute_media(loads(document), request)
+    data['collection']['artifact_count'] = counts.get(data['collection']['id'], 0)
+    return data
+
+
+@receiver(post_save, sender=Artifact)
+def refresh_on_artifact_save(sender, instance, **kwargs):
+    # Any change may move the artifact between collections: recount them
+    invalidate_collections()
+    refresh_documents([instance.pk])
+
+
+@receiver(post_delete, sender=Artifact)
+def recount_on_artifact_delete(sender, instance, **kwargs):
+    invalidate_collections()  # Its documents are deleted in cascade
+
+
+@receiver(post_save, sender=ArtifactImage)
+@receiver(post_delete, sender=ArtifactImage)
+@receiver(post_save, sender=AudioGuide)
+@receiver(post_delete, sender=AudioGuide)
+@receiver(post_save, sender=VideoContent)
+@receiver(post_delete, sender=VideoContent)
+def refresh_on_media_change(sender, instance, **kwargs):
+    refresh_documents([instance.artifact_id])
+
+
+@receiver(post_save, sender=Collection)
+@receiver(post_save, sender=Period)
+@receiver(post_save, sender=Culture)
+def refresh_on_reference_change(sender, instance, **kwargs):
+    if settings.ARTIFACT_READ_MODEL:
+        field = sender._meta.model_name
+        refresh_documents(
+            Artifact.objects.filter(**{field: instance}).values_list('pk', flat=True)
+        )
+
+
+@receiver(pre_delete, sender=Period)
+@receiver(pre_delete, sender=Culture)
+def refresh_on_reference_delete(sender, instance, **kwargs):
+    # Their artifacts are kept (SET NULL, without signals): list them before
+    refresh_on_reference_change(sender, instance)
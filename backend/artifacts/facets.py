@@ -0,0 +1,109 @@
+"""
+Facet counts for the artifact search (collection, period, culture, featured,
+audio guide and video availability).
+
+All facets come from one grouped aggregate over the filtered artifacts: on
+PostgreSQL a ``GROUPING SETS`` query returns each facet's counts directly;
+elsewhere the filtered set is grouped on every facet column at once and the
+counts are summed per facet in Python (at most one row per combination).
+
+Results are cached per query and language under a version number, bumped
+whenever an artifact, audio guide or video is saved or deleted and by
+``invalidate_artifact_caches``. The version lives in the shared cache
+(``CACHE_URL``), so a bump made by one worker invalidates the counts of all.
+"""
+import hashlib
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, Exists, OuterRef
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import SEARCH_VERSION_KEY, cache_versions, invalidate_search
+from .metrics import record_cache_lookup
+from .models import Artifact, AudioGuide, Collection, Culture, Period, VideoContent
+
+
+RELATED_FACETS = {'collection': Collection, 'period': Period, 'culture': Culture}
+MEDIA_FACETS = {'has_audio': AudioGuide, 'has_video': VideoContent}
+BOOLEAN_FACETS = ['is_featured', *MEDIA_FACETS]
+FACET_COLUMNS = [f'{name}_id' for name in RELATED_FACETS] + BOOLEAN_FACETS
+
+
+def has_media(name):
+    return Exists(MEDIA_FACETS[name].objects.filter(artifact=OuterRef('pk')))
+
+
+def facet_rows(queryset):
+    """Yield (column, value, count) for every facet column, in one query"""
+    rows = queryset.annotate(
+        **{name: has_media(name) for name in MEDIA_FACETS}
+    ).order_by().values(*FACET_COLUMNS)
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = rows.query.get_compiler(using=queryset.db).as_sql()
+        columns = ', '.join(FACET_COLUMNS)
+        grouping_sets = ', '.join(f'({column})' for column in FACET_COLUMNS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {columns}, GROUPING({columns}), COUNT(*) FROM ({sql}) AS filtered '
+                f'GROUP BY GROUPING SETS ({grouping_sets})',
+                params
+            )
+            last_bit = len(FACET_COLUMNS) - 1
+            for *values, grouping, count in cursor.fetchall():
+                # GROUPING() clears the bit of the column grouped on (first column = high bit)
+                index = next(i for i in range(len(FACET_COLUMNS)) if not grouping & (1 << (last_bit - i)))
+                yield FACET_COLUMNS[index], values[index], count
+        return
+
+    for row in rows.annotate(count=Count('pk')):
+        for column in FACET_COLUMNS:
+            yield column, row[column], row['count']
+
+
+def search_facets(queryset):
+    """Facet counts of ``queryset``, names in the active language"""
+    counts = defaultdict(Counter)
+    for column, value, count in facet_rows(queryset):
+        counts[column][value] += count
+
+    facets = {}
+    for name, model in RELATED_FACETS.items():
+        values = counts[f'{name}_id']
+        labels = model.objects.in_bulk([pk for pk in values if pk is not None])
+        facets[name] = [
+            {'id': pk, 'name': labels[pk].name, 'count': count}
+            for pk, count in values.most_common() if pk in labels
+        ]
+    for name in BOOLEAN_FACETS:
+        # SQLite returns 0/1, which count as False/True
+        facets[name] = {'true': counts[name][True], 'false': counts[name][False]}
+    return facets
+
+
+def cached_search_facets(queryset, params, language):
+    """search_facets cached under the normalized search parameters"""
+    query = '&'.join(f'{key}={value}' for key, value in sorted(params.items()) if value)
+    digest = hashlib.md5(query.encode()).hexdigest()
+    version = cache_versions(SEARCH_VERSION_KEY)[SEARCH_VERSION_KEY]
+    cache_key = f'search:facets:{version}:{language}:{digest}'
+    facets = cache.get(cache_key)
+    record_cache_lookup(facets is not None)
+    if facets is None:
+        facets = search_facets(queryset)
+        cache.set(cache_key, facets, settings.SEARCH_FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+@receiver(post_save, sender=Artifact)
+@receiver(post_delete, sender=Artifact)
+@receiver(post_save, sender=AudioGuide)
+@receiver(post_delete, sender=AudioGuide)
+@receiver(post_save, sender=VideoContent)
+@receiver(post_delete, sender=VideoContent)
+def invalidate_on_search_change(sender, **kwargs):
+    invalidate_search()
@@ -0,0 +1,93 @@
+"""
+Featured carousel served from cache.
+
+The featured pool (displayed artifacts with ``is_featured``, newest first) is
+serialized once per language and host and cached under a version number.
+The signal handlers below bump the version only when an artifact's
+``is_featured`` or ``is_on_display`` changes; bulk changes go through
+``invalidate_artifact_caches``. Every worker sees the bump through the shared
+cache (``CACHE_URL``), so FEATURED_CACHE_TIMEOUT is only a safety net.
+
+Rotation shows a window of ``FEATURED_COUNT`` consecutive artifacts of the
+pool that moves every hour or day, wrapping around. It is deterministic for a
+given slot (every worker serves the same selection) and every featured
+artifact gets its turn, without ``ORDER BY random()``.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import featured_cache_version, invalidate_featured
+from .metrics import record_cache_lookup
+from .models import Artifact
+from .renderers import json_ready
+from .serializers import FeaturedArtifactSerializer
+
+
+FEATURED_COUNT = 10
+# Largest pool rotated through, to bound the cached payload
+FEATURED_POOL_SIZE = 500
+ROTATIONS = {'hourly': 3600, 'daily': 86400}
+
+
+def featured_pool_key(version, language, host):
+    return f'featured:pool:{version}:{language}:{host}'
+
+
+def build_featured_pool(request):
+    """JSON-ready payloads of the featured pool, in the active language"""
+    artifacts = Artifact.objects.filter(
+        is_on_display=True, is_featured=True
+    ).select_related('collection').order_by('-created_at')[:FEATURED_POOL_SIZE]
+    data = FeaturedArtifactSerializer(artifacts, many=True, context={'request': request}).data
+    return json_ready(data)
+
+
+def featured_pool(request, language):
+    """JSON-ready payloads of the whole featured pool, from cache"""
+    cache_key = featured_pool_key(featured_cache_version(), language, request.get_host())
+    pool = cache.get(cache_key)
+    record_cache_lookup(pool is not None)
+    if pool is None:
+        pool = build_featured_pool(request)
+        cache.set(cache_key, pool, settings.FEATURED_CACHE_TIMEOUT)
+    return pool
+
+
+def rotate(pool, rotation=None, now=None):
+    """The FEATURED_COUNT artifacts shown during the current hour or day"""
+    if not rotation or len(pool) <= FEATURED_COUNT:
+        return pool[:FEATURED_COUNT]
+    slot = int((now or timezone.now()).timestamp()) // ROTATIONS[rotation]
+    start = slot * FEATURED_COUNT % len(pool)
+    return (pool[start:] + pool[:start])[:FEATURED_COUNT]
+
+
+def featured_state(instance):
+    # Read from __dict__: deferred fields must not trigger a query per instance
+    return instance.__dict__.get('is_featured'), instance.__dict__.get('is_on_display')
+
+
+@receiver(post_init, sender=Artifact)
+def remember_featured_state(sender, instance, **kwargs):
+    instance._featured_state = featured_state(instance)
+
+
+@receiver(post_save, sender=Artifact)
+def invalidate_on_featured_change(sender, instance, created, **kwargs):
+    state = featured_state(instance)
+    if created:
+        changed = all(state)
+    else:
+        changed = None not in state and state != instance._featured_state
+    if changed:
+        invalidate_featured()
+    instance._featured_state = state
+
+
+@receiver(post_delete, sender=Artifact)
+def invalidate_on_featured_delete(sender, instance, **kwargs):
+    if all(featured_state(instance)):
+        invalidate_featured()
@@ -0,0 +1,130 @@
+"""
+Home page payload in one request (``/api/home/?lang=``).
+
+The page shows the featured carousel, the largest collections, headline
+stats and trending artifacts. Each part is a cached fragment with its own
+lifetime and invalidation, so a change to one never recomputes the others:
+
+- ``featured``: the featured pool of ``featured.py`` (same cache entries as
+  ``/api/artifacts/featured/``), invalidated when an artifact's featured or
+  display flag changes, rotated per request;
+- ``collections``: invalidated when a collection or an artifact is saved or
+  deleted (see ``documents.py``), refreshed every HOME_COLLECTIONS_CACHE_TIMEOUT;
+- ``stats``: shared by every language, refreshed every STATS_CACHE_TIMEOUT;
+- ``trending``: short-lived (HOME_TRENDING_CACHE_TIMEOUT), every visit moves it.
+
+Fragments and their version keys live in the shared cache (``CACHE_URL``):
+an invalidation made by the worker handling an edit is seen by all of them.
+A warm request makes two cache round trips (the version keys, then every
+fragment with ``get_many``) and no query. It is a plain Django view returning
+the JSON-ready fragments as they are, without DRF's negotiation and
+serializers.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import translation
+from django.views.decorators.http import require_GET
+
+from .async_views import api_response, displayed_artifacts
+from .caching import COLLECTIONS_VERSION_KEY, FEATURED_VERSION_KEY, cache_versions, invalidate_collections
+from .db_routers import replica_reads
+from .featured import ROTATIONS, build_featured_pool, featured_pool_key, rotate
+from .metrics import record_cache_lookup
+from .models import Collection, Culture, MuseumVisit
+from .renderers import json_ready
+from .serializers import ArtifactListSerializer, CollectionSerializer
+from .trending import trending
+
+
+HOME_COLLECTIONS_COUNT = 6
+HOME_TRENDING_COUNT = 6
+
+
+def build_collections(request):
+    """Collections with the most displayed artifacts"""
+    collections = Collection.objects.annotate(
+        displayed_artifact_count=Count('artifacts', filter=Q(artifacts__is_on_display=True))
+    ).order_by('-displayed_artifact_count', 'created_at')[:HOME_COLLECTIONS_COUNT]
+    return json_ready(CollectionSerializer(collections, many=True, context={'request': request}).data)
+
+
+def build_stats(request):
+    return {
+        'total_artifacts': displayed_artifacts().count(),
+        'total_collections': Collection.objects.count(),
+        'total_cultures': Culture.objects.count(),
+        'featured_artifacts': displayed_artifacts().filter(is_featured=True).count(),
+        # Exact, like /api/stats/: computed once per STATS_CACHE_TIMEOUT
+        'total_visits': MuseumVisit.objects.count(),
+    }
+
+
+def build_trending(request):
+    top = trending(HOME_TRENDING_COUNT)
+    data = json_ready(ArtifactListSerializer(
+        [artifact for artifact, _ in top], many=True, context={'request': request}
+    ).data)
+    for item, (_, score) in zip(data, top):
+        item['trending_score'] = round(score, 3)
+    return data
+
+
+def fragment_keys(request, language):
+    versions = cache_versions(FEATURED_VERSION_KEY, COLLECTIONS_VERSION_KEY)
+    host = request.get_host()
+    return {
+        'featured': featured_pool_key(versions[FEATURED_VERSION_KEY], language, host),
+        'collections': f'home:collections:{versions[COLLECTIONS_VERSION_KEY]}:{language}:{host}',
+        'stats': 'home:stats',
+        'trending': f'home:trending:{language}:{host}',
+    }
+
+
+FRAGMENTS = {
+    'featured': (build_featured_pool, 'FEATURED_CACHE_TIMEOUT'),
+    'collections': (build_collections, 'HOME_COLLECTIONS_CACHE_TIMEOUT'),
+    'stats': (build_stats, 'STATS_CACHE_TIMEOUT'),
+    'trending': (build_trending, 'HOME_TRENDING_CACHE_TIMEOUT'),
+}
+
+
+def home_payload(request, language):
+    """Every fragment, from cache, building and caching the missing ones"""
+    keys = fragment_keys(request, language)
+    cached = cache.get_many(keys.values())
+    payload = {}
+    for name, key in keys.items():
+        data = cached.get(key)
+        record_cache_lookup(data is not None)
+        if data is None:
+            build, timeout_setting = FRAGMENTS[name]
+            with translation.override(language):
+                data = build(request)
+            cache.set(key, data, getattr(settings, timeout_setting))
+        payload[name] = data
+    return payload
+
+
+@replica_reads
+@require_GET
+def home_view(request):
+    languages = [code for code, _ in settings.LANGUAGES]
+    language = request.GET.get('lang') or translation.get_language()
+    if language not in languages:
+        return api_response({'error': f"lang must be one of {', '.join(languages)}"}, status=400)
+    rotation = request.GET.get('rotation', settings.FEATURED_ROTATION) or None
+    if rotation not in (None, *ROTATIONS):
+        return api_response({'error': 'rotation must be hourly or daily'}, status=400)
+
+    payload = home_payload(request, language)
+    payload['featured'] = rotate(payload['featured'], rotation)
+    return api_response(payload)
+
+
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+def invalidate_on_collection_change(sender, **kwargs):
+    invalidate_collections()
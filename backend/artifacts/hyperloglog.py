@@ -0,0 +1,124 @@
+"""
+HyperLogLog cardinality sketches (Flajolet et al., 2007).
+
+A sketch of precision ``p`` keeps ``m = 2**p`` one-byte registers and
+estimates the number of distinct values added to it with a relative standard
+error of ``1.04 / sqrt(m)``: about 2.3% at the default ``p = 11``, i.e. the
+estimate is within ±4.6% of the exact count 95% of the time. Small
+cardinalities use linear counting and are nearly exact. Sketches of the same
+precision merge losslessly (register-wise max), so the union of any set of
+days, artifacts or languages is estimated in constant memory.
+
+Serialized sketches are zlib-compressed: a day with a handful of visitors
+takes a few dozen bytes instead of ``m``.
+"""
+import hashlib
+import math
+import zlib
+
+
+DEFAULT_PRECISION = 11
+
+
+def high_bits(size):
+    return int.from_bytes(b'\x80' * size, 'big')
+
+
+def bytewise_max(ours, theirs, high):
+    """
+    Byte-wise max of two register arrays packed as big integers.
+
+    Registers never exceed 0x7f, so the high bit of each byte of
+    ``(ours | 0x8080..) - theirs`` is set exactly where ours >= theirs.
+    """
+    keep = ((((ours | high) - theirs) & high) >> 7) * 0xff
+    return (ours & keep) | (theirs & ~keep)
+
+
+class HyperLogLog:
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << precision)
+
+    @property
+    def standard_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value):
+        """Add a value, returning whether the sketch changed"""
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remainder = hashed & ((1 << remaining_bits) - 1)
+        # Position of the leftmost 1 bit in the remaining bits
+        rank = remaining_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other):
+        """Union in place with another sketch of the same precision"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precisions")
+        size = len(self.registers)
+        merged = bytewise_max(
+            int.from_bytes(self.registers, 'big'), int.from_bytes(other.registers, 'big'),
+            high_bits(size)
+        )
+        self.registers = bytearray(merged.to_bytes(size, 'big'))
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        empty = self.registers.count(0)
+        if estimate <= 2.5 * m and empty:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / empty)
+        return round(estimate)
+
+    def to_bytes(self):
+        return zlib.compress(bytes([self.precision]) + bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data):
+        raw = zlib.decompress(bytes(data))
+        return cls(raw[0], raw[1:])
+
+    @classmethod
+    def union(cls, sketches, precision=DEFAULT_PRECISION):
+        result = cls(precision)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+
+class SketchUnion:
+    """Union of serialized sketches, accumulated without building each one"""
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.precision = precision
+        self.size = 1 << precision
+        self.high = high_bits(self.size)
+        self.registers = 0
+
+    def add(self, data):
+        raw = zlib.decompress(data)
+        if raw[0] != self.precision:
+            raise ValueError("Cannot merge sketches of different precisions")
+        self.registers = bytewise_max(self.registers, int.from_bytes(raw[1:], 'big'), self.high)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precisions")
+        self.registers = bytewise_max(self.registers, other.registers, self.high)
+
+    def sketch(self):
+        return HyperLogLog(self.precision, self.registers.to_bytes(self.size, 'big'))
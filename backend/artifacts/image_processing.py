@@ -0,0 +1,47 @@
+"""
+Image validation run in worker processes by the media import.
+
+Only Pillow is used here, never Django: the module is imported by the
+process pool workers and must stay cheap and side-effect free.
+"""
+from pathlib import Path
+
+from PIL import Image, UnidentifiedImageError
+
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'TIFF'}
+
+
+def process_image(path, thumbnail_size=None):
+    """
+    Validate the image at ``path`` and optionally write a JPEG thumbnail next
+    to it. Returns a dict with ``error`` set when the file is rejected.
+    """
+    try:
+        with Image.open(path) as image:
+            image_format = image.format
+            image.verify()  # Detects truncated and corrupt files
+        if image_format not in ALLOWED_FORMATS:
+            return {'error': f"unsupported format {image_format}"}
+
+        # verify() leaves the image unusable: reopen it to decode the pixels
+        with Image.open(path) as image:
+            width, height = image.size
+            thumbnail_path = None
+            if thumbnail_size:
+                image.thumbnail((thumbnail_size, thumbnail_size))
+                thumbnail_path = str(Path(path).with_suffix('.thumb.jpg'))
+                image.convert('RGB').save(thumbnail_path, format='JPEG', quality=80)
+    except UnidentifiedImageError:
+        return {'error': "not a recognized image"}
+    except Image.DecompressionBombError:
+        return {'error': "image too large (decompression bomb)"}
+    except (OSError, ValueError, SyntaxError) as e:
+        return {'error': f"invalid image: {e}"}
+    return {
+        'error': None,
+        'format': image_format,
+        'width': width,
+        'height': height,
+        'thumbnail_path': thumbnail_path,
+    }
@@ -0,0 +1,131 @@
+"""
+Background regeneration of artifact media (QR codes, thumbnails).
+
+Admin actions record an ``ArtifactJob`` and run it in a daemon thread, batch
+by batch, updating its progress after each batch; the job list in the admin
+shows how far it got. On serverless deployments no thread outlives the
+request: jobs stay pending until ``manage.py run_artifact_jobs`` picks them up.
+
+Every progress update also bumps ``updated_at``. A running job whose
+heartbeat is older than ARTIFACT_JOB_STALE_SECONDS lost its thread (restart,
+crash); ``run_artifact_jobs`` puts it back to pending and resumes it after
+the last recorded batch.
+"""
+from datetime import timedelta
+
+import logging
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .caching import invalidate_artifact_caches
+from .documents import refresh_documents
+from .models import Artifact, ArtifactJob
+
+
+logger = logging.getLogger('artifacts.jobs')
+
+JOB_BATCH_SIZE = 100
+
+
+def replace_file(artifact, field, generate):
+    """Generate a new file for ``field``, deleting the old one once it succeeded"""
+    old_name = getattr(artifact, field).name
+    if not generate():
+        return False
+    new_file = getattr(artifact, field)
+    if old_name and old_name != new_file.name:
+        new_file.storage.delete(old_name)
+    return True
+
+
+def regenerate_qr_code(artifact):
+    def generate():
+        artifact.generate_qr_code()
+        return True
+    return replace_file(artifact, 'qr_code', generate)
+
+
+def regenerate_thumbnail(artifact):
+    return bool(artifact.main_image) and replace_file(
+        artifact, 'main_image_thumbnail', artifact.generate_thumbnail
+    )
+
+
+JOB_TASKS = {
+    'qr_codes': (regenerate_qr_code, 'qr_code'),
+    'thumbnails': (regenerate_thumbnail, 'main_image_thumbnail'),
+}
+
+
+def start_job(kind, queryset, user=''):
+    """Record a job over the artifacts of ``queryset`` and start it unless serverless"""
+    artifact_ids = [str(pk) for pk in queryset.values_list('pk', flat=True)]
+    job = ArtifactJob.objects.create(
+        kind=kind, artifact_ids=artifact_ids, total=len(artifact_ids), user=user
+    )
+    if not settings.SERVERLESS:
+        threading.Thread(target=run_job_in_thread, args=(job.pk,), daemon=True).start()
+    return job
+
+
+def run_job_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+
+def requeue_stale_jobs(stale_seconds=None):
+    """Put running jobs without a recent heartbeat back to pending; returns their number"""
+    if stale_seconds is None:
+        stale_seconds = settings.ARTIFACT_JOB_STALE_SECONDS
+    now = timezone.now()
+    return ArtifactJob.objects.filter(
+        status='running', updated_at__lt=now - timedelta(seconds=stale_seconds)
+    ).update(status='pending', updated_at=now)
+
+
+def run_job(job_id):
+    """Run a pending job from its last recorded batch; returns False if another worker already claimed it"""
+    claimed = ArtifactJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', updated_at=timezone.now()
+    )
+    if not claimed:
+        return False
+    job = ArtifactJob.objects.get(pk=job_id)
+    task, field = JOB_TASKS[job.kind]
+    # 0 for a new job; a resumed one redoes at most the batch it was in
+    processed, failed = job.processed, job.failed
+    try:
+        for offset in range(processed, job.total, JOB_BATCH_SIZE):
+            close_old_connections()
+            batch_ids = job.artifact_ids[offset:offset + JOB_BATCH_SIZE]
+            batch = Artifact.objects.in_bulk(batch_ids)
+            failed += len(batch_ids) - len(batch)  # Deleted since
+            changed = []
+            for artifact in batch.values():
+                if task(artifact):
+                    changed.append(artifact)
+                else:
+                    failed += 1
+            # One UPDATE per batch; bypasses save() and its QR code generation
+            Artifact.objects.bulk_update(changed, [field])
+            refresh_documents(artifact.pk for artifact in changed)
+            processed += len(batch_ids)
+            ArtifactJob.objects.filter(pk=job_id).update(
+                processed=processed, failed=failed, updated_at=timezone.now()
+            )
+        status, error = 'done', ''
+    except Exception:
+        logger.exception("Artifact job %s failed", job_id)
+        status, error = 'failed', traceback.format_exc()
+    ArtifactJob.objects.filter(pk=job_id).update(
+        status=status, error=error, processed=processed, failed=failed,
+        finished_at=timezone.now(), updated_at=timezone.now()
+    )
+    invalidate_artifact_caches()
+    return True
@@ -0,0 +1,104 @@
+"""
+Fast path for the artifact list: ``ArtifactListSerializer``'s output built
+straight from ``.values()`` rows.
+
+The serializer instantiates a model per row (plus its collection, period and
+culture), then runs each field through DRF, including storage URL building
+for two images. Here one ``.values()`` query reads the needed columns with
+their joins and each row becomes a dict in a single function call:
+
+- translated names are resolved from the language columns in the same order
+  and with the same fallbacks as modeltranslation's descriptor;
+- media URLs are the storage's absolute base URL, computed once per request,
+  plus the quoted file name (for ``FileSystemStorage``; other storages build
+  each URL themselves).
+
+The output is byte-identical to the serializer's (``benchmarks/list_serialization.py``
+checks it and measures both).
+"""
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+from django.utils.translation import get_language
+from modeltranslation.fields import NONE
+from modeltranslation.utils import build_localized_fieldname, fallbacks_enabled, resolution_order
+
+from .models import Artifact, Collection, Culture, Period
+
+
+class TranslatedColumns:
+    """Value of a translated field from its language columns, like its descriptor"""
+
+    def __init__(self, model, field, prefix=''):
+        descriptor = getattr(model, field)
+        default = descriptor.field.get_default()
+        self.undefined = default if descriptor.fallback_undefined is NONE else descriptor.fallback_undefined
+        if fallbacks_enabled() and descriptor.fallback_value is not NONE:
+            self.default = descriptor.fallback_value
+        else:
+            self.default = default
+        self.columns = [
+            prefix + build_localized_fieldname(field, language)
+            for language in resolution_order(get_language(), descriptor.fallback_languages)
+        ]
+
+    def resolve(self, row):
+        for column in self.columns:
+            value = row[column]
+            if value is not None and value != self.undefined:
+                return value
+        return self.default
+
+
+def media_url(field, request):
+    """Function of a file name returning what DRF's FileField renders for it"""
+    storage = Artifact._meta.get_field(field).storage
+    if isinstance(storage, FileSystemStorage):
+        prefix = storage.base_url
+        if request is not None:
+            prefix = request.build_absolute_uri(prefix)
+        return lambda name: prefix + filepath_to_uri(name).lstrip('/')
+    if request is not None:
+        return lambda name: request.build_absolute_uri(storage.url(name))
+    return storage.url
+
+
+class ArtifactListRows:
+    """Build ArtifactListSerializer's payloads from .values() rows"""
+
+    def __init__(self, request):
+        self.name = TranslatedColumns(Artifact, 'name')
+        self.collection_name = TranslatedColumns(Collection, 'name', 'collection__')
+        self.period_name = TranslatedColumns(Period, 'name', 'period__')
+        self.culture_name = TranslatedColumns(Culture, 'name', 'culture__')
+        self.qr_code_url = media_url('qr_code', request)
+        self.main_image_url = media_url('main_image', request)
+
+    def values(self, queryset):
+        return queryset.values(
+            'id', 'inventory_number', 'qr_code', 'main_image', 'period_id', 'culture_id',
+            'is_featured', 'is_on_display',
+            *self.name.columns, *self.collection_name.columns,
+            *self.period_name.columns, *self.culture_name.columns,
+        )
+
+    def render(self, rows):
+        return [self.render_row(row) for row in rows]
+
+    def render_row(self, row):
+        # Key order of ArtifactListSerializer.Meta.fields
+        data = {
+            'id': str(row['id']),
+            'inventory_number': row['inventory_number'],
+            'qr_code': self.qr_code_url(row['qr_code']) if row['qr_code'] else None,
+            'name': self.name.resolve(row),
+            'main_image': self.main_image_url(row['main_image']) if row['main_image'] else None,
+            'collection_name': self.collection_name.resolve(row),
+        }
+        # Like the serializer, omit the name of a missing period or culture
+        if row['period_id'] is not None:
+            data['period_name'] = self.period_name.resolve(row)
+        if row['culture_id'] is not None:
+            data['culture_name'] = self.culture_name.resolve(row)
+        data['is_featured'] = row['is_featured']
+        data['is_on_display'] = row['is_on_display']
+        return data
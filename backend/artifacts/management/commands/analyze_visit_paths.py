@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from artifacts.paths import analyze_paths
+
+
+class Command(BaseCommand):
+    """
+    Recompute the visitor path aggregates served by /api/stats/paths/.
+
+    Visits are streamed through a server-side cursor, so the whole log can be
+    analyzed in bounded memory; point ``--database`` at a replica to keep the
+    scan off the primary. Server-side cursors are disabled on serverless
+    deployments: run it from a regular host.
+    """
+    help = "Analyze visitor paths (transitions, dwell times, drop-offs) over the visit log"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help="Days analyzed, ending now (0 for all visits)")
+        parser.add_argument('--chunk-size', type=int, default=10000, help="Rows fetched per round trip")
+        parser.add_argument('--database', default='default', help="Database read from")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['chunk_size'] < 1:
+            raise CommandError("--days must be positive and --chunk-size at least 1")
+        end = timezone.now()
+        start = end - timedelta(days=options['days']) if options['days'] else None
+
+        def progress(visits):
+            if visits % (options['chunk_size'] * 100) == 0:
+                self.stdout.write(f"  {visits} visits analyzed")
+
+        summary = analyze_paths(
+            start, end, using=options['database'], chunk_size=options['chunk_size'], progress=progress
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Analyzed {summary.visits} visits in {summary.sessions} sessions"
+        ))
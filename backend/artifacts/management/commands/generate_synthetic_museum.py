@@ -0,0 +1,404 @@
+import math
+import random
+import string
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from artifacts.aggregates import rollup_visits
+from artifacts.documents import rebuild_documents
+from artifacts.trending import rebuild_trending
+from artifacts.models import (
+    Period, Culture, Collection, Artifact, AudioGuide, VideoContent, MuseumVisit
+)
+
+
+LANGUAGES = ('fr', 'en', 'wo')
+LANGUAGE_WEIGHTS = (60, 28, 12)
+
+PERIODS = [
+    # (fr, en, wo, start_year, end_year)
+    ("Égypte Ancienne", "Ancient Egypt", "Misra bu yàgg", -3100, -30),
+    ("Royaume de Koush", "Kingdom of Kush", "Nguur gu Kush", -1070, 350),
+    ("Culture Nok", "Nok Culture", "Aada Nok", -1500, 500),
+    ("Royaume d'Aksoum", "Kingdom of Aksum", "Nguur gu Aksum", 100, 940),
+    ("Royaume de Ghana", "Kingdom of Ghana", "Nguur gu Ghana", 300, 1200),
+    ("Ifè classique", "Classical Ife", "Ife bu yàgg", 1000, 1400),
+    ("Empire du Mali", "Mali Empire", "Nguur gu Mali", 1230, 1600),
+    ("Grand Zimbabwe", "Great Zimbabwe", "Zimbabwe bu mag", 1100, 1450),
+    ("Empire Songhaï", "Songhai Empire", "Nguur gu Songhay", 1430, 1591),
+    ("Royaume du Bénin", "Kingdom of Benin", "Nguur gu Benin", 1180, 1897),
+    ("Royaume du Kongo", "Kingdom of Kongo", "Nguur gu Kongo", 1390, 1914),
+    ("Empire du Jolof", "Jolof Empire", "Nguur gu Jolof", 1350, 1549),
+    ("Empire Ashanti", "Ashanti Empire", "Nguur gu Asante", 1701, 1901),
+    ("Période coloniale", "Colonial period", "Jamono tubaab", 1885, 1960),
+    ("Indépendances", "Independence era", "Jamono moom-sa-réew", 1960, 1990),
+    ("Art contemporain", "Contemporary art", "Njaxas tey", 1990, 2025),
+]
+
+CULTURES = [
+    ("Wolof", "Wolof", "Wolof"), ("Sérère", "Serer", "Sereer"),
+    ("Peul", "Fula", "Pël"), ("Diola", "Jola", "Joola"),
+    ("Mandingue", "Mandinka", "Mandinka"), ("Soninké", "Soninke", "Sooninke"),
+    ("Bambara", "Bambara", "Bambara"), ("Dogon", "Dogon", "Dogon"),
+    ("Yoruba", "Yoruba", "Yoruba"), ("Igbo", "Igbo", "Igbo"),
+    ("Edo", "Edo", "Edo"), ("Akan", "Akan", "Akan"),
+    ("Baoulé", "Baule", "Bawule"), ("Fon", "Fon", "Fon"),
+    ("Haoussa", "Hausa", "Awsa"), ("Touareg", "Tuareg", "Tuareg"),
+    ("Kongo", "Kongo", "Kongo"), ("Zoulou", "Zulu", "Sulu"),
+    ("Makondé", "Makonde", "Makonde"), ("Amhara", "Amhara", "Amara"),
+]
+
+OBJECTS = [
+    # (fr, en, wo)
+    ("Masque", "Mask", "Mask"), ("Statuette", "Figurine", "Nataal bu ndaw"),
+    ("Tabouret", "Stool", "Toogu"), ("Tambour", "Drum", "Tama"),
+    ("Collier", "Necklace", "Caaxaan"), ("Bracelet", "Bracelet", "Lam"),
+    ("Tissu", "Textile", "Malaan"), ("Calebasse", "Calabash", "Lakk"),
+    ("Poterie", "Pottery", "Ndaa"), ("Sceptre", "Sceptre", "Yetu buur"),
+    ("Plaque", "Plaque", "Xeer"), ("Coiffe", "Headdress", "Mbaxana"),
+    ("Kora", "Kora", "Kora"), ("Peigne", "Comb", "Yeer"),
+    ("Poids à peser l'or", "Gold weight", "Natt wurus"), ("Manuscrit", "Manuscript", "Téere"),
+]
+
+QUALIFIERS = [
+    ("cérémoniel", "ceremonial", "bu xew"), ("royal", "royal", "bu buur"),
+    ("funéraire", "funerary", "bu dee"), ("d'initiation", "initiation", "bu ndaw yi"),
+    ("de divination", "divination", "bu gisaane"), ("de prestige", "prestige", "bu tedd"),
+    ("de danse", "dance", "bu fecc"), ("votif", "votive", "bu sarax"),
+]
+
+MATERIALS = [
+    ("bois", "wood", "garab"), ("bronze", "bronze", "xànjar"),
+    ("terre cuite", "terracotta", "ban bu ñu lakk"), ("ivoire", "ivory", "bëñu ñay"),
+    ("coton", "cotton", "wittén"), ("or", "gold", "wurus"),
+    ("fer forgé", "wrought iron", "weñ"), ("perles de verre", "glass beads", "per"),
+    ("raphia", "raffia", "raafi"), ("cuir", "leather", "der"),
+]
+
+TECHNIQUES = [
+    ("sculpture", "carving", "sëgg"), ("fonte à la cire perdue", "lost-wax casting", "tooyal xànjar"),
+    ("tissage", "weaving", "ràbb"), ("modelage", "modelling", "tabax ban"),
+    ("forge", "forging", "tëgg"), ("broderie", "embroidery", "ñaw"),
+]
+
+SENTENCES = {
+    'fr': [
+        "Cet objet {obj} provient de la culture {culture}.",
+        "Il était utilisé lors des cérémonies de la communauté.",
+        "Sa surface porte des motifs géométriques finement exécutés.",
+        "Les anciens le transmettaient de génération en génération.",
+        "Il témoigne des échanges commerciaux à travers le Sahel.",
+        "Sa patine révèle un long usage rituel.",
+    ],
+    'en': [
+        "This {obj} comes from the {culture} culture.",
+        "It was used during community ceremonies.",
+        "Its surface bears finely executed geometric patterns.",
+        "Elders passed it down from generation to generation.",
+        "It bears witness to trade across the Sahel.",
+        "Its patina reveals long ritual use.",
+    ],
+    'wo': [
+        "{obj} bii jóge na ci aada {culture}.",
+        "Dañu ko daan jëfandikoo ci xew yi.",
+        "Am na ay rëdd yu rafet ci kaw am.",
+        "Mag ñi dañu ko daan donnal seeni doom.",
+        "Mu ngi wone njaay ak jënd ci Saheel.",
+        "Melokaanam dafa wone ni ñu ko jëfandikoo lu yàgg.",
+    ],
+}
+
+# Opening hours weights (9h-19h) and weekday weights (Mon..Sun, closed Monday)
+HOUR_WEIGHTS = [0] * 9 + [4, 7, 9, 8, 6, 7, 9, 10, 8, 5] + [0] * 5
+WEEKDAY_WEIGHTS = [0, 8, 8, 9, 10, 14, 13]
+
+SYNTHETIC_PREFIX = 'SYN-'
+SYNTHETIC_CURATOR = 'Synthetic'
+
+
+def insert_rows(using, model, rows, batch_size):
+    """
+    Multi-row INSERT of plain dicts, bypassing save() and auto_now(_add).
+
+    bulk_create() would overwrite visited_at/created_at with the current time,
+    which defeats the purpose of a dataset spread over months.
+    """
+    connection = connections[using]
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not (field.primary_key and field.get_internal_type() in ('AutoField', 'BigAutoField'))
+    ]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    max_params = connection.features.max_query_params or 65535
+    batch_size = max(1, min(batch_size, max_params // len(fields)))
+    table = connection.ops.quote_name(model._meta.db_table)
+
+    count = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = []
+            for row in batch:
+                for field in fields:
+                    value = row.get(field.attname, row.get(field.name))
+                    if value is None and field.name not in row and field.attname not in row:
+                        value = field.get_default()
+                    params.append(field.get_db_prep_save(value, connection))
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES ' + ', '.join([placeholders] * len(batch)),
+                params
+            )
+            count += len(batch)
+    return count
+
+
+class Command(BaseCommand):
+    help = "Bulk-create a large synthetic multilingual museum dataset for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--artifacts', type=int, default=50000)
+        parser.add_argument('--collections', type=int, default=500)
+        parser.add_argument('--visits', type=int, default=1000000,
+                            help="MuseumVisit rows (e.g. 20000000 for a production-scale log)")
+        parser.add_argument('--days', type=int, default=365, help="Time span of the visit log")
+        parser.add_argument('--media-ratio', type=float, default=0.3,
+                            help="Share of artifacts with audio guides (a third of that get videos)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--flush', action='store_true',
+                            help="Delete existing synthetic data first")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['flush']:
+            self.flush()
+        elif Artifact.objects.using(self.using).filter(
+            inventory_number__startswith=SYNTHETIC_PREFIX
+        ).exists():
+            raise CommandError("Synthetic data already exists, use --flush to regenerate it.")
+
+        with transaction.atomic(using=self.using):
+            periods = self.create_periods()
+            cultures = self.create_cultures()
+            collections = self.create_collections(options['collections'])
+            artifact_ids = self.create_artifacts(
+                options['artifacts'], collections, periods, cultures
+            )
+            self.create_media(artifact_ids, options['media_ratio'])
+        if settings.ARTIFACT_READ_MODEL:
+            documents = rebuild_documents(artifact_ids, using=self.using)
+            self.stdout.write(f"Rendered {documents} artifact documents")
+        self.create_visits(artifact_ids, options['visits'], options['days'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Synthetic museum generated in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def flush(self):
+        artifacts = Artifact.objects.using(self.using).filter(
+            inventory_number__startswith=SYNTHETIC_PREFIX
+        )
+        visits = MuseumVisit.objects.using(self.using).filter(artifact__in=artifacts)
+        # _raw_delete skips the per-row cascade collection on millions of visits
+        deleted = visits._raw_delete(self.using)
+        artifacts.delete()
+        Collection.objects.using(self.using).filter(curator=SYNTHETIC_CURATOR).delete()
+        self.stdout.write(f"Flushed synthetic data ({deleted} visits)")
+
+    def create_periods(self):
+        periods = []
+        for name_fr, name_en, name_wo, start, end in PERIODS:
+            period, _ = Period.objects.using(self.using).get_or_create(
+                name_fr=name_fr,
+                defaults={
+                    'name': name_fr, 'name_en': name_en, 'name_wo': name_wo,
+                    'start_year': start, 'end_year': end,
+                },
+            )
+            periods.append(period.pk)
+        return periods
+
+    def create_cultures(self):
+        cultures = []
+        for name_fr, name_en, name_wo in CULTURES:
+            culture, _ = Culture.objects.using(self.using).get_or_create(
+                name_fr=name_fr,
+                defaults={'name': name_fr, 'name_en': name_en, 'name_wo': name_wo},
+            )
+            cultures.append((culture.pk, (name_fr, name_en, name_wo)))
+        return cultures
+
+    def create_collections(self, count):
+        rows = []
+        for index in range(count):
+            obj = self.rng.choice(OBJECTS)
+            material = self.rng.choice(MATERIALS)
+            culture = self.rng.choice(CULTURES)
+            names = {
+                'fr': f"{obj[0]}s en {material[0]} — salle {index + 1}",
+                'en': f"{material[1].capitalize()} {obj[1].lower()}s — room {index + 1}",
+                'wo': f"{obj[2]} yu {material[2]} — néeg {index + 1}",
+            }
+            rows.append(Collection(
+                name=names['fr'], curator=SYNTHETIC_CURATOR,
+                **{f'name_{lang}': names[lang] for lang in LANGUAGES},
+                **{f'curator_{lang}': SYNTHETIC_CURATOR for lang in LANGUAGES},
+                **{f'description_{lang}': self.paragraph(lang, obj, culture) for lang in LANGUAGES},
+            ))
+        created = Collection.objects.using(self.using).bulk_create(rows, batch_size=self.batch_size)
+        self.stdout.write(f"Created {len(created)} collections")
+        return [collection.pk for collection in created]
+
+    def create_artifacts(self, count, collections, periods, cultures):
+        now = datetime.now(dt_timezone.utc)
+        artifact_ids = []
+        rows = []
+        for index in range(count):
+            artifact_id = uuid.UUID(int=self.rng.getrandbits(128), version=4)
+            obj = self.rng.choice(OBJECTS)
+            qualifier = self.rng.choice(QUALIFIERS)
+            material = self.rng.choice(MATERIALS)
+            technique = self.rng.choice(TECHNIQUES)
+            culture_id, culture_names = self.rng.choice(cultures)
+            created_at = now - timedelta(days=self.rng.uniform(0, 5 * 365))
+            row = {
+                'id': artifact_id,
+                'inventory_number': f"{SYNTHETIC_PREFIX}{index + 1:07d}",
+                'dimensions': f"{self.rng.randint(5, 180)} x {self.rng.randint(5, 90)} cm",
+                'weight': f"{self.rng.uniform(0.1, 40):.1f} kg",
+                'collection_id': self.rng.choice(collections),
+                'period_id': self.rng.choice(periods),
+                'culture_id': culture_id,
+                'main_image': f"artifacts/synthetic/{index % 200:03d}.jpg",
+                'qr_code': None,
+                'acquisition_date': date(1960, 1, 1) + timedelta(days=self.rng.randint(0, 23000)),
+                'is_featured': self.rng.random() < 0.02,
+                'is_on_display': self.rng.random() < 0.85,
+                'display_location': f"Salle {self.rng.randint(1, 24)}",
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+            for lang_index, lang in enumerate(LANGUAGES):
+                culture = culture_names[lang_index]
+                row[f'name_{lang}'] = (
+                    f"{obj[lang_index]} {qualifier[lang_index]} {culture}"
+                )
+                row[f'description_{lang}'] = self.paragraph(lang, obj, culture_names)
+                row[f'historical_context_{lang}'] = self.paragraph(lang, obj, culture_names, 2)
+                row[f'technique_{lang}'] = technique[lang_index]
+                row[f'material_{lang}'] = material[lang_index]
+                row[f'acquisition_method_{lang}'] = None
+            for field in ('name', 'description', 'historical_context', 'technique', 'material'):
+                row[field] = row[f'{field}_fr']
+            rows.append(row)
+            artifact_ids.append(artifact_id)
+
+            if len(rows) >= self.batch_size:
+                insert_rows(self.using, Artifact, rows, self.batch_size)
+                rows = []
+        insert_rows(self.using, Artifact, rows, self.batch_size)
+        self.stdout.write(f"Created {len(artifact_ids)} artifacts")
+        return artifact_ids
+
+    def create_media(self, artifact_ids, ratio):
+        with_audio = self.rng.sample(artifact_ids, int(len(artifact_ids) * ratio))
+        audio_rows, video_rows = [], []
+        for artifact_id in with_audio:
+            for lang in self.rng.sample(LANGUAGES, self.rng.randint(1, 3)):
+                transcript = self.paragraph(lang, self.rng.choice(OBJECTS), self.rng.choice(CULTURES))
+                audio_rows.append(AudioGuide(
+                    artifact_id=artifact_id, language=lang,
+                    audio_file=f"audio/guides/synthetic_{lang}.mp3",
+                    duration=self.rng.randint(45, 300), narrator='Synthetic',
+                    transcript=transcript, narrator_fr='Synthetic',
+                    transcript_fr=transcript,
+                ))
+            if self.rng.random() < 1 / 3:
+                video_rows.append(VideoContent(
+                    artifact_id=artifact_id, title='Documentaire', title_fr='Documentaire',
+                    title_en='Documentary', title_wo='Wone', description='—',
+                    video_url='https://example.org/video', duration=self.rng.randint(60, 900),
+                    video_type=self.rng.choice(['documentary', 'explanation', 'interview']),
+                ))
+        AudioGuide.objects.using(self.using).bulk_create(audio_rows, batch_size=self.batch_size)
+        VideoContent.objects.using(self.using).bulk_create(video_rows, batch_size=self.batch_size)
+        self.stdout.write(f"Created {len(audio_rows)} audio guides and {len(video_rows)} videos")
+
+    def create_visits(self, artifact_ids, count, days):
+        """
+        Visits come in sessions walking a handful of artifacts, at opening
+        hours, with a long-tail popularity so a few artifacts dominate.
+        """
+        if not count:
+            return
+        # Zipf-like popularity: rank r gets weight 1 / r^0.8
+        popularity = list(artifact_ids)
+        self.rng.shuffle(popularity)
+        cumulative, total = [], 0.0
+        for rank in range(1, len(popularity) + 1):
+            total += 1 / rank ** 0.8
+            cumulative.append(total)
+
+        end = datetime.now(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+        day_starts = [end - timedelta(days=offset) for offset in range(days)]
+        day_weights = [WEEKDAY_WEIGHTS[day.weekday()] for day in day_starts]
+
+        created, rows = 0, []
+        progress_step = max(count // 20, self.batch_size)
+        next_progress = progress_step
+        while created < count:
+            session_id = ''.join(self.rng.choices(string.ascii_lowercase + string.digits, k=24))
+            language = self.rng.choices(LANGUAGES, LANGUAGE_WEIGHTS)[0]
+            day = self.rng.choices(day_starts, day_weights)[0].replace(hour=0)
+            visited_at = day + timedelta(
+                hours=self.rng.choices(range(24), HOUR_WEIGHTS)[0],
+                minutes=self.rng.uniform(0, 60),
+            )
+            for _ in range(min(self.rng.randint(1, 15), count - created)):
+                artifact_id = self.rng.choices(popularity, cum_weights=cumulative)[0]
+                duration = int(min(math.exp(self.rng.gauss(3.6, 0.8)), 1800))
+                rows.append({
+                    'session_id': session_id, 'artifact_id': artifact_id,
+                    'language': language, 'duration_seconds': duration,
+                    'visited_at': visited_at,
+                })
+                visited_at += timedelta(seconds=duration + self.rng.randint(10, 240))
+                created += 1
+            if len(rows) >= self.batch_size:
+                self.flush_visits(rows)
+                rows = []
+                if created >= next_progress:
+                    self.stdout.write(f"  {created}/{count} visits")
+                    next_progress += progress_step
+        self.flush_visits(rows)
+        self.stdout.write(f"Created {created} visits")
+
+        # Raw inserts bypass record_visit: rebuild the hourly aggregates
+        rollup_visits(
+            day_starts[-1].replace(hour=0), (end + timedelta(days=2)).replace(hour=0),
+            using=self.using
+        )
+        rebuild_trending(using=self.using)
+        self.stdout.write("Rebuilt hourly visit aggregates and trending scores")
+
+    def flush_visits(self, rows):
+        with transaction.atomic(using=self.using):
+            insert_rows(self.using, MuseumVisit, rows, self.batch_size)
+
+    def paragraph(self, lang, obj, culture_names, sentences=3):
+        lang_index = LANGUAGES.index(lang)
+        picked = self.rng.sample(SENTENCES[lang], sentences)
+        return ' '.join(picked).format(
+            obj=obj[lang_index].lower(), culture=culture_names[lang_index]
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from artifacts.models import Artifact
+
+
+class Command(BaseCommand):
+    """
+    Create the main image thumbnails shown in the admin changelist.
+
+    New uploads get theirs when saved; this backfills existing artifacts.
+    """
+    help = "Generate missing artifact thumbnails (all of them with --force)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate existing thumbnails")
+
+    def handle(self, *args, **options):
+        artifacts = Artifact.objects.exclude(main_image='').only('id', 'main_image', 'main_image_thumbnail')
+        if not options['force']:
+            artifacts = artifacts.filter(main_image_thumbnail__isnull=True)
+
+        created = failed = 0
+        for artifact in artifacts.iterator(chunk_size=500):
+            if artifact.generate_thumbnail():
+                # Only this column: leaves updated_at and the QR code alone
+                Artifact.objects.filter(pk=artifact.pk).update(
+                    main_image_thumbnail=artifact.main_image_thumbnail.name
+                )
+                created += 1
+            else:
+                failed += 1
+                self.stderr.write(f"  {artifact.pk}: unreadable image {artifact.main_image.name}")
+        self.stdout.write(self.style.SUCCESS(f"Created {created} thumbnails ({failed} failed)"))
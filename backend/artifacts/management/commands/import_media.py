@@ -0,0 +1,47 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from artifacts.media_import import MediaImportError, import_media, report_summary
+
+
+class Command(BaseCommand):
+    """
+    Attach the photos of a zip archive to artifacts by inventory number.
+
+    ``MN-1234.jpg`` becomes the main image of MN-1234 and ``MN-1234_2.jpg`` its
+    gallery image in position 2. Use it rather than the admin page for large
+    digitization campaigns, which would outlast an HTTP request.
+    """
+    help = "Import artifact photos from a zip archive named after inventory numbers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('archive', help="Zip archive of photos")
+        parser.add_argument('--replace-main', action='store_true', help="Replace existing main images")
+        parser.add_argument('--workers', type=int, help="Image validation processes")
+        parser.add_argument('--report', help="Write the per-file report to this CSV file")
+
+    def handle(self, *args, **options):
+        try:
+            report = import_media(
+                options['archive'], replace_main=options['replace_main'], workers=options['workers']
+            )
+        except (MediaImportError, OSError) as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w', newline='', encoding='utf-8') as handle:
+                writer = csv.DictWriter(handle, fieldnames=['file', 'inventory_number', 'order', 'status', 'message'])
+                writer.writeheader()
+                writer.writerows(report)
+        # Skipped files are listed with -v 2 (and always in --report)
+        shown = ('error', 'skipped') if options['verbosity'] > 1 else ('error',)
+        for line in report:
+            if line['status'] in shown:
+                self.stdout.write(f"  {line['status']:<8} {line['file']}: {line['message']}")
+
+        summary = report_summary(report)
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['main']} main images, {summary['gallery']} gallery images, "
+            f"{summary['skipped']} skipped, {summary['error']} errors"
+        ))
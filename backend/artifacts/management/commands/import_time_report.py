@@ -0,0 +1,101 @@
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# What a cold serverless instance does up to its first response
+BOOT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.test import Client
+Client(HTTP_HOST='localhost').get(sys.argv[1])
+print(f'{(time.perf_counter() - start) * 1000:.1f}')
+"""
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$')
+
+
+class Command(BaseCommand):
+    """
+    Cold-start report per settings profile.
+
+    Each run is a fresh interpreter that sets Django up and serves one request.
+    Note that ``-X importtime`` does not itemize modules loaded through
+    ``importlib.import_module`` (apps, middleware, URLconfs) themselves, only
+    what they import, so the boot time is the number to compare.
+    """
+    help = "Break down cold-start import time (python -X importtime) per settings profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', action='append', dest='profiles',
+            help="Settings module to measure (repeatable). Defaults to the full "
+                 "and the API-only profiles."
+        )
+        parser.add_argument('--top', type=int, default=15, help="Packages to list per profile")
+        parser.add_argument('--runs', type=int, default=5, help="Cold starts per profile (best is kept)")
+        parser.add_argument('--path', default='/api/', help="First request served after boot")
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'] or ['museum_api.settings', 'museum_api.settings_api']
+        results = {}
+        for profile in profiles:
+            results[profile] = self.measure(profile, options['runs'], options['path'])
+            self.report(profile, *results[profile], top=options['top'])
+
+        if len(profiles) > 1:
+            self.stdout.write(self.style.MIGRATE_HEADING("Cold start summary"))
+            baseline = results[profiles[0]][0]
+            for profile in profiles:
+                boot_ms = results[profile][0]
+                self.stdout.write(
+                    f"  {profile:<32} {boot_ms:8.1f} ms  ({boot_ms / baseline:.0%} of {profiles[0]})"
+                )
+
+    def measure(self, profile, runs, path):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': profile}
+        best = None
+        for _ in range(max(1, runs)):
+            process = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT, path],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+            )
+            if process.returncode != 0:
+                raise SystemExit(process.stderr)
+            boot_ms = float(process.stdout.strip().splitlines()[-1])
+            if best is None or boot_ms < best[0]:
+                best = (boot_ms, process.stderr)
+        boot_ms, trace = best
+        return boot_ms, self.group_by_package(trace)
+
+    def group_by_package(self, trace):
+        """Sum self import time (µs) per package, splitting django by sub-package"""
+        packages = defaultdict(int)
+        for line in trace.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if not match:
+                continue
+            parts = match.group(4).split('.')
+            if parts[:2] == ['django', 'contrib']:
+                key = '.'.join(parts[:3])
+            elif parts[0] == 'django':
+                key = '.'.join(parts[:2])
+            else:
+                key = parts[0]
+            packages[key] += int(match.group(1))
+        return packages
+
+    def report(self, profile, boot_ms, packages, top):
+        total_ms = sum(packages.values()) / 1000
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{profile}"))
+        self.stdout.write(f"  cold start to first response: {boot_ms:.1f} ms, itemized imports: {total_ms:.1f} ms")
+        ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        for package, micros in ranked:
+            self.stdout.write(f"  {micros / 1000:8.1f} ms  {package}")
@@ -0,0 +1,142 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from artifacts.db_routers import PRIMARY_DB
+from artifacts.models import Artifact, MuseumVisit, Period, TrendingScore
+from artifacts.timeline import overlaps
+
+
+def meta_index(model, *fields):
+    """Name of the Meta index of ``model`` on exactly ``fields``"""
+    for index in model._meta.indexes:
+        if tuple(index.fields) == fields:
+            return index.name
+    raise LookupError(f"{model.__name__} has no index on {fields}")
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def indexes_used(connection, queryset):
+    """
+    Names of the indexes scanned by the PostgreSQL plan of ``queryset``.
+
+    Scans of a partitioned table name the index of each partition; they are
+    mapped to the partitioned indexes they were created from as well.
+    """
+    plan = json.loads(queryset.explain(format='json'))
+    names = {node['Index Name'] for node in plan_nodes(plan[0]['Plan']) if 'Index Name' in node}
+    if not names:
+        return names
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT ancestor.relname FROM unnest(%s::text[]) AS scanned(name) "
+            "CROSS JOIN LATERAL pg_partition_ancestors(to_regclass(scanned.name)) AS parent(relid) "
+            "JOIN pg_class ancestor ON ancestor.oid = parent.relid",
+            [sorted(names)]
+        )
+        return names | {name for name, in cursor.fetchall()}
+
+
+def query_mix(using):
+    """(label, queryset, index expected in its plan) for the hot queries of the API"""
+    artifacts = Artifact.objects.using(using)
+    visits = MuseumVisit.objects.using(using)
+    collection_id = artifacts.values_list('collection_id', flat=True).first() or 0
+    artifact_id = artifacts.values_list('pk', flat=True).first()
+    session_id = visits.values_list('session_id', flat=True).first() or ''
+    now = timezone.now()
+    return [
+        (
+            "artifact list (/api/artifacts/)",
+            artifacts.filter(is_on_display=True).order_by('-created_at')[:20],
+            'artifact_displayed_recent_idx',
+        ),
+        (
+            "collection page (?collection=)",
+            artifacts.filter(is_on_display=True, collection_id=collection_id).order_by('-created_at')[:20],
+            'artifact_collection_recent_idx',
+        ),
+        (
+            "featured pool",
+            artifacts.filter(is_on_display=True, is_featured=True).order_by('-created_at')[:500],
+            'artifact_displayed_recent_idx',
+        ),
+        (
+            "visits of an artifact (admin)",
+            visits.filter(artifact_id=artifact_id).order_by('-visited_at')[:100],
+            'visit_artifact_time_idx',
+        ),
+        (
+            "visits of a session (paths)",
+            visits.filter(session_id=session_id).order_by('visited_at'),
+            meta_index(MuseumVisit, 'session_id', 'visited_at'),
+        ),
+        (
+            "visits of the last hour (aggregates)",
+            visits.filter(visited_at__gte=now - timedelta(hours=1), visited_at__lt=now),
+            meta_index(MuseumVisit, 'visited_at'),
+        ),
+        (
+            "periods overlapping a year (?year=)",
+            Period.objects.using(using).filter(overlaps(1500, 1500)),
+            'period_interval_idx',
+        ),
+        (
+            "trending top 10",
+            TrendingScore.objects.using(using).order_by('-log_score')[:10],
+            'trending_log_score_idx',
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    """
+    EXPLAIN the hot queries of the API and check that each one uses the index
+    it was designed for.
+
+    On a small database PostgreSQL rightly prefers sequential scans;
+    ``--no-seqscan`` discourages them (``enable_seqscan = off``, in a rolled
+    back transaction) to check that the indexes are usable for these query
+    shapes. ``--check`` fails when an expected index is not in a plan.
+
+    On PostgreSQL the indexes are read from the JSON plan, where the index
+    of a visit partition counts as the partitioned index it belongs to.
+    """
+    help = "Show the plans of the API's hot queries and the indexes they use"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=PRIMARY_DB)
+        parser.add_argument('--no-seqscan', action='store_true', help="PostgreSQL: disable sequential scans")
+        parser.add_argument('--check', action='store_true', help="Exit with an error if an index is not used")
+
+    def handle(self, *args, **options):
+        using = options['database']
+        connection = connections[using]
+        missing = []
+        for label, queryset, index in query_mix(using):
+            with transaction.atomic(using=using):
+                if options['no_seqscan'] and connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute("SET LOCAL enable_seqscan = off")
+                plan = queryset.explain()
+                if connection.vendor == 'postgresql':
+                    used = index in indexes_used(connection, queryset)
+                else:
+                    used = index in plan
+            if not used:
+                missing.append(label)
+            status = self.style.SUCCESS("uses") if used else self.style.ERROR("does not use")
+            self.stdout.write(f"{label}: {status} {index}")
+            if options['verbosity'] >= 2 or not used:
+                self.stdout.write('\n'.join(f"    {line}" for line in plan.splitlines()))
+
+        if missing and options['check']:
+            raise CommandError(f"{len(missing)} queries do not use their index: {', '.join(missing)}")
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from artifacts.documents import rebuild_documents
+
+
+class Command(BaseCommand):
+    """
+    Render the list and detail documents of every artifact in every language.
+
+    Run it once after enabling ARTIFACT_READ_MODEL, and after changes the
+    signal handlers cannot see (raw SQL, imports bypassing the ORM, a
+    serializer change on deploy).
+    """
+    help = "Rebuild the ArtifactDocument read model"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        documents = rebuild_documents(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {documents} artifact documents in {time.perf_counter() - started:.1f}s"
+        ))
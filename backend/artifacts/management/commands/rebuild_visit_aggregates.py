@@ -0,0 +1,49 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from artifacts.aggregates import rollup_visits
+from artifacts.models import MuseumVisit
+from artifacts.partitions import add_months, month_start
+
+
+class Command(BaseCommand):
+    """
+    Recompute the hourly visit aggregates from the raw visit log, month by month.
+
+    Only months still present in the log are rebuilt, so the aggregates of
+    archived months (see ``visit_partitions``) are kept.
+    """
+    help = "Rebuild VisitAggregate from MuseumVisit (after imports or to repair drift)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="First month to rebuild (YYYY-MM), defaults to the oldest visit")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        oldest = MuseumVisit.objects.using(using).order_by('visited_at').values_list(
+            'visited_at', flat=True
+        ).first()
+        if oldest is None:
+            self.stdout.write("No visits to aggregate.")
+            return
+
+        month = month_start(oldest)
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m').replace(tzinfo=dt_timezone.utc)
+            except ValueError:
+                raise CommandError("--since must be formatted as YYYY-MM")
+            month = max(month, since)
+
+        last_month = month_start(timezone.now())
+        newest = MuseumVisit.objects.using(using).order_by('-visited_at').values_list(
+            'visited_at', flat=True
+        ).first()
+        last_month = max(last_month, month_start(newest))
+        while month <= last_month:
+            visits = rollup_visits(month, add_months(month, 1), using=using)
+            self.stdout.write(f"{month:%Y-%m}: {visits} visits aggregated")
+            month = add_months(month, 1)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from artifacts.jobs import requeue_stale_jobs, run_job
+from artifacts.models import ArtifactJob
+
+
+class Command(BaseCommand):
+    """
+    Run the pending bulk media jobs started from the artifact admin.
+
+    Needed on serverless deployments, where admin actions only record the
+    job; elsewhere it resumes the jobs left behind by a restart. Running
+    jobs whose progress has not moved for ``--stale-seconds`` lost their
+    thread: they are put back to pending and resumed where they stopped.
+    """
+    help = "Run pending artifact jobs (QR codes, thumbnails) and resume stale ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-seconds', type=int, default=settings.ARTIFACT_JOB_STALE_SECONDS,
+            help="Resume running jobs without progress for this long (default: ARTIFACT_JOB_STALE_SECONDS)"
+        )
+
+    def handle(self, *args, **options):
+        stale = requeue_stale_jobs(options['stale_seconds'])
+        if stale:
+            self.stdout.write(f"Resuming {stale} stale running job(s).")
+        pending = list(ArtifactJob.objects.filter(status='pending').order_by('created_at'))
+        for job in pending:
+            if run_job(job.pk):
+                job.refresh_from_db()
+                self.stdout.write(
+                    f"{job}: {job.get_status_display()} ({job.failed} failed)"
+                )
+        if not pending:
+            self.stdout.write("No pending jobs.")
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+
+from artifacts.models import SlowQuery
+from artifacts.slow_queries import trim_slow_queries
+
+
+class Command(BaseCommand):
+    """
+    Top offenders of the slow-query log, grouped by normalized statement.
+
+    Statements are ranked by total time spent, with the views that issued them
+    and, with ``--explain``, the latest captured PostgreSQL plan. The log is
+    first trimmed to the latest SLOW_QUERY_MAX_STORED rows (the request path
+    only inserts), so run this periodically, with ``--trim-only`` from cron.
+    """
+    help = "Summarize the slow-query log (top statements by total time)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help="Statements to list")
+        parser.add_argument('--hours', type=float, help="Only queries logged in the last N hours")
+        parser.add_argument('--view', help="Only queries issued by this view (e.g. ArtifactViewSet.search)")
+        parser.add_argument('--explain', action='store_true', help="Print the latest captured plan")
+        parser.add_argument('--clear', action='store_true', help="Empty the log after reporting")
+        parser.add_argument('--trim-only', action='store_true', help="Only trim the log, without reporting")
+
+    def handle(self, *args, **options):
+        trimmed = trim_slow_queries()
+        if trimmed:
+            self.stdout.write(f"Trimmed {trimmed} old logged queries.")
+        if options['trim_only']:
+            return
+
+        queries = SlowQuery.objects.all()
+        if options['hours']:
+            queries = queries.filter(created_at__gte=timezone.now() - timedelta(hours=options['hours']))
+        if options['view']:
+            queries = queries.filter(view=options['view'])
+
+        offenders = queries.values('shape').annotate(
+            calls=Count('id'),
+            total_ms=Sum('duration_ms'),
+            avg_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'),
+        ).order_by('-total_ms')[:options['top']]
+
+        if not offenders:
+            self.stdout.write("No slow queries logged.")
+        for rank, offender in enumerate(offenders, 1):
+            samples = queries.filter(shape=offender['shape'])
+            views = samples.values('view').annotate(calls=Count('id')).order_by('-calls')[:5]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"#{rank}  {offender['calls']} calls, total {offender['total_ms']:.0f} ms, "
+                f"avg {offender['avg_ms']:.1f} ms, max {offender['max_ms']:.1f} ms"
+            ))
+            self.stdout.write(f"  {offender['shape'][:500]}")
+            self.stdout.write("  views: " + ', '.join(
+                f"{row['view'] or '<no request>'} ({row['calls']})" for row in views
+            ))
+            if options['explain']:
+                plan = samples.exclude(explain='').values_list('explain', flat=True).first()
+                if plan:
+                    self.stdout.write('\n'.join(f"    {line}" for line in plan.splitlines()))
+
+        if options['clear']:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(f"Cleared {deleted} logged queries.")
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from artifacts.trending import prune_trending, rebuild_trending
+
+
+class Command(BaseCommand):
+    """
+    Periodic maintenance of the trending scores (run it hourly or daily).
+
+    Scores are stored against a fixed epoch and never need rescaling; this
+    prunes those that decayed below TRENDING_MIN_SCORE so the table only holds
+    artifacts that are still trending. ``--rebuild`` recomputes every score
+    from the hourly aggregates, e.g. after changing TRENDING_HALF_LIFE_HOURS or
+    importing visits that bypassed track_visit.
+    """
+    help = "Prune decayed trending scores, or rebuild them from the hourly aggregates"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Recompute all scores from VisitAggregate")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            scored = rebuild_trending(using=options['database'])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt trending scores of {scored} artifacts"))
+        else:
+            pruned = prune_trending(using=options['database'])
+            self.stdout.write(f"Pruned {pruned} decayed trending scores")
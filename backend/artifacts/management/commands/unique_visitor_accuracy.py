@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from artifacts.aggregates import unique_visitors
+from artifacts.models import Collection, MuseumVisit
+
+
+class Command(BaseCommand):
+    """
+    Compare HyperLogLog unique-visitor estimates with exact COUNT(DISTINCT).
+
+    The exact counts scan the visit log: run it on a replica or a copy.
+    """
+    help = "Check the unique-visitor sketches against exact distinct session counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Range checked, ending now")
+
+    def handle(self, *args, **options):
+        end = timezone.now()
+        start = (end - timedelta(days=options['days'])).replace(hour=0, minute=0, second=0, microsecond=0)
+        end = end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        visits = MuseumVisit.objects.filter(visited_at__gte=start, visited_at__lt=end)
+
+        cases = [('all visits', {}, visits)]
+        cases += [
+            (f'language {language}', {'language': language}, visits.filter(language=language))
+            for language in ('fr', 'en', 'wo')
+        ]
+        cases += [
+            (f'collection {collection.pk}', {'collection': collection.pk},
+             visits.filter(artifact__collection=collection))
+            for collection in Collection.objects.order_by('pk')[:5]
+        ]
+
+        worst = 0.0
+        for label, filters, exact_visits in cases:
+            exact = exact_visits.aggregate(sessions=Count('session_id', distinct=True))['sessions']
+            sketch, _ = unique_visitors(start, end, **filters)
+            estimate = sketch.count()
+            error = (estimate - exact) / exact if exact else 0.0
+            worst = max(worst, abs(error))
+            self.stdout.write(f"  {label:<16} exact {exact:>9}  estimate {estimate:>9}  error {error:+.2%}")
+        self.stdout.write(
+            f"Worst error {worst:.2%} (standard error {sketch.standard_error:.2%}, "
+            f"95% of estimates within {2 * sketch.standard_error:.2%})"
+        )
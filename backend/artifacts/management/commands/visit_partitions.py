@@ -0,0 +1,133 @@
+import csv
+import gzip
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from artifacts.aggregates import rollup_visits
+from artifacts.models import MuseumVisit
+from artifacts.partitions import (
+    add_months, create_partition, drop_partition, is_partitioned,
+    month_partitions, month_start
+)
+
+
+ARCHIVE_FIELDS = ['id', 'session_id', 'artifact_id', 'language', 'duration_seconds', 'visited_at']
+
+
+class Command(BaseCommand):
+    """
+    Maintain the monthly partitions of the visit log and apply its retention.
+
+    Run it monthly (cron): it creates the partitions of the coming months, then
+    every month older than the retention window is rolled up into the hourly
+    ``VisitAggregate`` table, exported to a gzip-compressed NDJSON or CSV file
+    and only then dropped. Without partitions (SQLite, or before migration
+    0005) the same retention deletes the archived rows instead.
+    """
+    help = "Create upcoming visit partitions; roll up, archive and drop expired months"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=3, help="Months of partitions to create ahead")
+        parser.add_argument(
+            '--retention-months', type=int, default=settings.VISIT_RETENTION_MONTHS,
+            help="Months of raw visits to keep (current month included)"
+        )
+        parser.add_argument('--archive-dir', default=settings.VISIT_ARCHIVE_DIR)
+        parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--dry-run', action='store_true', help="Only print what would be done")
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        partitioned = is_partitioned(connection)
+        current_month = month_start(timezone.now())
+
+        if partitioned:
+            for offset in range(options['ahead'] + 1):
+                month = add_months(current_month, offset)
+                if options['dry_run']:
+                    self.stdout.write(f"Would ensure partition {month:%Y-%m}")
+                elif create_partition(connection, month):
+                    self.stdout.write(f"Created partition {month:%Y-%m}")
+
+        if options['retention_months'] < 1:
+            raise CommandError("--retention-months must be at least 1")
+        cutoff = add_months(current_month, 1 - options['retention_months'])
+
+        for month in self.expired_months(connection, partitioned, cutoff, options['database']):
+            if options['dry_run']:
+                self.stdout.write(f"Would roll up, archive and drop {month:%Y-%m}")
+                continue
+            self.expire_month(connection, partitioned, month, options)
+
+    def expired_months(self, connection, partitioned, cutoff, using):
+        if partitioned:
+            return sorted(month for month in month_partitions(connection) if month < cutoff)
+
+        oldest = MuseumVisit.objects.using(using).order_by('visited_at').values_list(
+            'visited_at', flat=True
+        ).first()
+        months = []
+        month = month_start(oldest) if oldest else cutoff
+        while month < cutoff:
+            months.append(month)
+            month = add_months(month, 1)
+        return months
+
+    def expire_month(self, connection, partitioned, month, options):
+        using = options['database']
+        end = add_months(month, 1)
+        visits = MuseumVisit.objects.using(using).filter(visited_at__gte=month, visited_at__lt=end)
+
+        rolled_up = rollup_visits(month, end, using=using)
+        if not rolled_up:
+            if partitioned:
+                drop_partition(connection, month)
+            self.stdout.write(f"{month:%Y-%m}: no visits, nothing to archive")
+            return
+
+        path, exported = self.export(visits, month, options['archive_dir'], options['format'])
+        if exported != rolled_up:
+            raise CommandError(
+                f"{month:%Y-%m}: archived {exported} visits but rolled up {rolled_up}, "
+                f"partition kept"
+            )
+
+        if partitioned:
+            drop_partition(connection, month)
+        else:
+            visits.delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"{month:%Y-%m}: {exported} visits rolled up and archived to {path}, raw rows dropped"
+        ))
+
+    def export(self, visits, month, archive_dir, file_format):
+        """Stream the month's visits (server-side cursor) to a compressed file"""
+        directory = Path(archive_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'museumvisit-{month:%Y-%m}.{file_format}.gz'
+        temporary = path.with_suffix('.tmp')
+
+        rows = visits.order_by('visited_at', 'id').values_list(*ARCHIVE_FIELDS).iterator(chunk_size=5000)
+        count = 0
+        with gzip.open(temporary, 'wt', encoding='utf-8', newline='') as handle:
+            if file_format == 'csv':
+                writer = csv.writer(handle)
+                writer.writerow(ARCHIVE_FIELDS)
+            for row in rows:
+                record = dict(zip(ARCHIVE_FIELDS, row))
+                record['artifact_id'] = str(record['artifact_id'])
+                record['visited_at'] = record['visited_at'].isoformat()
+                if file_format == 'csv':
+                    writer.writerow(record.values())
+                else:
+                    handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+                count += 1
+        os.replace(temporary, path)
+        return path, count
@@ -0,0 +1,261 @@
+"""
+Bulk import of artifact photos from a zip archive.
+
+File names encode the inventory number and an optional display order
+(folders are ignored): ``MN-1234.jpg`` becomes the main image of artifact
+MN-1234, ``MN-1234_2.jpg`` its gallery image in position 2.
+
+Members are extracted one at a time to a temporary directory and validated
+in a process pool while the next ones are extracted, so only a few files
+wait on disk and the archive is never loaded into memory. Gallery images are
+created with ``bulk_create`` and main images set with ``bulk_update``, batch
+by batch; the files of replaced main images are deleted once their batch is
+saved. Every member gets a line in the returned report.
+"""
+import multiprocessing
+import re
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path, PurePosixPath
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .caching import invalidate_artifact_caches
+from .documents import refresh_documents
+from .image_processing import process_image
+from .models import THUMBNAIL_SIZE, Artifact, ArtifactImage
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.tif', '.tiff'}
+ORDER_SUFFIX = re.compile(r'^(?P<inventory_number>.+)_(?P<order>\d+)$')
+DB_BATCH_SIZE = 500
+LOOKUP_BATCH_SIZE = 900
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class MediaImportError(Exception):
+    pass
+
+
+def image_stem(name):
+    """Stem of an image member, or None for folders, system files and other files"""
+    path = PurePosixPath(name)
+    if name.endswith('/') or path.name.startswith('.') or '__MACOSX' in path.parts:
+        return None
+    if path.suffix.lower() not in IMAGE_EXTENSIONS:
+        return None
+    return path.stem
+
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def copy_member(archive, member, path, max_size):
+    """Extract one member in chunks, refusing more than ``max_size`` bytes"""
+    copied = 0
+    with archive.open(member) as source, open(path, 'wb') as target:
+        while chunk := source.read(COPY_CHUNK_SIZE):
+            copied += len(chunk)
+            if copied > max_size:
+                # The size in the zip header is not trusted
+                return False
+            target.write(chunk)
+    return True
+
+
+class MediaImport:
+    def __init__(self, archive, replace_main=False, workers=None, max_file_size=None):
+        self.archive = archive
+        self.replace_main = replace_main
+        self.workers = workers or settings.MEDIA_IMPORT_WORKERS
+        self.max_file_size = max_file_size or settings.MEDIA_IMPORT_MAX_FILE_MB * 1024 * 1024
+        self.report = []
+        self.gallery_images = []
+        self.main_images = []
+        # (field, name) of the files of replaced main images, deleted after their batch
+        self.replaced_files = []
+
+    def add_report(self, name, status, message='', inventory_number=None, order=None):
+        self.report.append({
+            'file': name,
+            'inventory_number': inventory_number,
+            'order': order,
+            'status': status,
+            'message': message,
+        })
+
+    def run(self):
+        """Import the archive and return the per-file report"""
+        try:
+            archive = zipfile.ZipFile(self.archive)
+        except zipfile.BadZipFile:
+            raise MediaImportError("The file is not a valid zip archive")
+
+        context = multiprocessing.get_context('spawn')
+        with archive, tempfile.TemporaryDirectory() as directory, \
+                ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            pending = {}
+            for index, (member, target) in enumerate(self.plan(archive)):
+                path = Path(directory) / f'{index}{PurePosixPath(member.filename).suffix.lower()}'
+                if member.file_size > self.max_file_size or not copy_member(
+                    archive, member, path, self.max_file_size
+                ):
+                    self.add_report(
+                        member.filename, 'error', f"larger than {self.max_file_size // 2 ** 20} MB",
+                        target['inventory_number'], target['order']
+                    )
+                    path.unlink(missing_ok=True)
+                    continue
+                thumbnail_size = THUMBNAIL_SIZE if target['order'] is None else None
+                future = pool.submit(process_image, str(path), thumbnail_size)
+                pending[future] = (member, target, path)
+                if len(pending) >= self.workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    self.store(done, pending)
+            self.store(list(pending), pending)
+        self.flush(force=True)
+        invalidate_artifact_caches()
+        return self.report
+
+    def plan(self, archive):
+        """Yield (member, target) for the members that map to an artifact"""
+        members = []
+        for member in archive.infolist():
+            stem = image_stem(member.filename)
+            if stem is None:
+                if not member.is_dir():
+                    self.add_report(member.filename, 'skipped', "not an image")
+                continue
+            members.append((member, stem))
+
+        candidates = set()
+        for _, stem in members:
+            candidates.add(stem)
+            match = ORDER_SUFFIX.match(stem)
+            if match:
+                candidates.add(match['inventory_number'])
+        artifacts = {}
+        for batch in batched(sorted(candidates), LOOKUP_BATCH_SIZE):
+            for inventory_number, pk, main_image, thumbnail in Artifact.objects.filter(
+                inventory_number__in=batch
+            ).values_list('inventory_number', 'pk', 'main_image', 'main_image_thumbnail'):
+                artifacts[inventory_number] = (pk, main_image, thumbnail)
+        used_orders = set()
+        for batch in batched([pk for pk, _, _ in artifacts.values()], LOOKUP_BATCH_SIZE):
+            used_orders.update(
+                ArtifactImage.objects.filter(artifact_id__in=batch).values_list('artifact_id', 'order')
+            )
+
+        seen = set()
+        for member, stem in members:
+            # A full-stem match wins over an order suffix (inventory numbers may contain "_")
+            match = ORDER_SUFFIX.match(stem)
+            if stem in artifacts:
+                inventory_number, order = stem, None
+            elif match and match['inventory_number'] in artifacts:
+                inventory_number, order = match['inventory_number'], int(match['order'])
+            else:
+                self.add_report(member.filename, 'error', "unknown inventory number")
+                continue
+
+            pk, main_image, thumbnail = artifacts[inventory_number]
+            if (pk, order) in seen:
+                message, status = "duplicate in the archive", 'error'
+            elif order is None and main_image and not self.replace_main:
+                message, status = "already has a main image", 'skipped'
+            elif order is not None and (pk, order) in used_orders:
+                message, status = f"gallery position {order} already used", 'skipped'
+            else:
+                seen.add((pk, order))
+                replaced = [('main_image', main_image), ('main_image_thumbnail', thumbnail)] if order is None else []
+                yield member, {
+                    'inventory_number': inventory_number, 'order': order, 'artifact_id': pk,
+                    'replaced_files': [(field, name) for field, name in replaced if name],
+                }
+                continue
+            self.add_report(member.filename, status, message, inventory_number, order)
+
+    def store(self, futures, pending):
+        """Save the validated files to storage and queue their rows"""
+        for future in futures:
+            member, target, path = pending.pop(future)
+            report_target = (target['inventory_number'], target['order'])
+            try:
+                result = future.result()
+            except Exception as e:  # Worker crashed
+                result = {'error': f"processing failed: {e}"}
+            try:
+                if result['error']:
+                    self.add_report(member.filename, 'error', result['error'], *report_target)
+                    continue
+                filename = PurePosixPath(member.filename).name
+                message = f"{result['width']}x{result['height']} {result['format']}"
+                if target['order'] is None:
+                    self.store_main_image(target, path, filename, result['thumbnail_path'])
+                    self.add_report(member.filename, 'main', message, *report_target)
+                else:
+                    self.store_gallery_image(target, path, filename)
+                    self.add_report(member.filename, 'gallery', message, *report_target)
+            finally:
+                path.unlink(missing_ok=True)
+                if result.get('thumbnail_path'):
+                    Path(result['thumbnail_path']).unlink(missing_ok=True)
+        self.flush()
+
+    def save_file(self, field, path, filename):
+        with open(path, 'rb') as handle:
+            return field.storage.save(field.generate_filename(None, filename), File(handle))
+
+    def store_main_image(self, target, path, filename, thumbnail_path):
+        artifact = Artifact(pk=target['artifact_id'], updated_at=timezone.now())
+        artifact.main_image = self.save_file(Artifact._meta.get_field('main_image'), path, filename)
+        artifact.main_image_thumbnail = self.save_file(
+            Artifact._meta.get_field('main_image_thumbnail'), thumbnail_path,
+            f'thumb_{Path(filename).stem}.jpg'
+        )
+        self.main_images.append(artifact)
+        self.replaced_files.extend(
+            (field, name) for field, name in target['replaced_files']
+            if name != getattr(artifact, field).name
+        )
+
+    def store_gallery_image(self, target, path, filename):
+        self.gallery_images.append(ArtifactImage(
+            artifact_id=target['artifact_id'],
+            image=self.save_file(ArtifactImage._meta.get_field('image'), path, filename),
+            caption='',
+            order=target['order'],
+        ))
+
+    def flush(self, force=False):
+        if self.gallery_images and (force or len(self.gallery_images) >= DB_BATCH_SIZE):
+            ArtifactImage.objects.bulk_create(self.gallery_images)
+            refresh_documents(image.artifact_id for image in self.gallery_images)
+            self.gallery_images = []
+        if self.main_images and (force or len(self.main_images) >= DB_BATCH_SIZE):
+            # Bypasses save(): no QR code regeneration, no per-row query
+            Artifact.objects.bulk_update(
+                self.main_images, ['main_image', 'main_image_thumbnail', 'updated_at']
+            )
+            refresh_documents(artifact.pk for artifact in self.main_images)
+            self.main_images = []
+            # Like jobs.replace_file: the old files go only once the new ones are saved
+            for field, name in self.replaced_files:
+                Artifact._meta.get_field(field).storage.delete(name)
+            self.replaced_files = []
+
+
+def import_media(archive, **options):
+    return MediaImport(archive, **options).run()
+
+
+def report_summary(report):
+    summary = {'main': 0, 'gallery': 0, 'skipped': 0, 'error': 0}
+    for line in report:
+        summary[line['status']] += 1
+    return summary
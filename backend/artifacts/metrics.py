@@ -0,0 +1,214 @@
+"""
+Per-endpoint performance metrics exposed in the Prometheus text format.
+
+``MetricsMiddleware`` records, per resolved view and action, the request
+count, a latency histogram, database queries and time, cache hits/misses and
+response size. Every process accumulates counters in memory and, when
+``METRICS_DIR`` is set, periodically writes them to ``<METRICS_DIR>/<pid>.json``
+so ``/api/metrics`` can sum all gunicorn workers.
+
+``/api/metrics`` requires ``METRICS_TOKEN`` (Bearer) unless DEBUG is on: with
+DEBUG off and no token configured it is closed.
+"""
+import hmac
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+METRICS = {
+    # name: (type, help)
+    'museum_http_requests_total': ('counter', "HTTP requests by view, action, method and status"),
+    'museum_http_request_duration_seconds': ('histogram', "Request latency"),
+    'museum_http_response_bytes_total': ('counter', "Response body bytes"),
+    'museum_db_queries_total': ('counter', "Database queries executed"),
+    'museum_db_query_duration_seconds_total': ('counter', "Time spent in database queries"),
+    'museum_db_queries_per_request': ('histogram', "Database queries per request"),
+    'museum_cache_hits_total': ('counter', "Cache lookups that hit"),
+    'museum_cache_misses_total': ('counter', "Cache lookups that missed"),
+}
+
+
+class RequestStats:
+    """Counters for the request in flight, shared with sync_to_async threads"""
+
+    __slots__ = ('path', 'endpoint', 'queries', 'query_time', 'cache_hits', 'cache_misses')
+
+    def __init__(self, path=''):
+        self.path = path
+        self.endpoint = ('<unresolved>', '')
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+_current_stats = ContextVar('request_stats', default=None)
+
+
+def current_request():
+    """(path, 'View.action') of the request being served, if any"""
+    stats = _current_stats.get()
+    if stats is None:
+        return '', ''
+    view, action = stats.endpoint
+    return stats.path, f'{view}.{action}' if action else view
+
+
+def record_cache_lookup(hit):
+    """Count a cache hit or miss against the current request"""
+    stats = _current_stats.get()
+    if stats is not None:
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+
+
+def count_queries(execute, sql, params, many, context):
+    """Database execute wrapper installed on every connection (see apps.py)"""
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_time += time.perf_counter() - start
+
+
+class MetricsRegistry:
+    """In-process counters, flushed to a per-pid file for multi-process scrapes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: defaultdict(float))
+        self.last_flush = 0.0
+
+    def observe_histogram(self, name, labels, value, buckets):
+        series = self.samples[name]
+        for bound in buckets:
+            if value <= bound:
+                series[labels + (('le', repr(float(bound))),)] += 1
+        series[labels + (('le', '+Inf'),)] += 1
+        self.samples[f'{name}_sum'][labels] += value
+        self.samples[f'{name}_count'][labels] += 1
+
+    def record_request(self, view, action, method, status, duration, size, stats):
+        endpoint = (('view', view), ('action', action))
+        with self.lock:
+            self.samples['museum_http_requests_total'][
+                endpoint + (('method', method), ('status', str(status)))
+            ] += 1
+            self.observe_histogram(
+                'museum_http_request_duration_seconds', endpoint + (('method', method),),
+                duration, LATENCY_BUCKETS
+            )
+            self.samples['museum_http_response_bytes_total'][endpoint] += size
+            self.samples['museum_db_queries_total'][endpoint] += stats.queries
+            self.samples['museum_db_query_duration_seconds_total'][endpoint] += stats.query_time
+            self.observe_histogram(
+                'museum_db_queries_per_request', endpoint, stats.queries, QUERY_COUNT_BUCKETS
+            )
+            if stats.cache_hits:
+                self.samples['museum_cache_hits_total'][endpoint] += stats.cache_hits
+            if stats.cache_misses:
+                self.samples['museum_cache_misses_total'][endpoint] += stats.cache_misses
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [[list(map(list, labels)), value] for labels, value in series.items()]
+                for name, series in self.samples.items()
+            }
+
+    def maybe_flush(self, force=False):
+        directory = getattr(settings, 'METRICS_DIR', '')
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        now = time.monotonic()
+        if not directory or (not force and now - self.last_flush < interval):
+            return
+        self.last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """Samples summed over every process (or this one without METRICS_DIR)"""
+        directory = getattr(settings, 'METRICS_DIR', '')
+        if not directory:
+            snapshots = [self.snapshot()]
+        else:
+            self.maybe_flush(force=True)
+            snapshots = []
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(directory, filename)) as handle:
+                        snapshots.append(json.load(handle))
+                except (OSError, ValueError):
+                    continue  # worker replacing its file right now
+
+        merged = defaultdict(lambda: defaultdict(float))
+        for snapshot in snapshots:
+            for name, series in snapshot.items():
+                for labels, value in series:
+                    merged[name][tuple(map(tuple, labels))] += value
+        return merged
+
+
+registry = MetricsRegistry()
+
+
+def format_labels(labels):
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def format_value(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_prometheus(samples):
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        suffixes = ('_bucket', '_sum', '_count') if kind == 'histogram' else ('',)
+        for suffix in suffixes:
+            series = samples.get(name if suffix == '_bucket' else f'{name}{suffix}', {})
+            for labels, value in sorted(series.items()):
+                lines.append(f'{name}{suffix}{format_labels(labels)} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, protected by METRICS_TOKEN (open only in DEBUG)"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_prometheus(registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
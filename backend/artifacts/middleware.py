@@ -0,0 +1,296 @@
+import cProfile
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .db_routers import (
+    get_replicas, begin_routing, end_routing, get_routing_state, use_replica
+)
+from .metrics import RequestStats, _current_stats, registry
+from .nplusone import (
+    NPlusOneError, QueryShapeTracker, _current_tracker, format_offender,
+    logger as nplusone_logger
+)
+from .profiling import (
+    ProfileSession, _current_session, profiler_lock, profiling_requested, save_profile
+)
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def describe_view(request, view_func):
+    """(view, action) labels: the DRF view class and action, or the URL name"""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is not None:
+        actions = getattr(view_func, 'actions', None) or {}
+        return view_class.__name__, actions.get(request.method.lower(), '')
+    return request.resolver_match.view_name, ''
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow read-only API requests to be served from the read replicas.
+
+    Only safe requests dispatched to a DRF view (or views marked with
+    ``replica_reads``) are eligible, so the admin and every write stay on the
+    primary. After a write the client receives a short-lived cookie that pins
+    its following reads to the primary, giving read-your-writes consistency
+    despite replication lag.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cookie_name = getattr(settings, 'REPLICA_PIN_COOKIE', 'db_pin')
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 15)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not get_replicas():
+            return self.get_response(request)
+
+        token = begin_routing(pinned=self.cookie_name in request.COOKIES)
+        try:
+            return self.pin_after_write(self.get_response(request))
+        finally:
+            end_routing(token)
+
+    async def __acall__(self, request):
+        if not get_replicas():
+            return await self.get_response(request)
+
+        token = begin_routing(pinned=self.cookie_name in request.COOKIES)
+        try:
+            return self.pin_after_write(await self.get_response(request))
+        finally:
+            end_routing(token)
+
+    def pin_after_write(self, response):
+        if get_routing_state().wrote:
+            # This request wrote: keep the client's reads on the primary
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=self.pin_seconds, httponly=True, samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # DRF views expose their class on the callable returned by as_view();
+        # plain views opt in with the replica_reads decorator (even for POST)
+        if getattr(view_func, 'replica_reads', False) or (
+            request.method in SAFE_METHODS and hasattr(view_func, 'cls')
+        ):
+            use_replica(True)
+        return None
+
+
+class MetricsMiddleware:
+    """
+    Record per-endpoint latency, database, cache and size metrics.
+
+    Endpoints are labelled with the resolved view and DRF action (e.g.
+    ``ArtifactViewSet``/``search``) rather than the raw path, so detail URLs
+    collapse into one series. Scraped from ``/api/metrics``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats(request.path)
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats(request.path)
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.endpoint = describe_view(request, view_func)
+        return None
+
+    def record(self, request, response, stats, duration):
+        view, action = stats.endpoint
+        if response.streaming:
+            size = int(response.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        registry.record_request(
+            view, action, request.method, response.status_code, duration, size, stats
+        )
+
+
+class NPlusOneMiddleware:
+    """
+    Flag statement shapes repeated more than ``NPLUSONE_THRESHOLD`` times.
+
+    Meant for development and staging: it is removed from the stack unless
+    ``NPLUSONE_DETECTION`` is on (default: ``DEBUG``). Offenders are logged on
+    ``artifacts.nplusone``; with ``NPLUSONE_RAISE`` the request fails with
+    ``NPlusOneError`` instead, so the test suite catches regressions.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'NPLUSONE_DETECTION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+        self.raise_errors = getattr(settings, 'NPLUSONE_RAISE', False)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tracker = QueryShapeTracker(self.threshold)
+        token = _current_tracker.set(tracker)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_tracker.reset(token)
+        self.report(tracker)
+        return response
+
+    async def __acall__(self, request):
+        tracker = QueryShapeTracker(self.threshold)
+        token = _current_tracker.set(tracker)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_tracker.reset(token)
+        self.report(tracker)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        tracker = _current_tracker.get()
+        if tracker is not None:
+            view, action = describe_view(request, view_func)
+            tracker.view = f'{view}.{action}' if action else view
+        return None
+
+    def report(self, tracker):
+        offenders = tracker.report()
+        if not offenders:
+            return
+        messages = [format_offender(tracker.view or '<unresolved>', offender) for offender in offenders]
+        if self.raise_errors:
+            raise NPlusOneError('\n'.join(messages))
+        for message in messages:
+            nplusone_logger.warning(message)
+
+
+class RequestProfilingMiddleware:
+    """
+    Run staff requests flagged with ``?_profile=1`` (or ``X-Profile-Request``)
+    under cProfile and store the result as a ``RequestProfile``.
+
+    Must come after ``AuthenticationMiddleware``. Unflagged requests only pay
+    for the flag lookup, and the middleware is dropped entirely unless
+    ``PROFILING_ENABLED``. Under ASGI only the event loop thread is profiled;
+    ORM calls show up in the SQL timeline.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def is_staff(request):
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not (profiling_requested(request) and self.is_staff(request)):
+            return self.get_response(request)
+        if not profiler_lock.acquire(blocking=False):
+            return self.get_response(request)  # another profile is running
+
+        session, profiler = ProfileSession(), cProfile.Profile()
+        token = _current_session.set(session)
+        try:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        finally:
+            _current_session.reset(token)
+            profiler_lock.release()
+        duration = time.perf_counter() - session.start
+
+        profile = save_profile(request, response, profiler, session, duration, session.view)
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+    async def __acall__(self, request):
+        if not (profiling_requested(request) and await sync_to_async(self.is_staff)(request)):
+            return await self.get_response(request)
+        if not profiler_lock.acquire(blocking=False):
+            return await self.get_response(request)
+
+        session, profiler = ProfileSession(), cProfile.Profile()
+        token = _current_session.set(session)
+        try:
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+        finally:
+            _current_session.reset(token)
+            profiler_lock.release()
+        duration = time.perf_counter() - session.start
+
+        profile = await sync_to_async(save_profile)(
+            request, response, profiler, session, duration, session.view
+        )
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        session = _current_session.get()
+        if session is not None:
+            view, action = describe_view(request, view_func)
+            session.view = f'{view}.{action}' if action else view
+        return None
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10, verbose_name='Méthode')),
+                ('path', models.CharField(max_length=500, verbose_name='Chemin')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='Vue')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Statut HTTP')),
+                ('user', models.CharField(blank=True, max_length=150, verbose_name='Utilisateur')),
+                ('duration_ms', models.FloatField(verbose_name='Durée (ms)')),
+                ('query_count', models.PositiveIntegerField(default=0, verbose_name='Requêtes SQL')),
+                ('sql_time_ms', models.FloatField(default=0, verbose_name='Temps SQL (ms)')),
+                ('cumulative_stats', models.TextField(blank=True, verbose_name='Temps cumulé')),
+                ('internal_stats', models.TextField(blank=True, verbose_name='Temps propre')),
+                ('sql_timeline', models.JSONField(blank=True, default=list, verbose_name='Chronologie SQL')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Profil de requête',
+                'verbose_name_plural': 'Profils de requêtes',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0002_request_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sql', models.TextField(verbose_name='Requête SQL')),
+                ('shape', models.TextField(verbose_name='Forme normalisée')),
+                ('duration_ms', models.FloatField(verbose_name='Durée (ms)')),
+                ('database', models.CharField(max_length=50, verbose_name='Base')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='Vue')),
+                ('path', models.CharField(blank=True, max_length=500, verbose_name='Chemin')),
+                ('explain', models.TextField(blank=True, verbose_name="Plan d'exécution")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Requête lente',
+                'verbose_name_plural': 'Requêtes lentes',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='artifacts_s_created_92bde1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0003_slow_query'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(verbose_name='Heure')),
+                ('language', models.CharField(max_length=2, verbose_name='Langue utilisée')),
+                ('visit_count', models.PositiveIntegerField(default=0, verbose_name='Visites')),
+                ('total_duration_seconds', models.PositiveBigIntegerField(default=0, verbose_name='Durée totale (secondes)')),
+                ('artifact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visit_aggregates', to='artifacts.artifact', verbose_name='Œuvre')),
+            ],
+            options={
+                'verbose_name': 'Agrégat de visites',
+                'verbose_name_plural': 'Agrégats de visites',
+                'ordering': ['-bucket'],
+                'indexes': [models.Index(fields=['bucket'], name='artifacts_v_bucket_27e52c_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='visitaggregate',
+            constraint=models.UniqueConstraint(fields=('bucket', 'artifact', 'language'), name='unique_visit_aggregate_bucket'),
+        ),
+    ]
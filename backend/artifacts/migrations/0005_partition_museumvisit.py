@@ -0,0 +1,130 @@
+"""
+Partition artifacts_museumvisit by month on visited_at (PostgreSQL only).
+
+The table is rebuilt as a range-partitioned table: its primary key becomes
+(id, visited_at) since it must include the partition key, ids come from a
+plain sequence, and the existing rows are copied into monthly partitions plus
+a default one. Indexes and foreign keys are recreated under their original
+names so later migrations keep working. Other databases are left unchanged.
+
+This rewrites the whole table under an exclusive lock: on a large production
+table, run it during a maintenance window.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import migrations
+
+
+TABLE = 'artifacts_museumvisit'
+SEQUENCE = 'artifacts_museumvisit_seq'
+MONTHS_AHEAD = 3
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def table_definitions(cursor, table):
+    """CREATE INDEX statements and foreign keys to recreate on the new table"""
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN "
+        "(SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p')",
+        [table, table]
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [table]
+    )
+    return indexes, cursor.fetchall()
+
+
+def rename_table(cursor, table, new_name):
+    """Rename a table and its primary key, whose index name is schema-wide"""
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+        [table]
+    )
+    primary_key = cursor.fetchone()[0]
+    cursor.execute(f'ALTER TABLE {table} RENAME CONSTRAINT "{primary_key}" TO "{new_name}_pkey"')
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {new_name}")
+
+
+def restore_definitions(cursor, indexes, foreign_keys):
+    for indexdef in indexes:
+        cursor.execute(indexdef)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT "{name}" {definition}')
+
+
+def partition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        indexes, foreign_keys = table_definitions(cursor, TABLE)
+        rename_table(cursor, TABLE, f'{TABLE}_legacy')
+
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE}")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {TABLE}_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+            f"PRIMARY KEY (id, visited_at)) PARTITION BY RANGE (visited_at)"
+        )
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')")
+        cursor.execute(f"ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id")
+
+        cursor.execute(f"SELECT MIN(visited_at), MAX(id) FROM {TABLE}_legacy")
+        oldest, last_id = cursor.fetchone()
+        now = datetime.now(dt_timezone.utc)
+        month = (oldest or now).astimezone(dt_timezone.utc).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        last_month = add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), MONTHS_AHEAD)
+        while month <= last_month:
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y_%m} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+            month = add_months(month, 1)
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_legacy")
+        if last_id:
+            cursor.execute(f"SELECT setval('{SEQUENCE}', %s)", [last_id])
+        cursor.execute(f"DROP TABLE {TABLE}_legacy")
+        restore_definitions(cursor, indexes, foreign_keys)
+
+
+def unpartition(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [TABLE]
+        )
+        if not cursor.fetchone()[0]:
+            return
+        indexes, foreign_keys = table_definitions(cursor, TABLE)
+        cursor.execute(f"ALTER SEQUENCE {SEQUENCE} OWNED BY NONE")
+        rename_table(cursor, TABLE, f'{TABLE}_partitioned')
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {TABLE}_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+            f"PRIMARY KEY (id))"
+        )
+        cursor.execute(f"ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id")
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_partitioned")
+        cursor.execute(f"DROP TABLE {TABLE}_partitioned CASCADE")
+        restore_definitions(cursor, indexes, foreign_keys)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artifacts", "0004_visit_aggregate"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0005_partition_museumvisit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Jour')),
+                ('language', models.CharField(max_length=2, verbose_name='Langue utilisée')),
+                ('sketch', models.BinaryField(verbose_name='Sketch HyperLogLog')),
+                ('artifact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visitor_sketches', to='artifacts.artifact', verbose_name='Œuvre')),
+            ],
+            options={
+                'verbose_name': 'Sketch de visiteurs uniques',
+                'verbose_name_plural': 'Sketches de visiteurs uniques',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='artifacts_v_day_09a066_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='visitorsketch',
+            constraint=models.UniqueConstraint(fields=('day', 'artifact', 'language'), name='unique_visitor_sketch_day'),
+        ),
+    ]
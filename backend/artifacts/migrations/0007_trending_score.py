@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0006_visitor_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('artifact', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending_score', serialize=False, to='artifacts.artifact', verbose_name='Œuvre')),
+                ('log_score', models.FloatField(verbose_name='Score (logarithme)')),
+            ],
+            options={
+                'verbose_name': 'Score de tendance',
+                'verbose_name_plural': 'Scores de tendance',
+                'ordering': ['-log_score'],
+                'indexes': [models.Index(fields=['-log_score'], name='trending_log_score_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0007_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtifactPathStats',
+            fields=[
+                ('artifact', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='path_stats', serialize=False, to='artifacts.artifact', verbose_name='Œuvre')),
+                ('visits', models.PositiveIntegerField(default=0, verbose_name='Visites')),
+                ('entries', models.PositiveIntegerField(default=0, verbose_name='Débuts de parcours')),
+                ('exits', models.PositiveIntegerField(default=0, verbose_name='Fins de parcours')),
+                ('dwell_histogram', models.JSONField(default=list, verbose_name='Distribution des durées')),
+            ],
+            options={
+                'verbose_name': 'Statistiques de parcours',
+                'verbose_name_plural': 'Statistiques de parcours',
+            },
+        ),
+        migrations.CreateModel(
+            name='PathSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField(blank=True, null=True, verbose_name='Début')),
+                ('end', models.DateTimeField(verbose_name='Fin')),
+                ('sessions', models.PositiveIntegerField(default=0, verbose_name='Sessions')),
+                ('visits', models.PositiveBigIntegerField(default=0, verbose_name='Visites')),
+                ('path_length_histogram', models.JSONField(default=list, verbose_name='Distribution des longueurs')),
+                ('dwell_histogram', models.JSONField(default=list, verbose_name='Distribution des durées')),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Analyse des parcours',
+                'verbose_name_plural': 'Analyses des parcours',
+                'ordering': ['-computed_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PathTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Passages')),
+            ],
+            options={
+                'verbose_name': 'Transition de parcours',
+                'verbose_name_plural': 'Transitions de parcours',
+                'ordering': ['-count'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='museumvisit',
+            index=models.Index(fields=['session_id', 'visited_at'], name='artifacts_m_session_77a492_idx'),
+        ),
+        migrations.AddField(
+            model_name='pathtransition',
+            name='from_artifact',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='path_transitions', to='artifacts.artifact', verbose_name="Depuis l'œuvre"),
+        ),
+        migrations.AddField(
+            model_name='pathtransition',
+            name='to_artifact',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='artifacts.artifact', verbose_name="Vers l'œuvre"),
+        ),
+        migrations.AddIndex(
+            model_name='pathtransition',
+            index=models.Index(fields=['from_artifact', '-count'], name='path_transition_from_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pathtransition',
+            index=models.Index(fields=['to_artifact', '-count'], name='path_transition_to_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pathtransition',
+            index=models.Index(fields=['-count'], name='path_transition_count_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='pathtransition',
+            constraint=models.UniqueConstraint(fields=('from_artifact', 'to_artifact'), name='unique_path_transition'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0008_visitor_paths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artifact',
+            name='main_image_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='artifacts/thumbnails/', verbose_name='Miniature'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0009_artifact_thumbnail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtifactJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('qr_codes', 'Codes QR'), ('thumbnails', 'Miniatures')], max_length=20, verbose_name='Traitement')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], default='pending', max_length=10, verbose_name='Statut')),
+                ('artifact_ids', models.JSONField(default=list, verbose_name='Œuvres')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Traitées')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='Échecs')),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('user', models.CharField(blank=True, max_length=150, verbose_name='Utilisateur')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminé le')),
+            ],
+            options={
+                'verbose_name': 'Traitement par lot',
+                'verbose_name_plural': 'Traitements par lot',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
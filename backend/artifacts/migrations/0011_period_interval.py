@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0010_artifact_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='period',
+            index=models.Index(fields=['start_year', 'end_year'], name='period_interval_idx'),
+        ),
+    ]
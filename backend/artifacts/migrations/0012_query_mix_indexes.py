@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0011_period_interval'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artifact',
+            index=models.Index(condition=models.Q(('is_on_display', True)), fields=['-created_at'], name='artifact_displayed_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artifact',
+            index=models.Index(condition=models.Q(('is_on_display', True)), fields=['collection', '-created_at'], name='artifact_collection_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='museumvisit',
+            index=models.Index(fields=['artifact', 'visited_at'], name='visit_artifact_time_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='artifact',
+            name='artifacts_a_invento_186d4d_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='artifact',
+            name='artifacts_a_is_feat_4a825c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='artifact',
+            name='artifacts_a_is_on_d_b1f6e7_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='museumvisit',
+            name='artifacts_m_session_170516_idx',
+        ),
+        migrations.AlterField(
+            model_name='museumvisit',
+            name='artifact',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='visits', to='artifacts.artifact', verbose_name='Œuvre visitée'),
+        ),
+    ]
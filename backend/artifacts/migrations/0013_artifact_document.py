@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0012_query_mix_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtifactDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=2, verbose_name='Langue')),
+                ('is_featured', models.BooleanField()),
+                ('is_on_display', models.BooleanField()),
+                ('created_at', models.DateTimeField()),
+                ('list_json', models.TextField(verbose_name='Document liste')),
+                ('detail_json', models.TextField(verbose_name='Document détail')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('artifact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='artifacts.artifact', verbose_name='Œuvre')),
+                ('collection', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='artifacts.collection')),
+                ('culture', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='artifacts.culture')),
+                ('period', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='artifacts.period')),
+            ],
+            options={
+                'verbose_name': "Document d'œuvre",
+                'verbose_name_plural': "Documents d'œuvres",
+                'indexes': [models.Index(condition=models.Q(('is_on_display', True)), fields=['language', '-created_at'], name='document_displayed_recent_idx'), models.Index(condition=models.Q(('is_on_display', True)), fields=['language', 'collection', '-created_at'], name='document_collection_recent_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='artifactdocument',
+            constraint=models.UniqueConstraint(fields=('artifact', 'language'), name='unique_artifact_document'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artifacts', '0013_artifact_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artifactjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Mis à jour le'),
+            preserve_default=False,
+        ),
+    ]
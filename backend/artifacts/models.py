@@ -2,10 +2,13 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import FileExtensionValidator
 import uuid
-import qrcode
 from io import BytesIO
+from pathlib import Path
 from django.core.files import File
-from PIL import Image
+
+
+# Longest side, in pixels, of the main image thumbnails
+THUMBNAIL_SIZE = 200
 
 
 class Period(models.Model):
@@ -19,6 +22,10 @@ class Period(models.Model):
         verbose_name = _("Période historique")
         verbose_name_plural = _("Périodes historiques")
         ordering = ['start_year']
+        indexes = [
+            # Year overlap queries (timeline, ?year= on artifacts)
+            models.Index(fields=['start_year', 'end_year'], name='period_interval_idx'),
+        ]
     
     def __str__(self):
         return self.name_fr
@@ -108,6 +115,13 @@ class Artifact(models.Model):
         upload_to='artifacts/',
         verbose_name=_("Image principale")
     )
+    main_image_thumbnail = models.ImageField(
+        upload_to='artifacts/thumbnails/',
+        verbose_name=_("Miniature"),
+        blank=True,
+        null=True,
+        editable=False
+    )
     
     # QR Code
     qr_code = models.ImageField(
@@ -132,10 +146,17 @@ class Artifact(models.Model):
         verbose_name = _("Œuvre")
         verbose_name_plural = _("Œuvres")
         ordering = ['-created_at']
+        # Public queries all filter is_on_display=True and order by -created_at
+        # (see manage.py index_advisor); inventory_number is already unique
         indexes = [
-            models.Index(fields=['inventory_number']),
-            models.Index(fields=['is_featured']),
-            models.Index(fields=['is_on_display']),
+            models.Index(
+                fields=['-created_at'], condition=models.Q(is_on_display=True),
+                name='artifact_displayed_recent_idx'
+            ),
+            models.Index(
+                fields=['collection', '-created_at'], condition=models.Q(is_on_display=True),
+                name='artifact_collection_recent_idx'
+            ),
         ]
     
     def __str__(self):
@@ -145,10 +166,18 @@ class Artifact(models.Model):
         # Generate QR code if it doesn't exist
         if not self.qr_code:
             self.generate_qr_code()
+        # New upload (not yet written to storage) or missing thumbnail
+        if not self.main_image:
+            self.main_image_thumbnail = None
+        elif not self.main_image._committed or not self.main_image_thumbnail:
+            self.generate_thumbnail()
         super().save(*args, **kwargs)
     
     def generate_qr_code(self):
         """Generate QR code for the artifact"""
+        # qrcode pulls in PIL: import on first use to keep cold starts light
+        import qrcode
+
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -167,6 +196,32 @@ class Artifact(models.Model):
         filename = f'qr_{self.inventory_number}.png'
         self.qr_code.save(filename, File(buffer), save=False)
 
+    def generate_thumbnail(self):
+        """Small JPEG of the main image for list pages; returns whether it was created"""
+        from PIL import Image
+
+        uploaded = not self.main_image._committed
+        try:
+            self.main_image.open('rb')
+            with Image.open(self.main_image) as image:
+                image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+                thumbnail = image.convert('RGB')
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Missing or unreadable original: the admin falls back to it
+            return False
+        finally:
+            if uploaded:
+                self.main_image.seek(0)  # Still to be written to storage
+            else:
+                self.main_image.close()
+
+        buffer = BytesIO()
+        thumbnail.save(buffer, format='JPEG', quality=80)
+        buffer.seek(0)
+        filename = f'thumb_{Path(self.main_image.name).stem}.jpg'
+        self.main_image_thumbnail.save(filename, File(buffer), save=False)
+        return True
+
 
 class ArtifactImage(models.Model):
     """Additional images for artifacts"""
@@ -290,7 +345,8 @@ class MuseumVisit(models.Model):
         Artifact,
         on_delete=models.CASCADE,
         related_name='visits',
-        verbose_name=_("Œuvre visitée")
+        verbose_name=_("Œuvre visitée"),
+        db_index=False  # Covered by the (artifact, visited_at) index
     )
     language = models.CharField(
         max_length=2,
@@ -309,9 +365,292 @@ class MuseumVisit(models.Model):
         verbose_name_plural = _("Visites")
         ordering = ['-visited_at']
         indexes = [
-            models.Index(fields=['session_id']),
             models.Index(fields=['visited_at']),
+            models.Index(fields=['session_id', 'visited_at']),
+            models.Index(fields=['artifact', 'visited_at'], name='visit_artifact_time_idx'),
         ]
     
     def __str__(self):
-        return f"Visite - {self.artifact.name_fr} ({self.language})"
\ No newline at end of file
+        return f"Visite - {self.artifact.name_fr} ({self.language})"
+
+class VisitAggregate(models.Model):
+    """Hourly visit counts per artifact and language, rolled up from MuseumVisit"""
+    bucket = models.DateTimeField(verbose_name=_("Heure"))
+    artifact = models.ForeignKey(
+        Artifact,
+        on_delete=models.CASCADE,
+        related_name='visit_aggregates',
+        verbose_name=_("Œuvre")
+    )
+    language = models.CharField(max_length=2, verbose_name=_("Langue utilisée"))
+    visit_count = models.PositiveIntegerField(default=0, verbose_name=_("Visites"))
+    total_duration_seconds = models.PositiveBigIntegerField(
+        default=0, verbose_name=_("Durée totale (secondes)")
+    )
+
+    class Meta:
+        verbose_name = _("Agrégat de visites")
+        verbose_name_plural = _("Agrégats de visites")
+        ordering = ['-bucket']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['bucket', 'artifact', 'language'], name='unique_visit_aggregate_bucket'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H:00} - {self.artifact_id} ({self.language})"
+
+class VisitorSketch(models.Model):
+    """HyperLogLog sketch of the sessions that visited an artifact on a day"""
+    day = models.DateField(verbose_name=_("Jour"))
+    artifact = models.ForeignKey(
+        Artifact,
+        on_delete=models.CASCADE,
+        related_name='visitor_sketches',
+        verbose_name=_("Œuvre")
+    )
+    language = models.CharField(max_length=2, verbose_name=_("Langue utilisée"))
+    sketch = models.BinaryField(verbose_name=_("Sketch HyperLogLog"))
+
+    class Meta:
+        verbose_name = _("Sketch de visiteurs uniques")
+        verbose_name_plural = _("Sketches de visiteurs uniques")
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'artifact', 'language'], name='unique_visitor_sketch_day'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.artifact_id} ({self.language})"
+
+class TrendingScore(models.Model):
+    """Time-decayed visit score of an artifact, stored as a logarithm (see trending.py)"""
+    artifact = models.OneToOneField(
+        Artifact,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending_score',
+        verbose_name=_("Œuvre")
+    )
+    log_score = models.FloatField(verbose_name=_("Score (logarithme)"))
+
+    class Meta:
+        verbose_name = _("Score de tendance")
+        verbose_name_plural = _("Scores de tendance")
+        ordering = ['-log_score']
+        indexes = [
+            models.Index(fields=['-log_score'], name='trending_log_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.artifact_id} ({self.log_score:.3f})"
+
+class PathTransition(models.Model):
+    """Number of sessions that went from one artifact straight to another"""
+    from_artifact = models.ForeignKey(
+        Artifact,
+        on_delete=models.CASCADE,
+        related_name='path_transitions',
+        verbose_name=_("Depuis l'œuvre")
+    )
+    to_artifact = models.ForeignKey(
+        Artifact,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_("Vers l'œuvre")
+    )
+    count = models.PositiveIntegerField(default=0, verbose_name=_("Passages"))
+
+    class Meta:
+        verbose_name = _("Transition de parcours")
+        verbose_name_plural = _("Transitions de parcours")
+        ordering = ['-count']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['from_artifact', 'to_artifact'], name='unique_path_transition'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['from_artifact', '-count'], name='path_transition_from_idx'),
+            models.Index(fields=['to_artifact', '-count'], name='path_transition_to_idx'),
+            models.Index(fields=['-count'], name='path_transition_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.from_artifact_id} -> {self.to_artifact_id} ({self.count})"
+
+class ArtifactPathStats(models.Model):
+    """Per-artifact entries, exits and dwell-time distribution of the visitor paths"""
+    artifact = models.OneToOneField(
+        Artifact,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='path_stats',
+        verbose_name=_("Œuvre")
+    )
+    visits = models.PositiveIntegerField(default=0, verbose_name=_("Visites"))
+    entries = models.PositiveIntegerField(default=0, verbose_name=_("Débuts de parcours"))
+    exits = models.PositiveIntegerField(default=0, verbose_name=_("Fins de parcours"))
+    dwell_histogram = models.JSONField(default=list, verbose_name=_("Distribution des durées"))
+
+    class Meta:
+        verbose_name = _("Statistiques de parcours")
+        verbose_name_plural = _("Statistiques de parcours")
+
+    def __str__(self):
+        return f"{self.artifact_id} ({self.visits} visites)"
+
+class PathSummary(models.Model):
+    """Totals of the latest visitor path analysis (manage.py analyze_visit_paths)"""
+    start = models.DateTimeField(null=True, blank=True, verbose_name=_("Début"))
+    end = models.DateTimeField(verbose_name=_("Fin"))
+    sessions = models.PositiveIntegerField(default=0, verbose_name=_("Sessions"))
+    visits = models.PositiveBigIntegerField(default=0, verbose_name=_("Visites"))
+    path_length_histogram = models.JSONField(default=list, verbose_name=_("Distribution des longueurs"))
+    dwell_histogram = models.JSONField(default=list, verbose_name=_("Distribution des durées"))
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Analyse des parcours")
+        verbose_name_plural = _("Analyses des parcours")
+        ordering = ['-computed_at']
+
+    def __str__(self):
+        return f"{self.computed_at:%Y-%m-%d %H:%M} ({self.sessions} sessions)"
+
+class ArtifactJob(models.Model):
+    """Bulk media regeneration started from the artifact admin, run in the background"""
+    KIND_CHOICES = [
+        ('qr_codes', _("Codes QR")),
+        ('thumbnails', _("Miniatures")),
+    ]
+    STATUS_CHOICES = [
+        ('pending', _("En attente")),
+        ('running', _("En cours")),
+        ('done', _("Terminé")),
+        ('failed', _("Échec")),
+    ]
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name=_("Traitement"))
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name=_("Statut")
+    )
+    artifact_ids = models.JSONField(default=list, verbose_name=_("Œuvres"))
+    total = models.PositiveIntegerField(default=0, verbose_name=_("Total"))
+    processed = models.PositiveIntegerField(default=0, verbose_name=_("Traitées"))
+    failed = models.PositiveIntegerField(default=0, verbose_name=_("Échecs"))
+    error = models.TextField(blank=True, verbose_name=_("Erreur"))
+    user = models.CharField(max_length=150, blank=True, verbose_name=_("Utilisateur"))
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Heartbeat: bumped with the progress after every batch
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Mis à jour le"))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Terminé le"))
+
+    class Meta:
+        verbose_name = _("Traitement par lot")
+        verbose_name_plural = _("Traitements par lot")
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.processed}/{self.total})"
+
+class ArtifactDocument(models.Model):
+    """Rendered list and detail payloads of an artifact in one language (see documents.py)"""
+    artifact = models.ForeignKey(
+        Artifact,
+        on_delete=models.CASCADE,
+        related_name='documents',
+        verbose_name=_("Œuvre")
+    )
+    language = models.CharField(max_length=2, verbose_name=_("Langue"))
+    # Copies of the artifact's filter and ordering columns, so lists never join it
+    collection = models.ForeignKey(
+        Collection, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    period = models.ForeignKey(
+        Period, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    culture = models.ForeignKey(
+        Culture, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    is_featured = models.BooleanField()
+    is_on_display = models.BooleanField()
+    created_at = models.DateTimeField()
+    # JSON text rather than JSONField: jsonb would not keep the key order
+    list_json = models.TextField(verbose_name=_("Document liste"))
+    detail_json = models.TextField(verbose_name=_("Document détail"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Document d'œuvre")
+        verbose_name_plural = _("Documents d'œuvres")
+        constraints = [
+            models.UniqueConstraint(fields=['artifact', 'language'], name='unique_artifact_document'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['language', '-created_at'], condition=models.Q(is_on_display=True),
+                name='document_displayed_recent_idx'
+            ),
+            models.Index(
+                fields=['language', 'collection', '-created_at'], condition=models.Q(is_on_display=True),
+                name='document_collection_recent_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.artifact_id} ({self.language})"
+
+class RequestProfile(models.Model):
+    """cProfile run of a request, captured on demand by staff"""
+    method = models.CharField(max_length=10, verbose_name=_("Méthode"))
+    path = models.CharField(max_length=500, verbose_name=_("Chemin"))
+    view = models.CharField(max_length=200, blank=True, verbose_name=_("Vue"))
+    status_code = models.PositiveSmallIntegerField(verbose_name=_("Statut HTTP"))
+    user = models.CharField(max_length=150, blank=True, verbose_name=_("Utilisateur"))
+    duration_ms = models.FloatField(verbose_name=_("Durée (ms)"))
+    query_count = models.PositiveIntegerField(default=0, verbose_name=_("Requêtes SQL"))
+    sql_time_ms = models.FloatField(default=0, verbose_name=_("Temps SQL (ms)"))
+    cumulative_stats = models.TextField(blank=True, verbose_name=_("Temps cumulé"))
+    internal_stats = models.TextField(blank=True, verbose_name=_("Temps propre"))
+    sql_timeline = models.JSONField(default=list, blank=True, verbose_name=_("Chronologie SQL"))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Profil de requête")
+        verbose_name_plural = _("Profils de requêtes")
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class SlowQuery(models.Model):
+    """SQL statement that exceeded SLOW_QUERY_THRESHOLD_MS"""
+    sql = models.TextField(verbose_name=_("Requête SQL"))
+    shape = models.TextField(verbose_name=_("Forme normalisée"))
+    duration_ms = models.FloatField(verbose_name=_("Durée (ms)"))
+    database = models.CharField(max_length=50, verbose_name=_("Base"))
+    view = models.CharField(max_length=200, blank=True, verbose_name=_("Vue"))
+    path = models.CharField(max_length=500, blank=True, verbose_name=_("Chemin"))
+    explain = models.TextField(blank=True, verbose_name=_("Plan d'exécution"))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Requête lente")
+        verbose_name_plural = _("Requêtes lentes")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f} ms - {self.shape[:80]}"
@@ -0,0 +1,116 @@
+"""
+Runtime N+1 query detection for development and staging.
+
+Every SQL statement run during a request is reduced to its shape (literals
+and parameters stripped). A shape executed more than ``NPLUSONE_THRESHOLD``
+times is reported with the view, the serializer field being rendered and the
+project stack that issued it. See ``NPlusOneMiddleware``.
+"""
+import inspect
+import logging
+import re
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from rest_framework.fields import Field
+
+
+logger = logging.getLogger('artifacts.nplusone')
+
+PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+# Request instrumentation frames say nothing about the culprit
+INSTRUMENTATION_FILES = {
+    str(Path(__file__).with_name(name)) for name in ('middleware.py', 'metrics.py', 'nplusone.py', 'profiling.py', 'slow_queries.py')
+}
+
+SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+SQL_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+SQL_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)')
+SQL_WHITESPACE = re.compile(r'\s+')
+
+
+class NPlusOneError(Exception):
+    """Raised at the end of a request when NPLUSONE_RAISE is enabled"""
+
+
+def normalize_sql(sql):
+    """Reduce a statement to its shape so that per-row lookups compare equal"""
+    shape = SQL_STRING.sub('?', sql)
+    shape = SQL_NUMBER.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = SQL_PLACEHOLDER_LIST.sub('(...)', shape)
+    return SQL_WHITESPACE.sub(' ', shape).strip()
+
+
+def project_stack(limit=8):
+    """Innermost frames from this project's code (not Django or libraries)"""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(PROJECT_DIR) and 'site-packages' not in frame.filename
+        and frame.filename not in INSTRUMENTATION_FILES
+    ]
+    return traceback.format_list(frames[-limit:])
+
+
+def current_serializer_field():
+    """Name the DRF field whose rendering issued the query, if any"""
+    frame = inspect.currentframe()
+    try:
+        while frame is not None:
+            owner = frame.f_locals.get('self')
+            if isinstance(owner, Field) and owner.field_name:
+                return f'{type(owner.parent).__name__}.{owner.field_name}'
+            frame = frame.f_back
+    finally:
+        del frame
+    return None
+
+
+class QueryShapeTracker:
+    """Statement shapes seen during one request"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.offenders = {}
+        self.view = None
+
+    def record(self, sql):
+        shape = normalize_sql(sql)
+        self.counts[shape] += 1
+        if self.counts[shape] == self.threshold + 1:
+            # Locate the culprit once, when the shape crosses the threshold
+            self.offenders[shape] = {
+                'field': current_serializer_field(),
+                'stack': project_stack(),
+            }
+
+    def report(self):
+        return [
+            {'sql': shape, 'count': self.counts[shape], **details}
+            for shape, details in self.offenders.items()
+        ]
+
+
+_current_tracker = ContextVar('query_shape_tracker', default=None)
+
+
+def track_query_shapes(execute, sql, params, many, context):
+    """Database execute wrapper installed on every connection (see apps.py)"""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.record(sql)
+    return execute(sql, params, many, context)
+
+
+def format_offender(view, offender):
+    lines = [
+        f"N+1 query in {view}: {offender['count']} x {offender['sql'][:300]}",
+    ]
+    if offender['field']:
+        lines.append(f"  serializer field: {offender['field']}")
+    lines.extend(f"  {line.rstrip()}" for line in offender['stack'])
+    return '\n'.join(lines)
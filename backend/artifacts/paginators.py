@@ -0,0 +1,57 @@
+"""
+Paginators for tables too large to COUNT(*) on every changelist page.
+
+On PostgreSQL, ``EstimatedCountPaginator`` reads the row count from the
+planner statistics: ``pg_class.reltuples`` (summed over the leaf partitions) for an
+unfiltered table, the estimated rows of the ``EXPLAIN`` plan otherwise. Small
+results, and other databases, are still counted exactly.
+"""
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+# Estimates below this are replaced by an exact count
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def table_estimate(connection, table):
+    """Planner row count of a table, summed over its leaf partitions if partitioned"""
+    with connection.cursor() as cursor:
+        # A partitioned table (relkind 'p') holds no rows itself; its
+        # reltuples repeats the total of its partitions once analyzed
+        cursor.execute(
+            "SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0) FROM pg_class WHERE relkind <> 'p' "
+            "AND (oid = to_regclass(%s) OR oid IN (SELECT relid FROM pg_partition_tree(to_regclass(%s))))",
+            [table, table]
+        )
+        return int(cursor.fetchone()[0])
+
+
+def estimated_count(queryset):
+    """Planner estimate of the rows of ``queryset``, or None if unavailable"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    if not queryset.query.where and not queryset.query.distinct:
+        return table_estimate(connection, queryset.model._meta.db_table)
+    plan = json.loads(queryset.explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def approximate_count(queryset):
+    """Exact count of small results, planner estimate of large ones"""
+    estimate = estimated_count(queryset)
+    if estimate is None or estimate < EXACT_COUNT_THRESHOLD:
+        return queryset.count()
+    return estimate
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count  # Not a queryset
+        return approximate_count(self.object_list)
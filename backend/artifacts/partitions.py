@@ -0,0 +1,119 @@
+"""
+Monthly range partitions of the visit log on PostgreSQL.
+
+Migration 0005 turns ``artifacts_museumvisit`` into a table partitioned by
+``visited_at``, with one partition per month and a default partition catching
+rows outside them. ``manage.py visit_partitions`` creates partitions ahead of
+time and archives then drops the ones past the retention window.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+
+
+VISIT_TABLE = 'artifacts_museumvisit'
+DEFAULT_PARTITION = f'{VISIT_TABLE}_default'
+PARTITION_NAME = re.compile(rf'^{VISIT_TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+
+def month_start(value):
+    return value.astimezone(dt_timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    return f'{VISIT_TABLE}_p{month:%Y_%m}'
+
+
+def partition_bounds(month):
+    return f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+
+def is_partitioned(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [VISIT_TABLE]
+        )
+        return cursor.fetchone()[0]
+
+
+def month_partitions(connection):
+    """{month start: partition name} of the attached monthly partitions"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [VISIT_TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            partitions[datetime(year, month, 1, tzinfo=dt_timezone.utc)] = name
+    return partitions
+
+
+def create_partition(connection, month):
+    """Create the partition of ``month``, moving its rows out of the default partition"""
+    name = partition_name(month)
+    quote = connection.ops.quote_name
+    end = add_months(month, 1)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL, to_regclass(%s) IS NOT NULL",
+                       [name, DEFAULT_PARTITION])
+        exists, has_default = cursor.fetchone()
+        if exists:
+            return False
+
+        stray_rows = False
+        if has_default:
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {quote(DEFAULT_PARTITION)} "
+                f"WHERE visited_at >= %s AND visited_at < %s)",
+                [month, end]
+            )
+            stray_rows = cursor.fetchone()[0]
+
+        if stray_rows:
+            # The default partition may not keep rows covered by a new partition
+            cursor.execute(
+                f"CREATE TABLE {quote(name)} (LIKE {quote(VISIT_TABLE)} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} "
+                f"WHERE visited_at >= %s AND visited_at < %s RETURNING *) "
+                f"INSERT INTO {quote(name)} SELECT * FROM moved",
+                [month, end]
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote(VISIT_TABLE)} ATTACH PARTITION {quote(name)} "
+                f"FOR VALUES {partition_bounds(month)}"
+            )
+        else:
+            cursor.execute(
+                f"CREATE TABLE {quote(name)} PARTITION OF {quote(VISIT_TABLE)} "
+                f"FOR VALUES {partition_bounds(month)}"
+            )
+    return True
+
+
+def drop_partition(connection, month):
+    name = connection.ops.quote_name(partition_name(month))
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {connection.ops.quote_name(VISIT_TABLE)} DETACH PARTITION {name}")
+        cursor.execute(f"DROP TABLE {name}")
@@ -0,0 +1,245 @@
+"""
+Visitor path analysis: how sessions move from one artifact to the next.
+
+``PathAnalyzer`` walks the visit log ordered by ``(session_id, visited_at)``
+(a server-side cursor on PostgreSQL) and only keeps the current session's
+last visit plus fixed-size counters: transitions between artifacts, entries,
+exits, dwell-time and path-length histograms. Memory depends on the number
+of artifacts and distinct transitions, never on the number of visits.
+
+The results replace ``PathTransition``, ``ArtifactPathStats`` and
+``PathSummary`` in one transaction (``manage.py analyze_visit_paths``).
+"""
+from bisect import bisect_right
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.utils import timezone
+
+from .db_routers import PRIMARY_DB
+from .models import ArtifactPathStats, MuseumVisit, PathSummary, PathTransition
+
+
+# Upper bounds (seconds) of the dwell-time buckets; the last bucket is open
+DWELL_BUCKETS = (10, 30, 60, 120, 300, 600)
+# Sessions of this many visits or more share the last path-length bucket
+MAX_PATH_LENGTH = 20
+
+
+def dwell_labels():
+    bounds = (0,) + DWELL_BUCKETS
+    return [f'{low}-{high}s' for low, high in zip(bounds, DWELL_BUCKETS)] + [f'{DWELL_BUCKETS[-1]}s+']
+
+
+def path_length_labels():
+    return [str(length) for length in range(1, MAX_PATH_LENGTH)] + [f'{MAX_PATH_LENGTH}+']
+
+
+def dwell_bucket(seconds):
+    return bisect_right(DWELL_BUCKETS, seconds or 0)
+
+
+class ArtifactCounters:
+    __slots__ = ('visits', 'entries', 'exits', 'dwell')
+
+    def __init__(self):
+        self.visits = 0
+        self.entries = 0
+        self.exits = 0
+        self.dwell = [0] * (len(DWELL_BUCKETS) + 1)
+
+
+class PathAnalyzer:
+    def __init__(self):
+        self.transitions = Counter()
+        self.artifacts = {}
+        self.path_lengths = [0] * MAX_PATH_LENGTH
+        self.dwell = [0] * (len(DWELL_BUCKETS) + 1)
+        self.sessions = 0
+        self.visits = 0
+        self._session = None
+        self._previous = None
+        self._length = 0
+
+    def counters(self, artifact_id):
+        counters = self.artifacts.get(artifact_id)
+        if counters is None:
+            counters = self.artifacts[artifact_id] = ArtifactCounters()
+        return counters
+
+    def add(self, session_id, artifact_id, duration_seconds):
+        """Add the next visit, in (session_id, visited_at) order"""
+        counters = self.counters(artifact_id)
+        if session_id != self._session:
+            self.end_session()
+            self._session = session_id
+            counters.entries += 1
+        elif artifact_id != self._previous:
+            # Re-scanning the same artifact is not a move
+            self.transitions[self._previous, artifact_id] += 1
+
+        bucket = dwell_bucket(duration_seconds)
+        counters.visits += 1
+        counters.dwell[bucket] += 1
+        self.dwell[bucket] += 1
+        self.visits += 1
+        self._length += 1
+        self._previous = artifact_id
+
+    def end_session(self):
+        if self._session is None:
+            return
+        self.sessions += 1
+        self.path_lengths[min(self._length, MAX_PATH_LENGTH) - 1] += 1
+        self.artifacts[self._previous].exits += 1
+        self._session, self._previous, self._length = None, None, 0
+
+    def save(self, start, end, using=PRIMARY_DB):
+        """Replace the stored path aggregates with this analysis"""
+        self.end_session()
+        with transaction.atomic(using=using):
+            PathTransition.objects.using(using).all().delete()
+            ArtifactPathStats.objects.using(using).all().delete()
+            PathSummary.objects.using(using).all().delete()
+
+            PathTransition.objects.using(using).bulk_create(
+                (
+                    PathTransition(from_artifact_id=source, to_artifact_id=target, count=count)
+                    for (source, target), count in self.transitions.items()
+                ),
+                batch_size=2000
+            )
+            ArtifactPathStats.objects.using(using).bulk_create(
+                (
+                    ArtifactPathStats(
+                        artifact_id=artifact_id, visits=counters.visits, entries=counters.entries,
+                        exits=counters.exits, dwell_histogram=counters.dwell,
+                    )
+                    for artifact_id, counters in self.artifacts.items()
+                ),
+                batch_size=2000
+            )
+            return PathSummary.objects.using(using).create(
+                start=start, end=end, sessions=self.sessions, visits=self.visits,
+                path_length_histogram=self.path_lengths, dwell_histogram=self.dwell,
+            )
+
+
+def analyze_paths(start=None, end=None, using=PRIMARY_DB, chunk_size=10000, progress=None):
+    """
+    Stream the visits of [start, end) into a PathAnalyzer and store the result.
+
+    ``using`` is the database read from (a replica is fine); the aggregates
+    are written to the primary. ``progress`` is called with the visit count
+    every ``chunk_size`` visits.
+    """
+    end = end or timezone.now()
+    visits = MuseumVisit.objects.using(using).filter(visited_at__lt=end)
+    if start is not None:
+        visits = visits.filter(visited_at__gte=start)
+    rows = visits.order_by('session_id', 'visited_at').values_list(
+        'session_id', 'artifact_id', 'duration_seconds'
+    ).iterator(chunk_size=chunk_size)
+
+    analyzer = PathAnalyzer()
+    for session_id, artifact_id, duration_seconds in rows:
+        analyzer.add(session_id, artifact_id, duration_seconds)
+        if progress and analyzer.visits % chunk_size == 0:
+            progress(analyzer.visits)
+    return analyzer.save(start, end)
+
+
+# Artifacts with fewer visits are left out of the drop-off ranking
+DROP_OFF_MIN_VISITS = 20
+
+
+def artifact_ref(artifact):
+    return {'id': artifact.id, 'name': artifact.name}
+
+
+def histogram(labels, counts, key):
+    return [{key: label, 'count': count} for label, count in zip(labels, counts)]
+
+
+def path_overview(summary, limit):
+    """Path lengths, dwell times, most common moves and main drop-off points"""
+    transitions = PathTransition.objects.select_related(
+        'from_artifact', 'to_artifact'
+    ).order_by('-count')[:limit]
+    drop_offs = ArtifactPathStats.objects.filter(
+        visits__gte=DROP_OFF_MIN_VISITS
+    ).annotate(
+        exit_rate=ExpressionWrapper(F('exits') * 1.0 / F('visits'), output_field=FloatField())
+    ).select_related('artifact').order_by('-exit_rate', '-visits')[:limit]
+    return {
+        'sessions': summary.sessions,
+        'visits': summary.visits,
+        'average_path_length': round(summary.visits / summary.sessions, 2) if summary.sessions else 0,
+        # Lengths of the last bucket are counted as MAX_PATH_LENGTH
+        'median_path_length': median_bucket(summary.path_length_histogram),
+        'path_lengths': histogram(path_length_labels(), summary.path_length_histogram, 'length'),
+        'dwell_times': histogram(dwell_labels(), summary.dwell_histogram, 'range'),
+        'top_transitions': [
+            {
+                'from': artifact_ref(transition.from_artifact),
+                'to': artifact_ref(transition.to_artifact),
+                'count': transition.count,
+            }
+            for transition in transitions
+        ],
+        'drop_off': [
+            {
+                **artifact_ref(stats.artifact),
+                'visits': stats.visits,
+                'exits': stats.exits,
+                'exit_rate': round(stats.exit_rate, 4),
+            }
+            for stats in drop_offs
+        ],
+    }
+
+
+def median_bucket(counts):
+    """Path length of the median session"""
+    half, seen = sum(counts) / 2, 0
+    for length, count in enumerate(counts, start=1):
+        seen += count
+        if count and seen >= half:
+            return length
+    return 0
+
+
+def artifact_paths(artifact, limit):
+    """Where the visitors of an artifact come from, go next, and how long they stay"""
+    stats = ArtifactPathStats.objects.filter(artifact=artifact).first()
+    outgoing = PathTransition.objects.filter(from_artifact=artifact).select_related(
+        'to_artifact'
+    ).order_by('-count')[:limit]
+    incoming = PathTransition.objects.filter(to_artifact=artifact).select_related(
+        'from_artifact'
+    ).order_by('-count')[:limit]
+    visits = stats.visits if stats else 0
+    return {
+        'artifact': artifact_ref(artifact),
+        'visits': visits,
+        'entries': stats.entries if stats else 0,
+        'exits': stats.exits if stats else 0,
+        'exit_rate': round(stats.exits / visits, 4) if visits else 0,
+        'dwell_times': histogram(
+            dwell_labels(), stats.dwell_histogram if stats else [0] * (len(DWELL_BUCKETS) + 1), 'range'
+        ),
+        'next': [
+            {
+                **artifact_ref(transition.to_artifact),
+                'count': transition.count,
+                # Share of this artifact's visits followed by that move
+                'share': round(transition.count / visits, 4) if visits else 0,
+            }
+            for transition in outgoing
+        ],
+        'previous': [
+            {**artifact_ref(transition.from_artifact), 'count': transition.count}
+            for transition in incoming
+        ],
+    }
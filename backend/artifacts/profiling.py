@@ -0,0 +1,91 @@
+"""
+On-demand request profiling for staff.
+
+A staff member adds ``?_profile=1`` or an ``X-Profile-Request: 1`` header to a
+request; it then runs under cProfile while every SQL statement is timed, and
+the result is stored as a ``RequestProfile`` (browsable in the admin, capped to
+``PROFILING_MAX_STORED`` rows). The response carries ``X-Profile-Id``.
+"""
+import io
+import pstats
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+PROFILE_QUERY_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile-Request'
+
+# cProfile hooks the interpreter, so only one request is profiled at a time
+profiler_lock = threading.Lock()
+
+
+class ProfileSession:
+    """SQL timeline of the profiled request, shared with sync_to_async threads"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = []
+        self.view = ''
+
+
+_current_session = ContextVar('profile_session', default=None)
+
+
+def record_sql_timeline(execute, sql, params, many, context):
+    """Database execute wrapper installed on every connection (see apps.py)"""
+    session = _current_session.get()
+    if session is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        end = time.perf_counter()
+        session.queries.append({
+            'start_ms': round((start - session.start) * 1000, 3),
+            'duration_ms': round((end - start) * 1000, 3),
+            'database': context['connection'].alias,
+            'sql': sql if not many else f'{sql}  -- executemany',
+        })
+
+
+def profiling_requested(request):
+    return (
+        request.GET.get(PROFILE_QUERY_PARAM) == '1' or
+        request.headers.get(PROFILE_HEADER) == '1'
+    )
+
+
+def format_stats(profiler, sort, limit):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue().strip()
+
+
+def save_profile(request, response, profiler, session, duration, view):
+    from .models import RequestProfile
+
+    limit = getattr(settings, 'PROFILING_STATS_LIMIT', 40)
+    profile = RequestProfile.objects.create(
+        method=request.method,
+        path=request.get_full_path()[:500],
+        view=view,
+        status_code=response.status_code,
+        user=request.user.get_username(),
+        duration_ms=round(duration * 1000, 3),
+        query_count=len(session.queries),
+        sql_time_ms=round(sum(query['duration_ms'] for query in session.queries), 3),
+        cumulative_stats=format_stats(profiler, pstats.SortKey.CUMULATIVE, limit),
+        internal_stats=format_stats(profiler, pstats.SortKey.TIME, limit),
+        sql_timeline=session.queries,
+    )
+
+    # Keep the store bounded
+    keep = getattr(settings, 'PROFILING_MAX_STORED', 200)
+    stale = RequestProfile.objects.order_by('-created_at').values_list('pk', flat=True)[keep:]
+    RequestProfile.objects.filter(pk__in=list(stale)).delete()
+    return profile
@@ -0,0 +1,124 @@
+"""
+JSON rendering and parsing with orjson when it is installed.
+
+``FastJSONRenderer`` and ``FastJSONParser`` are drop-in replacements for
+DRF's ``JSONRenderer`` and ``JSONParser`` (see ``REST_FRAMEWORK`` in the
+settings) and produce the same bytes: compact separators, UTF-8 output,
+``Z`` for UTC datetimes and escaped U+2028/U+2029. orjson serializes
+dicts, lists, strings, UUIDs and datetimes natively; everything else
+(lazy translation strings, ``Decimal``, querysets...) goes through DRF's
+``JSONEncoder.default``, so both encoders agree on every type.
+
+Without orjson, or when a client asks for indented output, DRF's stdlib
+encoder is used unchanged.
+
+``StreamingJSONResponse`` renders a large list as a stream of chunks
+instead of one string, keeping memory flat and sending the first bytes
+early.
+"""
+import codecs
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Items encoded per chunk of a streamed list
+STREAM_CHUNK_SIZE = 500
+
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def escape_line_separators(content):
+    # JSON allows them in strings, JavaScript does not (same as DRF)
+    for character, escaped in LINE_SEPARATORS:
+        if character in content:
+            content = content.replace(character, escaped)
+    return content
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    encode_default = JSONEncoder().default
+
+    def dumps(data):
+        """Compact UTF-8 JSON of ``data``, as bytes"""
+        return escape_line_separators(orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS))
+
+    def loads(content):
+        return orjson.loads(content)
+else:
+    def dumps(data):
+        """Compact UTF-8 JSON of ``data``, as bytes"""
+        content = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+        return escape_line_separators(content.encode())
+
+    def loads(content):
+        return json.loads(content)
+
+
+def json_ready(data):
+    """``data`` with UUIDs, dates and lazy strings rendered, ready to cache"""
+    return loads(dumps(data))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer using orjson for the compact output of the API"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser using orjson for UTF-8 request bodies"""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # Rejects NaN and Infinity, like the strict stdlib parser
+            return orjson.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def iter_json(items, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield the JSON array of ``items`` (any iterable) in chunks"""
+    yield b'['
+    chunk = []
+    first = True
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            # dumps([...]) minus the brackets: the items, comma separated
+            yield (b'' if first else b',') + dumps(chunk)[1:-1]
+            chunk = []
+            first = False
+    if chunk:
+        yield (b'' if first else b',') + dumps(chunk)[1:-1]
+    yield b']'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """A JSON array response streamed from an iterable of JSON-ready items"""
+
+    def __init__(self, items, chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(iter_json(items, chunk_size), **kwargs)
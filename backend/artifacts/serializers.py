@@ -11,6 +11,14 @@ class PeriodSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'start_year', 'end_year', 'description']
 
 
+class TimelinePeriodSerializer(serializers.ModelSerializer):
+    artifact_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Period
+        fields = ['id', 'name', 'start_year', 'end_year', 'artifact_count']
+
+
 class CultureSerializer(serializers.ModelSerializer):
     class Meta:
         model = Culture
@@ -25,6 +33,9 @@ class CollectionSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'curator', 'image', 'artifact_count', 'created_at']
     
     def get_artifact_count(self, obj):
+        # Precomputed by callers that already know the count (annotation, async views)
+        if hasattr(obj, 'displayed_artifact_count'):
+            return obj.displayed_artifact_count
         return obj.artifacts.filter(is_on_display=True).count()
 
 
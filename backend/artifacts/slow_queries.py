@@ -0,0 +1,106 @@
+"""
+Slow-query log, off unless ``SLOW_QUERY_LOG`` is set.
+
+Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are stored as ``SlowQuery``
+rows together with the request path and view that issued them: one INSERT
+on the request path, nothing else. On PostgreSQL an opt-in share
+(``SLOW_QUERY_EXPLAIN_SAMPLE``, 0 by default) of slow SELECTs is re-run under
+``EXPLAIN (ANALYZE, BUFFERS)`` to keep the actual plan; this executes the
+query a second time, so keep the sample small under load.
+
+``manage.py slow_query_report`` summarizes the top offenders and trims the
+table to the latest ``SLOW_QUERY_MAX_STORED`` rows (run it periodically).
+"""
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+
+from .db_routers import PRIMARY_DB
+from .metrics import current_request
+from .nplusone import normalize_sql
+
+
+logger = logging.getLogger('artifacts.slow_queries')
+
+_recording = ContextVar('recording_slow_query', default=False)
+
+
+def explain_analyze(connection, sql, params):
+    """Actual plan of a SELECT, run in a savepoint so a failure cannot abort the transaction"""
+    savepoint = connection.in_atomic_block and connection.savepoint()
+    try:
+        with connection.connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}', params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+    except DatabaseError as e:
+        if savepoint:
+            connection.savepoint_rollback(savepoint)
+        return f'EXPLAIN failed: {e}'
+    if savepoint:
+        connection.savepoint_commit(savepoint)
+    return plan
+
+
+def store_slow_query(connection, sql, params, many, duration):
+    from .models import SlowQuery
+
+    explain = ''
+    sample = getattr(settings, 'SLOW_QUERY_EXPLAIN_SAMPLE', 0)
+    if (
+        sample > 0 and connection.vendor == 'postgresql' and not many and
+        sql.lstrip()[:6].upper() == 'SELECT' and
+        random.random() < sample
+    ):
+        explain = explain_analyze(connection, sql, params)
+
+    path, view = current_request()
+    # Savepoint: a failed insert must not abort the caller's transaction
+    with transaction.atomic(using=PRIMARY_DB):
+        SlowQuery.objects.using(PRIMARY_DB).create(
+            sql=sql,
+            shape=normalize_sql(sql),
+            duration_ms=round(duration * 1000, 3),
+            database=connection.alias,
+            view=view[:200],
+            path=path[:500],
+            explain=explain,
+        )
+
+
+def trim_slow_queries(keep=None):
+    """Delete all but the latest ``keep`` logged queries, returning how many went"""
+    from .models import SlowQuery
+
+    if keep is None:
+        keep = getattr(settings, 'SLOW_QUERY_MAX_STORED', 1000)
+    queries = SlowQuery.objects.using(PRIMARY_DB)
+    cutoff = queries.order_by('-created_at', '-pk').values_list('created_at', 'pk')[keep:keep + 1].first()
+    if cutoff is None:
+        return 0
+    created_at, pk = cutoff
+    deleted, _ = queries.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lte=pk)
+    ).delete()
+    return deleted
+
+
+def record_slow_queries(execute, sql, params, many, context):
+    """Database execute wrapper installed on every connection (see apps.py)"""
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - start
+
+    if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS and not _recording.get():
+        token = _recording.set(True)
+        try:
+            store_slow_query(context['connection'], sql, params, many, duration)
+        except DatabaseError:
+            logger.exception("Could not record slow query")
+        finally:
+            _recording.reset(token)
+    return result
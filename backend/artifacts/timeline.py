@@ -0,0 +1,69 @@
+"""
+Year-based queries on the period intervals (``start_year``, ``end_year``).
+
+Artifacts carry no dates of their own: an artifact spans a year when its
+period overlaps it. A missing bound is open (an ongoing period has no
+``end_year``). Periods are few, so the overlap is resolved on the period
+table through its ``(start_year, end_year)`` index and joined to the
+artifacts on ``period_id``, in the same query.
+"""
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Period
+
+
+YEAR_RANGE_ERROR = 'year, year_from and year_to must be integers, year_from <= year_to'
+
+def parse_year_range(params):
+    """
+    (start, end) from ``?year=`` or ``?year_from=&year_to=`` (either bound
+    may be omitted), None without year parameters. Raises ValueError.
+    """
+    year = params.get('year')
+    if year:
+        return int(year), int(year)
+    start, end = params.get('year_from'), params.get('year_to')
+    if not start and not end:
+        return None
+    start = int(start) if start else None
+    end = int(end) if end else None
+    if start is not None and end is not None and start > end:
+        raise ValueError("year_from is after year_to")
+    return start, end
+
+
+def overlaps(start, end, prefix=''):
+    """Condition on periods (or ``period__`` relations) overlapping [start, end]"""
+    condition = Q()
+    if end is not None:
+        condition &= Q(**{f'{prefix}start_year__lte': end}) | Q(**{f'{prefix}start_year__isnull': True})
+    if start is not None:
+        condition &= Q(**{f'{prefix}end_year__gte': start}) | Q(**{f'{prefix}end_year__isnull': True})
+    return condition
+
+
+def filter_by_years(queryset, params):
+    """Artifacts whose period overlaps the requested years"""
+    years = parse_year_range(params)
+    if years is None:
+        return queryset
+    return queryset.filter(overlaps(*years, prefix='period__'), period__isnull=False)
+
+
+class YearRangeFilter(BaseFilterBackend):
+    """``?year=`` and ``?year_from=&year_to=`` for artifact lists"""
+
+    def filter_queryset(self, request, queryset, view):
+        try:
+            return filter_by_years(queryset, request.query_params)
+        except ValueError:
+            raise ValidationError({'error': YEAR_RANGE_ERROR})
+
+
+def timeline(start=None, end=None):
+    """Periods in chronological order with their displayed-artifact counts, in one query"""
+    return Period.objects.filter(overlaps(start, end)).annotate(
+        artifact_count=Count('artifacts', filter=Q(artifacts__is_on_display=True))
+    ).order_by('start_year', 'end_year', 'pk')
@@ -0,0 +1,119 @@
+"""
+Time-decayed popularity ("trending now") per artifact.
+
+Each visit counts for ``2 ** (-age / half-life)``: an artifact's score is the
+number of visits it received, each discounted by its age. Scores are stored
+as logarithms against a fixed epoch (forward decay): a visit at ``t`` adds
+``exp(rate * (t - EPOCH))``, so a stored score never has to be touched again
+as time passes, all artifacts share the same scale and the top-N is read
+straight from the index on ``log_score``. The current score is
+``exp(log_score - rate * (now - EPOCH))``.
+
+Working in the log domain keeps the stored values small (they grow linearly
+with time) and lets each visit be folded in with a single UPDATE
+(log-add-exp). ``manage.py trending_scores`` periodically prunes the scores
+that have decayed to nothing and reconciles them with the hourly aggregates.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from .db_routers import PRIMARY_DB
+from .models import TrendingScore, VisitAggregate
+
+
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+# Contributions older than this many half-lives weigh less than 1e-6
+HORIZON_HALF_LIVES = 20
+
+
+def decay_rate():
+    """Decay per second for TRENDING_HALF_LIFE_HOURS"""
+    return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def log_weight(when, count=1):
+    return math.log(count) + decay_rate() * (when - EPOCH).total_seconds()
+
+
+def current_score(log_score, now=None):
+    return math.exp(log_score - log_weight(now or timezone.now()))
+
+
+def record_trending(artifact_id, when, count=1):
+    """Fold ``count`` visits made at ``when`` into the artifact's score"""
+    weight = Value(log_weight(when, count), output_field=FloatField())
+    scores = TrendingScore.objects.using(PRIMARY_DB).filter(artifact_id=artifact_id)
+    # log(exp(a) + exp(b)) computed without overflow
+    increment = {
+        'log_score': Greatest(F('log_score'), weight) + Ln(
+            Value(1.0, output_field=FloatField()) + Exp(-Abs(F('log_score') - weight))
+        ),
+    }
+    if scores.update(**increment):
+        return
+    try:
+        with transaction.atomic(using=PRIMARY_DB):
+            TrendingScore.objects.using(PRIMARY_DB).create(
+                artifact_id=artifact_id, log_score=log_weight(when, count)
+            )
+    except IntegrityError:
+        # Another request created the score in the meantime
+        scores.update(**increment)
+
+
+def trending(limit, now=None):
+    """[(artifact, current score)] of the top ``limit`` displayed artifacts"""
+    now = now or timezone.now()
+    scores = TrendingScore.objects.filter(
+        artifact__is_on_display=True,
+        log_score__gte=log_weight(now, settings.TRENDING_MIN_SCORE),
+    ).select_related(
+        'artifact__collection', 'artifact__period', 'artifact__culture'
+    ).order_by('-log_score')[:limit]
+    return [(score.artifact, current_score(score.log_score, now)) for score in scores]
+
+
+def prune_trending(now=None, using=PRIMARY_DB):
+    """Delete the scores that decayed below TRENDING_MIN_SCORE"""
+    threshold = log_weight(now or timezone.now(), settings.TRENDING_MIN_SCORE)
+    deleted, _ = TrendingScore.objects.using(using).filter(log_score__lt=threshold).delete()
+    return deleted
+
+
+def rebuild_trending(now=None, using=PRIMARY_DB):
+    """
+    Recompute every score from the hourly aggregates of the last
+    HORIZON_HALF_LIVES half-lives, each hour counted at its midpoint.
+    """
+    now = now or timezone.now()
+    start = now - timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS * HORIZON_HALF_LIVES)
+    buckets = VisitAggregate.objects.using(using).filter(
+        bucket__gte=start, bucket__lte=now
+    ).values_list('artifact_id', 'bucket', 'visit_count').order_by('artifact_id')
+
+    log_scores = {}
+    for artifact_id, bucket, visit_count in buckets.iterator(chunk_size=5000):
+        if not visit_count:
+            continue
+        weight = log_weight(bucket + timedelta(minutes=30), visit_count)
+        total = log_scores.get(artifact_id)
+        if total is None:
+            log_scores[artifact_id] = weight
+        else:
+            high = max(total, weight)
+            log_scores[artifact_id] = high + math.log1p(math.exp(-abs(total - weight)))
+
+    threshold = log_weight(now, settings.TRENDING_MIN_SCORE)
+    with transaction.atomic(using=using):
+        TrendingScore.objects.using(using).all().delete()
+        TrendingScore.objects.using(using).bulk_create([
+            TrendingScore(artifact_id=artifact_id, log_score=log_score)
+            for artifact_id, log_score in log_scores.items() if log_score >= threshold
+        ], batch_size=1000)
+    return len(log_scores)
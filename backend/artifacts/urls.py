@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
+from .home import home_view
+from .metrics import metrics_view
 from .views import (
     PeriodViewSet, CultureViewSet, CollectionViewSet,
     ArtifactViewSet, AudioGuideViewSet, VideoContentViewSet,
@@ -15,7 +19,31 @@ router.register(r'audio-guides', AudioGuideViewSet, basename='audio-guide')
 router.register(r'videos', VideoContentViewSet, basename='video')
 
 urlpatterns = [
+    path('metrics', metrics_view, name='metrics'),
+    path('home/', home_view, name='home'),
+    path('artifacts/suggest/', async_views.artifact_suggest, name='artifact-suggest'),
+]
+
+if settings.ASYNC_READ_PATH:
+    # Served natively by the ASGI worker; listed first to shadow the DRF routes
+    urlpatterns += [
+        path('artifacts/', async_views.artifact_list, name='artifact-list'),
+        path('artifacts/<uuid:pk>/', async_views.artifact_detail, name='artifact-detail'),
+        path('qr-scan/', async_views.qr_scan, name='qr-scan'),
+        path('stats/dashboard/', async_views.stats_dashboard, name='stats-dashboard'),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
     path('qr-scan/', QRScannerViewSet.as_view({'post': 'scan'}), name='qr-scan'),
+    path('timeline/', PeriodViewSet.as_view({'get': 'timeline'}), name='timeline'),
     path('stats/dashboard/', MuseumStatsViewSet.as_view({'get': 'dashboard'}), name='stats-dashboard'),
+    path('stats/timeseries/', MuseumStatsViewSet.as_view({'get': 'timeseries'}), name='stats-timeseries'),
+    path('stats/heatmap/', MuseumStatsViewSet.as_view({'get': 'heatmap'}), name='stats-heatmap'),
+    path(
+        'stats/unique-visitors/', MuseumStatsViewSet.as_view({'get': 'unique_visitors'}),
+        name='stats-unique-visitors'
+    ),
+    path('stats/paths/', MuseumStatsViewSet.as_view({'get': 'paths'}), name='stats-paths'),
+    path('stats/export/', MuseumStatsViewSet.as_view({'get': 'export'}), name='stats-export'),
 ]
\ No newline at end of file
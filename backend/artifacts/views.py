@@ -1,21 +1,41 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import get_language
 from django.db.models import Count
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+import uuid
+from .aggregates import (
+    record_visit, record_visitor, unique_visitors, visit_heatmap, visit_timeseries
+)
+from .db_routers import PRIMARY_DB
+from .documents import collection_counts, document_detail_query, document_list, render_detail, render_list
+from .facets import BOOLEAN_FACETS, MEDIA_FACETS, cached_search_facets, has_media
+from .featured import ROTATIONS, featured_pool, rotate
+from .list_rows import ArtifactListRows
+from .metrics import record_cache_lookup
+from .paths import artifact_paths, path_overview
+from .renderers import STREAM_CHUNK_SIZE, StreamingJSONResponse
+from .timeline import YEAR_RANGE_ERROR, YearRangeFilter, parse_year_range, timeline
+from .trending import record_trending, trending
 from .models import (
     Period, Culture, Collection, Artifact, 
-    ArtifactImage, AudioGuide, VideoContent, MuseumVisit
+    ArtifactImage, AudioGuide, VideoContent, MuseumVisit, PathSummary
 )
 from .serializers import (
     PeriodSerializer, CultureSerializer, CollectionSerializer,
     ArtifactListSerializer, ArtifactDetailSerializer, ArtifactSearchSerializer,
     FeaturedArtifactSerializer, AudioGuideSerializer, VideoContentSerializer,
-    MuseumVisitSerializer, QRCodeSerializer
+    MuseumVisitSerializer, QRCodeSerializer, TimelinePeriodSerializer
 )
 
 
@@ -25,6 +45,15 @@ class PeriodViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = PeriodSerializer
     permission_classes = [AllowAny]
 
+    @action(detail=False, methods=['get'])
+    def timeline(self, request):
+        """Periods with their artifact counts, optionally limited to ?year= or ?year_from=&year_to="""
+        try:
+            years = parse_year_range(request.query_params) or (None, None)
+        except ValueError:
+            return Response({'error': YEAR_RANGE_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(TimelinePeriodSerializer(timeline(*years), many=True).data)
+
 
 class CultureViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Culture.objects.all()
@@ -40,10 +69,14 @@ class CollectionViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['name_fr', 'name_en', 'name_wo']
 
 
+TRENDING_DEFAULT_LIMIT = 10
+TRENDING_MAX_LIMIT = 50
+
+
 class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Artifact.objects.filter(is_on_display=True)
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, YearRangeFilter, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['collection', 'period', 'culture', 'is_featured']
     search_fields = [
         'name_fr', 'name_en', 'name_wo',
@@ -60,8 +93,35 @@ class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
             return ArtifactSearchSerializer
         elif self.action == 'featured':
             return FeaturedArtifactSerializer
+        elif self.action == 'trending':
+            return ArtifactListSerializer
         return ArtifactDetailSerializer
     
+    def list(self, request, *args, **kwargs):
+        if settings.ARTIFACT_READ_MODEL:
+            documents = document_list(request.query_params, get_language())
+            if documents is not None:
+                page = self.paginate_queryset(documents)
+                return self.get_paginated_response(render_list(page, request))
+
+        # Same payload as ArtifactListSerializer, built from .values() rows
+        rows = ArtifactListRows(request)
+        queryset = rows.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.render(page))
+        return Response(rows.render(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if settings.ARTIFACT_READ_MODEL:
+            try:
+                document = document_detail_query(kwargs['pk'], get_language()).first()
+            except (ValidationError, ValueError):
+                document = None  # Not a UUID: the normal path answers 404
+            if document is not None:
+                return Response(render_detail(document, request, collection_counts()))
+        return super().retrieve(request, *args, **kwargs)
+
     def get_queryset(self):
         queryset = super().get_queryset()
         
@@ -75,13 +135,14 @@ class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
     
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Advanced search endpoint"""
+        """Advanced search endpoint, with facet counts over all the matches"""
         query = request.query_params.get('q', '')
-        period = request.query_params.get('period')
-        culture = request.query_params.get('culture')
-        collection = request.query_params.get('collection')
+        params = {
+            field: request.query_params.get(field, '')
+            for field in ('period', 'culture', 'collection', *BOOLEAN_FACETS)
+        }
         
-        artifacts = self.get_queryset()
+        artifacts = self.get_queryset().select_related('collection')
         
         if query:
             artifacts = artifacts.filter(
@@ -94,27 +155,58 @@ class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
                 Q(inventory_number__icontains=query)
             )
         
-        if period:
-            artifacts = artifacts.filter(period_id=period)
-        if culture:
-            artifacts = artifacts.filter(culture_id=culture)
-        if collection:
-            artifacts = artifacts.filter(collection_id=collection)
+        if params['period']:
+            artifacts = artifacts.filter(period_id=params['period'])
+        if params['culture']:
+            artifacts = artifacts.filter(culture_id=params['culture'])
+        if params['collection']:
+            artifacts = artifacts.filter(collection_id=params['collection'])
+        for field in BOOLEAN_FACETS:
+            value = params[field]
+            if value not in ('', 'true', 'false'):
+                return Response(
+                    {'error': f'{field} must be true or false'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if value:
+                condition = has_media(field) if field in MEDIA_FACETS else Q(is_featured=True)
+                artifacts = artifacts.filter(condition) if value == 'true' else artifacts.exclude(condition)
         
         page = self.paginate_queryset(artifacts)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(serializer.data)
+            response.data['facets'] = cached_search_facets(
+                artifacts, {'q': query, **params}, get_language()
+            )
+            return response
         
         serializer = self.get_serializer(artifacts, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
-        """Get featured artifacts"""
-        featured = self.get_queryset().filter(is_featured=True)[:10]
-        serializer = self.get_serializer(featured, many=True)
-        return Response(serializer.data)
+        """Featured artifacts from the cached pool, optionally rotated hourly or daily"""
+        rotation = request.query_params.get('rotation', settings.FEATURED_ROTATION) or None
+        if rotation not in (None, *ROTATIONS):
+            return Response(
+                {'error': 'rotation must be hourly or daily'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(rotate(featured_pool(request, get_language()), rotation))
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """Artifacts with the most recent visits, read from the decayed scores"""
+        try:
+            limit = min(int(request.query_params.get('limit', TRENDING_DEFAULT_LIMIT)), TRENDING_MAX_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        top = trending(max(limit, 1))
+        data = self.get_serializer([artifact for artifact, _ in top], many=True).data
+        for item, (_, score) in zip(data, top):
+            item['trending_score'] = round(score, 3)
+        return Response(data)
     
     @action(detail=True, methods=['post'])
     def track_visit(self, request, pk=None):
@@ -130,12 +222,17 @@ class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        visit = MuseumVisit.objects.create(
-            session_id=session_id,
-            artifact=artifact,
-            language=language,
-            duration_seconds=duration
-        )
+        # The visit and everything derived from it are committed together
+        with transaction.atomic(using=PRIMARY_DB):
+            visit = MuseumVisit.objects.create(
+                session_id=session_id,
+                artifact=artifact,
+                language=language,
+                duration_seconds=duration
+            )
+            record_visit(visit)
+            record_trending(visit.artifact_id, visit.visited_at)
+            record_visitor(visit)  # Last: its row lock is held only until the commit
         
         serializer = MuseumVisitSerializer(visit)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -198,8 +295,83 @@ class QRScannerViewSet(viewsets.ViewSet):
             )
 
 
+TIMESERIES_STEPS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+TIMESERIES_DEFAULT_POINTS = {'hour': 48, 'day': 30, 'week': 26}
+ANALYTICS_MAX_POINTS = 5000
+ANALYTICS_CACHE_TIMEOUT = getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 60)
+PATHS_DEFAULT_LIMIT = 10
+VISIT_EXPORT_FIELDS = ['id', 'session_id', 'artifact_id', 'language', 'duration_seconds', 'visited_at']
+PATHS_MAX_LIMIT = 100
+
+
+def parse_bound(value, name):
+    """ISO date or datetime query parameter, as an aware UTC datetime"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'{name} must be an ISO date or datetime')
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
+
+
+def analytics_params(request, default_span):
+    """Validated (start, end, filters) of a visit analytics request"""
+    params = request.query_params
+    if params.get('end'):
+        end = parse_bound(params['end'], 'end')
+    else:
+        # Next hour boundary: stable cache keys, and aggregates are hourly anyway
+        end = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    start = parse_bound(params['start'], 'start') if params.get('start') else end - default_span
+    if start >= end:
+        raise ValueError('start must be before end')
+
+    filters = {}
+    if params.get('artifact'):
+        try:
+            filters['artifact'] = uuid.UUID(params['artifact'])
+        except ValueError:
+            raise ValueError('artifact must be a UUID')
+    if params.get('collection'):
+        if not params['collection'].isdigit():
+            raise ValueError('collection must be an id')
+        filters['collection'] = int(params['collection'])
+    if params.get('language'):
+        if params['language'] not in ('fr', 'en', 'wo'):
+            raise ValueError('language must be fr, en or wo')
+        filters['language'] = params['language']
+    return start, end, filters
+
+
+def cached_analytics(name, start, end, filters, compute):
+    cache_key = ':'.join(
+        ['stats', name, start.isoformat(), end.isoformat()] +
+        [f'{key}={value}' for key, value in sorted(filters.items())]
+    )
+    data = cache.get(cache_key)
+    record_cache_lookup(data is not None)
+    if data is None:
+        data = compute()
+        cache.set(cache_key, data, ANALYTICS_CACHE_TIMEOUT)
+    return Response(data)
+
+
 class MuseumStatsViewSet(viewsets.ViewSet):
     permission_classes = [AllowAny]
+
+    def get_permissions(self):
+        # Raw visits (session ids) are for staff only; the routes are mapped
+        # by hand in urls.py, so @action(permission_classes=) would not apply
+        if self.action == 'export':
+            return [IsAdminUser()]
+        return super().get_permissions()
     
     @action(detail=False, methods=['get'])
     def dashboard(self, request):
@@ -234,4 +406,135 @@ class MuseumStatsViewSet(viewsets.ViewSet):
                 } for artifact in most_visited
             ],
             'recent_visits': MuseumVisitSerializer(recent_visits, many=True).data
-        })
\ No newline at end of file
+        })
+
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        """Visits and average dwell time per hour, day or week"""
+        interval = request.query_params.get('interval', 'day')
+        if interval not in TIMESERIES_STEPS:
+            return Response(
+                {'error': 'interval must be hour, day or week'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        step = TIMESERIES_STEPS[interval]
+        try:
+            start, end, filters = analytics_params(request, step * TIMESERIES_DEFAULT_POINTS[interval])
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start) / step > ANALYTICS_MAX_POINTS:
+            return Response(
+                {'error': f'Range too long for interval {interval}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return cached_analytics(f'timeseries:{interval}', start, end, filters, lambda: {
+            'interval': interval,
+            'start': start,
+            'end': end,
+            'results': visit_timeseries(interval, start, end, **filters),
+        })
+
+    @action(detail=False, methods=['get'])
+    def heatmap(self, request):
+        """Visits by hour of day and weekday"""
+        try:
+            start, end, filters = analytics_params(request, timedelta(days=90))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute():
+            matrix = visit_heatmap(start, end, **filters)
+            return {
+                'start': start,
+                'end': end,
+                'weekdays': ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun'],
+                'hours': list(range(24)),
+                'matrix': matrix,
+                'total': sum(map(sum, matrix)),
+            }
+        return cached_analytics('heatmap', start, end, filters, compute)
+
+    @action(detail=False, methods=['get'], url_path='unique-visitors')
+    def unique_visitors(self, request):
+        """Approximate unique visitors (HyperLogLog), optionally per day, week or month"""
+        interval = request.query_params.get('interval')
+        if interval not in (None, 'day', 'week', 'month'):
+            return Response(
+                {'error': 'interval must be day, week or month'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            start, end, filters = analytics_params(request, timedelta(days=30))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def compute():
+            total, results = unique_visitors(start, end, interval, **filters)
+            return {
+                'start': start,
+                'end': end,
+                'unique_visitors': total.count(),
+                'relative_error': round(total.standard_error, 4),
+                'interval': interval,
+                'results': results,
+            }
+        return cached_analytics(f'unique-visitors:{interval}', start, end, filters, compute)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Raw visits of [start, end) as a JSON array, streamed (staff only)"""
+        try:
+            start, end, filters = analytics_params(request, timedelta(days=1))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        visits = MuseumVisit.objects.filter(visited_at__gte=start, visited_at__lt=end)
+        if 'artifact' in filters:
+            visits = visits.filter(artifact_id=filters['artifact'])
+        if 'collection' in filters:
+            visits = visits.filter(artifact__collection_id=filters['collection'])
+        if 'language' in filters:
+            visits = visits.filter(language=filters['language'])
+        # Rows are read and encoded chunk by chunk: memory stays flat on long ranges
+        rows = visits.order_by('visited_at', 'id').values(*VISIT_EXPORT_FIELDS).iterator(
+            chunk_size=STREAM_CHUNK_SIZE
+        )
+        response = StreamingJSONResponse(rows)
+        response['Content-Disposition'] = f'attachment; filename="visits-{start:%Y%m%d}-{end:%Y%m%d}.json"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def paths(self, request):
+        """Visitor flows from the latest path analysis, overall or around one artifact"""
+        summary = PathSummary.objects.order_by('-computed_at').first()
+        if summary is None:
+            return Response(
+                {'error': 'No path analysis yet: run manage.py analyze_visit_paths'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            limit = min(int(request.query_params.get('limit', PATHS_DEFAULT_LIMIT)), PATHS_MAX_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        artifact_id = request.query_params.get('artifact')
+        if artifact_id:
+            try:
+                artifact = Artifact.objects.get(pk=uuid.UUID(artifact_id))
+            except (ValueError, Artifact.DoesNotExist):
+                return Response({'error': 'Artifact not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        # A new analysis gets a new summary id, which invalidates the cache
+        cache_key = f'stats:paths:{summary.pk}:{get_language()}:{artifact_id or ""}:{limit}'
+        data = cache.get(cache_key)
+        record_cache_lookup(data is not None)
+        if data is None:
+            data = {
+                'start': summary.start,
+                'end': summary.end,
+                'computed_at': summary.computed_at,
+                **(artifact_paths(artifact, max(limit, 1)) if artifact_id
+                   else path_overview(summary, max(limit, 1))),
+            }
+            cache.set(cache_key, data, ANALYTICS_CACHE_TIMEOUT)
+        return Response(data)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Concurrent-requests-per-worker comparison between the WSGI and ASGI profiles.
+
+Drives a running server with N concurrent keep-alive clients for a fixed
+duration and prints throughput and latency percentiles. Start the server
+with a single worker so the numbers are per worker, e.g.
+
+    gunicorn -w 1 museum_api.wsgi:application
+    ASYNC_READ_PATH=True DATABASE_CONN_MAX_AGE=0 \\
+        gunicorn -w 1 -k uvicorn.workers.UvicornWorker museum_api.asgi:application
+
+then run, against each:
+
+    python benchmarks/concurrency.py http://127.0.0.1:8000/api/artifacts/ -c 1 -c 16 -c 64
+"""
+import argparse
+import sys
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from http_driver import run_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('url')
+    parser.add_argument('-c', '--concurrency', type=int, action='append')
+    parser.add_argument('-d', '--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    parts = urlsplit(args.url)
+    base_url = f'{parts.scheme}://{parts.netloc}'
+    target = parts.path + (f'?{parts.query}' if parts.query else '')
+    for concurrency in args.concurrency or [1, 8, 32]:
+        result = run_load(base_url, lambda: ('GET', target, None), concurrency, args.duration)
+        if not result.requests:
+            print(f"{concurrency:>8} {'-':>9} {'-':>9} {'-':>9} {'-':>9} {len(result.errors):>7}")
+            continue
+        print(
+            f"{concurrency:>8} {result.throughput:>9.1f} "
+            f"{result.percentile(0.50):>9.1f} {result.percentile(0.95):>9.1f} "
+            f"{result.percentile(0.99):>9.1f} {len(result.errors):>7}"
+        )
+
+
+if __name__ == '__main__':
+    main()
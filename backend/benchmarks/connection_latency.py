@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Per-request latency with and without persistent database connections.
+
+Runs the same API request repeatedly through the Django test client, first
+with CONN_MAX_AGE = 0 (new connection per request, the previous behaviour)
+then with the configured DATABASE_CONN_MAX_AGE, and prints latency stats.
+Point DATABASE_URL at the real (remote) Postgres to see the handshake cost.
+
+    python benchmarks/connection_latency.py --requests 200 --path /api/periods/
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "museum_api.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.test import Client
+
+
+def run(path, requests, conn_max_age):
+    connection = connections['default']
+    connection.close()
+    connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+    # The test client disconnects close_old_connections from the request
+    # signals, so CONN_MAX_AGE would never close anything: call it around
+    # each request like Django's handlers do.
+    client = Client(HTTP_HOST='localhost')
+
+    def get():
+        close_old_connections()
+        try:
+            return client.get(path)
+        finally:
+            close_old_connections()
+
+    get()  # warm-up (URL resolver, translations, first connection)
+    timings = []
+    opened = 0
+    for _ in range(requests):
+        previous = connection.connection
+        start = time.perf_counter()
+        response = get()
+        timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise SystemExit(f"{path} returned {response.status_code}")
+        # A closed connection is None here; a reused one is the same object
+        if connection.connection is None or connection.connection is not previous:
+            opened += 1
+    connection.close()
+    return timings, opened
+
+
+def report(label, timings, opened):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<28} mean {statistics.mean(timings):7.2f} ms   "
+        f"p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms   "
+        f"{opened} connections opened"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--path', default='/api/periods/')
+    parser.add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    if 'localhost' not in settings.ALLOWED_HOSTS and '*' not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'localhost']
+
+    vendor = connections['default'].vendor
+    print(f"{args.requests} x GET {args.path} on {vendor}")
+    report("before (CONN_MAX_AGE=0)", *run(args.path, args.requests, 0))
+    max_age = settings.DATABASE_CONN_MAX_AGE
+    report(f"after (CONN_MAX_AGE={max_age})", *run(args.path, args.requests, max_age))
+
+
+if __name__ == '__main__':
+    main()
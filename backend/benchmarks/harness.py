@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Reproducible API benchmark: list, detail, search, QR scan, track_visit, dashboard.
+
+Runs each scenario against a live server for a fixed duration and writes
+throughput and p50/p95/p99 latencies to a JSON report. Pass a previous
+report with --compare to flag regressions (non-zero exit code).
+
+    python manage.py generate_synthetic_museum --artifacts 50000 --visits 2000000
+    gunicorn -w 4 museum_api.wsgi:application &
+    python benchmarks/harness.py http://127.0.0.1:8000 -o bench.json
+    python benchmarks/harness.py http://127.0.0.1:8000 -o new.json --compare bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from http_driver import open_connection, request, run_load
+
+
+SEARCH_TERMS = ['masque', 'mask', 'bronze', 'yoruba', 'tama', 'royal', 'SYN-00001', 'calebasse']
+LANGUAGES = ['fr', 'en', 'wo']
+
+
+class Fixtures:
+    """Ids discovered from the API so requests hit real rows"""
+
+    def __init__(self, base_url, pages):
+        connection = open_connection(base_url)
+        prefix = urlsplit(base_url).path.rstrip('/')
+
+        status, content = request(connection, 'GET', f'{prefix}/api/artifacts/')
+        if status != 200:
+            raise SystemExit(f"GET /api/artifacts/ returned {status}")
+        first_page = json.loads(content)
+        page_size = max(len(first_page['results']), 1)
+        self.list_pages = max(1, -(-first_page['count'] // page_size))
+
+        self.artifact_ids = [artifact['id'] for artifact in first_page['results']]
+        for page in random.Random(0).sample(
+            range(2, self.list_pages + 1), min(pages, self.list_pages - 1)
+        ):
+            status, content = request(connection, 'GET', f'{prefix}/api/artifacts/?page={page}')
+            if status == 200:
+                self.artifact_ids += [artifact['id'] for artifact in json.loads(content)['results']]
+        connection.close()
+        if not self.artifact_ids:
+            raise SystemExit("No artifacts on display: generate a dataset first")
+
+
+def build_scenarios(fixtures, rng):
+    def pick_id():
+        return rng.choice(fixtures.artifact_ids)
+
+    return {
+        'list': (lambda: (
+            'GET', f'/api/artifacts/?page={rng.randint(1, min(fixtures.list_pages, 50))}', None
+        ), (200,)),
+        'detail': (lambda: ('GET', f'/api/artifacts/{pick_id()}/', None), (200,)),
+        'search': (lambda: (
+            'GET', f'/api/artifacts/search/?q={rng.choice(SEARCH_TERMS)}', None
+        ), (200,)),
+        'qr_scan': (lambda: (
+            'POST', '/api/qr-scan/', {'qr_data': f'https://museum-app.com/artifact/{pick_id()}'}
+        ), (200,)),
+        'track_visit': (lambda: (
+            'POST', f'/api/artifacts/{pick_id()}/track_visit/',
+            {
+                'session_id': f'bench-{rng.getrandbits(48):012x}',
+                'language': rng.choice(LANGUAGES),
+                'duration_seconds': rng.randint(5, 600),
+            }
+        ), (201,)),
+        'dashboard': (lambda: ('GET', '/api/stats/dashboard/', None), (200,)),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """Print deltas against a previous report, returning the regressed scenarios"""
+    regressions = []
+    print(f"\n{'scenario':<12} {'req/s':>18} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18}")
+    for name, result in report['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if not previous or not result['requests'] or not previous['requests']:
+            continue
+        cells, regressed = [], False
+        for metric, higher_is_better in (
+            ('throughput_rps', True), ('p50', False), ('p95', False), ('p99', False)
+        ):
+            old = previous[metric] if metric == 'throughput_rps' else previous['latency_ms'][metric]
+            new = result[metric] if metric == 'throughput_rps' else result['latency_ms'][metric]
+            change = (new - old) / old if old else 0.0
+            if (-change if higher_is_better else change) > tolerance:
+                regressed = True
+            cells.append(f"{new:>9.1f} ({change:+.0%})")
+        print(f"{name:<12} " + ' '.join(f"{cell:>18}" for cell in cells) + ('  REGRESSION' if regressed else ''))
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('base_url', help="Server root, e.g. http://127.0.0.1:8000")
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('-d', '--duration', type=float, default=15.0, help="Seconds per scenario")
+    parser.add_argument('-w', '--warmup', type=float, default=2.0, help="Warm-up seconds per scenario")
+    parser.add_argument('-s', '--scenario', action='append', help="Only run these scenarios")
+    parser.add_argument('--pages', type=int, default=20, help="List pages sampled for artifact ids")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('-o', '--output', help="Write the JSON report here")
+    parser.add_argument('--compare', help="Previous JSON report to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Relative slowdown flagged as a regression")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fixtures = Fixtures(args.base_url, args.pages)
+    scenarios = build_scenarios(fixtures, rng)
+    selected = args.scenario or list(scenarios)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_revision': git_revision(),
+            'base_url': args.base_url,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'seed': args.seed,
+            'artifacts_sampled': len(fixtures.artifact_ids),
+            'python': platform.python_version(),
+        },
+        'scenarios': {},
+    }
+
+    print(f"{'scenario':<12} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name in selected:
+        make_request, expected = scenarios[name]
+        if args.warmup:
+            run_load(args.base_url, make_request, args.concurrency, args.warmup, expected)
+        result = run_load(args.base_url, make_request, args.concurrency, args.duration, expected)
+        report['scenarios'][name] = result.as_dict()
+        latency = report['scenarios'][name]['latency_ms']
+        if result.requests:
+            print(
+                f"{name:<12} {result.throughput:>9.1f} {latency['p50']:>9.1f} "
+                f"{latency['p95']:>9.1f} {latency['p99']:>9.1f} {len(result.errors):>7}"
+            )
+        else:
+            print(f"{name:<12} {'-':>9} {'-':>9} {'-':>9} {'-':>9} {len(result.errors):>7}")
+        time.sleep(0.5)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
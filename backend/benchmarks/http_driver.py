@@ -0,0 +1,113 @@
+"""
+Minimal pure-Python HTTP load driver shared by the benchmark scripts.
+
+Each client is a thread holding one keep-alive connection; requests are
+produced by a callable returning ``(method, path, body)`` so scenarios can
+vary ids and payloads per request.
+"""
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class LoadResult:
+    def __init__(self, timings, errors, elapsed, response_bytes):
+        self.timings = sorted(timings)
+        self.errors = errors
+        self.elapsed = elapsed
+        self.response_bytes = response_bytes
+
+    @property
+    def requests(self):
+        return len(self.timings)
+
+    @property
+    def throughput(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, fraction):
+        if not self.timings:
+            return None
+        return self.timings[min(len(self.timings) - 1, int(len(self.timings) * fraction))]
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': len(self.errors),
+            'error_samples': [str(error) for error in self.errors[:5]],
+            'elapsed_s': round(self.elapsed, 3),
+            'throughput_rps': round(self.throughput, 2),
+            'latency_ms': {
+                'mean': round(statistics.mean(self.timings), 3) if self.timings else None,
+                'p50': self.percentile(0.50),
+                'p95': self.percentile(0.95),
+                'p99': self.percentile(0.99),
+                'max': self.timings[-1] if self.timings else None,
+            },
+            'avg_response_bytes': (
+                round(self.response_bytes / self.requests) if self.requests else None
+            ),
+        }
+
+
+def open_connection(base_url):
+    parts = urlsplit(base_url)
+    connection_class = (
+        http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    )
+    return connection_class(parts.netloc, timeout=30)
+
+
+def request(connection, method, path, body=None, headers=None):
+    """Send one request, returning (status, body bytes)"""
+    headers = dict(headers or {})
+    payload = None
+    if body is not None:
+        payload = json.dumps(body).encode()
+        headers['Content-Type'] = 'application/json'
+    connection.request(method, path, body=payload, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def client_loop(base_url, make_request, deadline, timings, errors, sizes, expected):
+    connection = open_connection(base_url)
+    prefix = urlsplit(base_url).path.rstrip('/')
+    while time.perf_counter() < deadline:
+        method, path, body = make_request()
+        start = time.perf_counter()
+        try:
+            status, content = request(connection, method, prefix + path, body)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            connection.close()
+            connection = open_connection(base_url)
+            continue
+        if status not in expected:
+            errors.append(status)
+            continue
+        timings.append(round((time.perf_counter() - start) * 1000, 3))
+        sizes.append(len(content))
+    connection.close()
+
+
+def run_load(base_url, make_request, concurrency, duration, expected=(200,)):
+    """Drive ``concurrency`` clients for ``duration`` seconds"""
+    timings, errors, sizes = [], [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=client_loop,
+            args=(base_url, make_request, deadline, timings, errors, sizes, expected),
+        )
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return LoadResult(timings, errors, time.perf_counter() - started, sum(sizes))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+JSON rendering: DRF's JSONRenderer vs FastJSONRenderer (orjson when installed).
+
+Renders three payloads built from the database with both renderers, checks
+that the bytes are identical and prints the median time of each:
+
+- list: a page of --page-size artifacts (ArtifactListSerializer);
+- detail: one artifact with its media (ArtifactDetailSerializer);
+- export: up to --visits visits (MuseumVisitSerializer), also streamed in
+  chunks with iter_json.
+
+It also times parsing the list back with JSONParser and FastJSONParser.
+
+    python benchmarks/json_rendering.py --visits 50000
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "museum_api.settings")
+
+import django
+
+django.setup()
+
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from artifacts.list_rows import ArtifactListRows
+from artifacts.models import Artifact, MuseumVisit
+from artifacts.renderers import FastJSONParser, FastJSONRenderer, iter_json, orjson
+from artifacts.serializers import ArtifactDetailSerializer, MuseumVisitSerializer
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def payloads(request, page_size, visits):
+    rows = ArtifactListRows(request)
+    artifacts = Artifact.objects.filter(is_on_display=True).order_by('-created_at')
+    artifact = artifacts.select_related('collection', 'period', 'culture').prefetch_related(
+        'additional_images', 'audio_guides', 'videos'
+    ).first()
+    if artifact is None:
+        raise SystemExit("No artifact: run manage.py generate_synthetic_museum first")
+    export = MuseumVisit.objects.select_related('artifact').order_by('-visited_at')[:visits]
+    return {
+        'list': rows.render(rows.values(artifacts[:page_size])),
+        'detail': ArtifactDetailSerializer(artifact, context={'request': request}).data,
+        'export': MuseumVisitSerializer(export, many=True).data,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--visits', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    request = RequestFactory().get('/api/artifacts/', HTTP_HOST='localhost')
+    print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json (orjson not installed)'}")
+    before, after = JSONRenderer(), FastJSONRenderer()
+    rendered = {}
+    for name, data in payloads(request, args.page_size, args.visits).items():
+        old, expected = timed(lambda: before.render(data), args.repeat)
+        new, content = timed(lambda: after.render(data), args.repeat)
+        if content != expected:
+            raise SystemExit(f"{name}: the renderers disagree")
+        rendered[name] = content
+        size = len(data) if isinstance(data, list) else 1
+        print(
+            f"{name:<7} {size:>6} items {len(content) / 1024:9.1f} KiB   "
+            f"JSONRenderer {old:8.2f} ms   FastJSONRenderer {new:8.2f} ms   x{old / max(new, 1e-9):.1f}"
+        )
+        if name == 'export':
+            streamed, chunks = timed(lambda: list(iter_json(data)), args.repeat)
+            if b''.join(chunks) != expected:
+                raise SystemExit("export: the streamed output differs")
+            print(f"{'':<7} streamed in {len(chunks)} chunks {streamed:8.2f} ms")
+
+    content = rendered['list']
+    old, expected = timed(lambda: JSONParser().parse(io.BytesIO(content)), args.repeat)
+    new, parsed = timed(lambda: FastJSONParser().parse(io.BytesIO(content)), args.repeat)
+    if parsed != expected:
+        raise SystemExit("list: the parsers disagree")
+    print(f"{'parse':<7} {'list':>12}   JSONParser {old:8.2f} ms   FastJSONParser {new:8.2f} ms   x{old / max(new, 1e-9):.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Artifact list serialization: ArtifactListSerializer vs the .values() fast path.
+
+Builds the list payload of up to --rows displayed artifacts both ways, in
+every language, checks that the JSON is byte-identical and prints the time
+taken by each (query included). Generate enough artifacts first with
+``manage.py generate_synthetic_museum``.
+
+    python benchmarks/list_serialization.py --rows 10000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "museum_api.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+
+from artifacts.list_rows import ArtifactListRows
+from artifacts.models import Artifact
+from artifacts.serializers import ArtifactListSerializer
+
+
+def with_serializer(queryset, request):
+    queryset = queryset.select_related('collection', 'period', 'culture')
+    return ArtifactListSerializer(queryset, many=True, context={'request': request}).data
+
+
+def with_rows(queryset, request):
+    rows = ArtifactListRows(request)
+    return rows.render(rows.values(queryset))
+
+
+def measure(build, queryset, request, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = build(queryset, request)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), JSONRenderer().render(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    request = RequestFactory().get('/api/artifacts/', HTTP_HOST='localhost')
+    queryset = Artifact.objects.filter(is_on_display=True).order_by('-created_at')[:args.rows]
+    count = queryset.count()
+    print(f"{count} artifacts (median of {args.repeat} runs)")
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            before, expected = measure(with_serializer, queryset, request, args.repeat)
+            after, rendered = measure(with_rows, queryset, request, args.repeat)
+        if rendered != expected:
+            raise SystemExit(f"{language}: the payloads differ")
+        per_row = 1000 / max(count, 1)
+        print(
+            f"{language}: serializer {before:8.1f} ms ({before * per_row:6.1f} µs/row)   "
+            f"values() {after:8.1f} ms ({after * per_row:6.1f} µs/row)   x{before / max(after, 1e-9):.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
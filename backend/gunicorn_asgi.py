@@ -0,0 +1,23 @@
+"""
+gunicorn profile for the async (ASGI) deployment.
+
+    gunicorn -c gunicorn_asgi.py museum_api.asgi:application
+
+Each uvicorn worker runs an event loop, so a slow database or storage call
+on the async read path no longer blocks the whole worker.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+
+raw_env = [
+    'ASYNC_READ_PATH=True',
+    # Async ORM calls run in per-request threads: persistent connections would
+    # pile up, so rely on a pooler (PgBouncer / DATABASE_POOL) instead
+    f"DATABASE_CONN_MAX_AGE={os.environ.get('DATABASE_CONN_MAX_AGE', 0)}",
+]
@@ -11,8 +11,10 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 import dj_database_url
+import django
+from django.core.exceptions import ImproperlyConfigured
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -28,11 +30,73 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-your-secret-key-here'
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config('DEBUG', default=True, cast=bool)
 
-ALLOWED_HOSTS = ["*.vercel.app"]
+# Subdomain wildcards are written '.example.com'; '*.example.com' (a common
+# mistake in hosting dashboards) would match nothing, so it is read as such
+ALLOWED_HOSTS = [
+    host[1:] if host.startswith('*.') else host
+    for host in config('ALLOWED_HOSTS', default='.vercel.app,localhost,127.0.0.1', cast=Csv())
+]
+# Serverless deployments (Vercel) set this from api/index.py
+SERVERLESS = config('DJANGO_SERVERLESS', default=False, cast=bool)
+
+# Persistent connections: reuse the Postgres connection across requests instead
+# of paying the TCP+TLS+auth handshake each time. Serverless instances are
+# frozen between invocations, so they keep connections for a shorter time.
+DATABASE_CONN_MAX_AGE = config(
+    'DATABASE_CONN_MAX_AGE', default=60 if SERVERLESS else 600, cast=int
+)
+DATABASE_CONN_HEALTH_CHECKS = config('DATABASE_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
+# Native psycopg 3 connection pool. Django < 5.1 (4.2 is pinned here) has no
+# pool option: enabling it there is refused rather than silently ignored.
+DATABASE_POOL = config('DATABASE_POOL', default=False, cast=bool)
+if DATABASE_POOL and django.VERSION < (5, 1):
+    raise ImproperlyConfigured(
+        f"DATABASE_POOL requires Django 5.1 or later (running {django.get_version()}); "
+        "use DATABASE_CONN_MAX_AGE or an external pooler such as PgBouncer"
+    )
+DATABASE_POOL_MIN_SIZE = config('DATABASE_POOL_MIN_SIZE', default=2, cast=int)
+DATABASE_POOL_MAX_SIZE = config('DATABASE_POOL_MAX_SIZE', default=10, cast=int)
+
+
+def database_config(url):
+    db = dj_database_url.parse(
+        url,
+        conn_max_age=DATABASE_CONN_MAX_AGE,
+        conn_health_checks=DATABASE_CONN_HEALTH_CHECKS,
+    )
+    is_postgres = db['ENGINE'] == 'django.db.backends.postgresql'
+    if SERVERLESS and is_postgres:
+        # Serverless platforms usually sit behind a transaction-mode pooler
+        # (PgBouncer, Supavisor, Neon) which cannot hold named cursors
+        db['DISABLE_SERVER_SIDE_CURSORS'] = True
+    if DATABASE_POOL and is_postgres:
+        # The pool owns the connections: Django requires CONN_MAX_AGE = 0
+        db['CONN_MAX_AGE'] = 0
+        db.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DATABASE_POOL_MIN_SIZE,
+            'max_size': DATABASE_POOL_MAX_SIZE,
+        }
+    return db
+
+
 DATABASES = {
-    'default': dj_database_url.parse(config('DATABASE_URL'))
+    'default': database_config(config('DATABASE_URL'))
 }
 
+# Optional read replicas (comma separated URLs), used by the public read-only API
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=Csv())):
+    alias = f'replica_{index + 1}'
+    DATABASES[alias] = database_config(replica_url)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['artifacts.db_routers.PrimaryReplicaRouter']
+
+# Reads stay on the primary for this many seconds after a client wrote
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=15, cast=int)
+
 
 # Application definition
 
@@ -54,14 +118,18 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'artifacts.middleware.MetricsMiddleware',
+    'artifacts.middleware.NPlusOneMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'artifacts.middleware.ReplicaRoutingMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'artifacts.middleware.RequestProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'museum_api.urls'
@@ -83,6 +151,95 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'museum_api.wsgi.application'
+ASGI_APPLICATION = 'museum_api.asgi.application'
+
+# Serve the hot read endpoints with the async views (enable under uvicorn)
+ASYNC_READ_PATH = config('ASYNC_READ_PATH', default=False, cast=bool)
+
+# Shared cache. Cached payloads are invalidated by bumping version keys (see
+# artifacts/caching.py), which other processes only see through a shared
+# backend: set CACHE_URL (redis://host:6379/0 or memcached://host:11211)
+# whenever more than one worker or instance serves the API. Without it each
+# process has its own local memory cache (development only).
+CACHE_URL = config('CACHE_URL', default='')
+
+
+def cache_config(url):
+    if not url:
+        return {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    scheme = url.split('://', 1)[0]
+    if scheme in ('redis', 'rediss'):
+        return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+    if scheme in ('memcached', 'pymemcache'):
+        return {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': url.split('://', 1)[1]}
+    raise ImproperlyConfigured(f"Unsupported CACHE_URL scheme: {scheme!r} (use redis:// or memcached://)")
+
+
+CACHES = {
+    'default': cache_config(CACHE_URL)
+}
+
+# Cache lifetime of the stats dashboard payload, in seconds
+STATS_CACHE_TIMEOUT = config('STATS_CACHE_TIMEOUT', default=30, cast=int)
+
+# Featured carousel: optional rotation of the featured pool ('hourly' or 'daily',
+# overridable with ?rotation=). The cached pool is invalidated whenever an
+# artifact's is_featured/is_on_display changes; the timeout is only a safety net.
+FEATURED_ROTATION = config('FEATURED_ROTATION', default='')
+FEATURED_CACHE_TIMEOUT = config('FEATURED_CACHE_TIMEOUT', default=86400, cast=int)
+
+# Home page fragments (/api/home/), in seconds: collection counts are also
+# invalidated on change, trending items only expire
+HOME_COLLECTIONS_CACHE_TIMEOUT = config('HOME_COLLECTIONS_CACHE_TIMEOUT', default=300, cast=int)
+HOME_TRENDING_CACHE_TIMEOUT = config('HOME_TRENDING_CACHE_TIMEOUT', default=60, cast=int)
+
+# Serve the artifact list and detail from the per-language documents kept in
+# ArtifactDocument (run manage.py rebuild_artifact_documents after enabling)
+ARTIFACT_READ_MODEL = config('ARTIFACT_READ_MODEL', default=False, cast=bool)
+
+# Cache lifetime of the search facet counts, in seconds (also invalidated when
+# an artifact, audio guide or video changes)
+SEARCH_FACETS_CACHE_TIMEOUT = config('SEARCH_FACETS_CACHE_TIMEOUT', default=300, cast=int)
+
+# Cache lifetime of the visit time-series and heatmap payloads, in seconds
+ANALYTICS_CACHE_TIMEOUT = config('ANALYTICS_CACHE_TIMEOUT', default=60, cast=int)
+
+# Prometheus metrics (/api/metrics). Point METRICS_DIR at a directory shared by
+# the gunicorn workers (emptied at deploy) to aggregate every process.
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=1.0, cast=float)
+# Bearer token required by /api/metrics; without it the endpoint only answers in DEBUG
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# N+1 query detection (development and staging): report statement shapes run
+# more than NPLUSONE_THRESHOLD times in one request, or fail it with NPLUSONE_RAISE
+NPLUSONE_DETECTION = config('NPLUSONE_DETECTION', default=DEBUG, cast=bool)
+NPLUSONE_THRESHOLD = config('NPLUSONE_THRESHOLD', default=5, cast=int)
+NPLUSONE_RAISE = config('NPLUSONE_RAISE', default=False, cast=bool)
+
+# On-demand profiling of staff requests (?_profile=1), stored for the admin
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILING_MAX_STORED = config('PROFILING_MAX_STORED', default=200, cast=int)
+PROFILING_STATS_LIMIT = config('PROFILING_STATS_LIMIT', default=40, cast=int)
+
+# Slow-query log (manage.py slow_query_report), opt-in: each slow statement
+# costs an INSERT on the request path. On PostgreSQL an opt-in sample of slow
+# SELECTs is re-run to store its EXPLAIN (ANALYZE, BUFFERS) plan; the report
+# trims the log to SLOW_QUERY_MAX_STORED rows.
+SLOW_QUERY_LOG = config('SLOW_QUERY_LOG', default=False, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=float)
+SLOW_QUERY_EXPLAIN_SAMPLE = config('SLOW_QUERY_EXPLAIN_SAMPLE', default=0.0, cast=float)
+SLOW_QUERY_MAX_STORED = config('SLOW_QUERY_MAX_STORED', default=1000, cast=int)
+
+# Visit log retention (manage.py visit_partitions): older months are rolled up
+# into VisitAggregate, archived as compressed files, then dropped
+VISIT_RETENTION_MONTHS = config('VISIT_RETENTION_MONTHS', default=24, cast=int)
+VISIT_ARCHIVE_DIR = config('VISIT_ARCHIVE_DIR', default=str(BASE_DIR / 'archives'))
+
+# Trending artifacts (/api/artifacts/trending/): each visit's weight halves every
+# TRENDING_HALF_LIFE_HOURS; scores below TRENDING_MIN_SCORE are pruned
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=24, cast=float)
+TRENDING_MIN_SCORE = config('TRENDING_MIN_SCORE', default=0.01, cast=float)
 
 
 # Database
@@ -151,6 +308,15 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Bulk photo import (admin page and manage.py import_media): validation processes
+# and the largest image accepted from an archive
+MEDIA_IMPORT_WORKERS = config('MEDIA_IMPORT_WORKERS', default=min(4, os.cpu_count() or 1), cast=int)
+MEDIA_IMPORT_MAX_FILE_MB = config('MEDIA_IMPORT_MAX_FILE_MB', default=50, cast=int)
+
+# Background artifact jobs: a running job whose progress has not moved for this
+# long lost its worker and is resumed by manage.py run_artifact_jobs
+ARTIFACT_JOB_STALE_SECONDS = config('ARTIFACT_JOB_STALE_SECONDS', default=600, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -168,6 +334,16 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    # orjson when installed, DRF's stdlib encoder otherwise (same output)
+    'DEFAULT_RENDERER_CLASSES': [
+        'artifacts.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'artifacts.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # CORS settings
@@ -229,7 +405,13 @@ JAZZMIN_SETTINGS = {
                 "url": "import-artifacts",
                 "icon": "fas fa-upload",
                 "permissions": ["artifacts.add_artifact"],
-            }
+            },
+            {
+                "name": "Importer des photos",
+                "url": "admin:artifacts_artifact_import_media",
+                "icon": "fas fa-images",
+                "permissions": ["artifacts.change_artifact"],
+            },
         ]
     },
 
@@ -0,0 +1,64 @@
+"""
+API-only settings profile for the serverless entry point (api/index.py).
+
+Anonymous JSON API calls do not need the admin, jazzmin, sessions or
+messages, and loading them dominates the cold start on Vercel. The admin
+stays available on the full deployment (``museum_api.settings``).
+
+Compare the cold start of both profiles with ``manage.py import_time_report``.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+
+API_ONLY_EXCLUDED_APPS = {
+    'jazzmin',
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+}
+
+API_ONLY_EXCLUDED_MIDDLEWARE = {
+    # Static files are served by the platform's CDN, not by the function
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Staff-only, needs authentication
+    'artifacts.middleware.RequestProfilingMiddleware',
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_ONLY_EXCLUDED_APPS]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in API_ONLY_EXCLUDED_MIDDLEWARE
+]
+
+ROOT_URLCONF = 'museum_api.urls_api'
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+# JSON only: the browsable API needs sessions and templates
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        renderer for renderer in REST_FRAMEWORK.get(
+            'DEFAULT_RENDERER_CLASSES', ['rest_framework.renderers.JSONRenderer']
+        )
+        if not renderer.endswith('BrowsableAPIRenderer')
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
@@ -1,5 +1,6 @@
 import { createContext, useContext, useState, useEffect } from 'react'
 import { useQuery } from 'react-query'
+import { useTranslation } from 'react-i18next'
 import { museumApi, fetchCsrfToken } from '../services/api'
 
 const MuseumContext = createContext()
@@ -24,6 +25,8 @@ export const MuseumProvider = ({ children }) => {
     return session
   })
   const [csrfReady, setCsrfReady] = useState(false)
+  const { i18n } = useTranslation()
+  const language = (i18n.language || 'fr').split('-')[0]
 
   // Récupérer CSRF token dès le montage
   useEffect(() => {
@@ -52,18 +55,17 @@ export const MuseumProvider = ({ children }) => {
     localStorage.setItem('museum_recent_visits', JSON.stringify(recentVisits))
   }, [recentVisits])
 
-  // Données du musée
-  const { data: stats, isLoading: statsLoading } = useQuery(
-    'museum-stats',
-    () => museumApi.getStats(),
-    { staleTime: 1000 * 60 * 5 }
-  )
-
-  const { data: featuredArtifacts, isLoading: featuredLoading } = useQuery(
-    'featured-artifacts',
-    () => museumApi.getFeaturedArtifacts(),
+  // Données du musée : un seul appel pour toute la page d'accueil
+  const { data: home, isLoading: homeLoading } = useQuery(
+    ['museum-home', language],
+    () => museumApi.getHome(language),
     { staleTime: 1000 * 60 * 5 }
   )
+  // Même forme que /stats/dashboard/ ({ stats: {...} }) pour les composants existants
+  const stats = home
+  const featuredArtifacts = home?.featured
+  const statsLoading = homeLoading
+  const featuredLoading = homeLoading
 
   // Favoris
   const toggleFavorite = (artifactId) => {
@@ -115,6 +117,8 @@ export const MuseumProvider = ({ children }) => {
     recentVisits,
     stats,
     featuredArtifacts,
+    topCollections: home?.collections,
+    trendingArtifacts: home?.trending,
     statsLoading,
     featuredLoading,
     toggleFavorite,
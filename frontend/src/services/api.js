@@ -66,6 +66,12 @@ export const museumApi = {
     return response.data
   },
 
+  // Page d'accueil : vedettes, collections, statistiques et tendances en un appel
+  async getHome(lang) {
+    const response = await api.get('/home/', { params: lang ? { lang } : {} })
+    return response.data
+  },
+
   async getFeaturedArtifacts() {
     const response = await api.get('/artifacts/featured/')
     return response.data